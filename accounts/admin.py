@@ -1,13 +1,19 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from crowdfunding_projects.admin import IndexedAutocompleteMixin
+from crowdfunding_projects.pagination import EstimatedCountPaginator
 from .models import CustomUser
 
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(IndexedAutocompleteMixin, UserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'phone', 'country', 'is_active', 'date_joined')
     list_filter = ('is_active', 'is_staff', 'is_superuser', 'date_joined', 'country')
     search_fields = ('username', 'email', 'first_name', 'last_name', 'phone', 'country')
+    # Both unique, so indexed
+    autocomplete_search_fields = ('email', 'username')
     ordering = ('-date_joined',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
@@ -1,33 +1,99 @@
-from django.contrib.auth.backends import ModelBackend
-from django.contrib.auth import get_user_model
-from django.db.models import Q
-
-User = get_user_model()
-
-class EmailBackend(ModelBackend):
-    """
-    Custom authentication backend that allows users to login with their email address.
-    """
-    
-    def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            # Check if the username field contains an email
-            if username and '@' in username:
-                user = User.objects.get(email=username)
-            else:
-                # Fall back to username authentication
-                user = User.objects.get(username=username)
-            
-            # Check if the password is correct
-            if user.check_password(password):
-                return user
-        except User.DoesNotExist:
-            return None
-        
-        return None
-    
-    def get_user(self, user_id):
-        try:
-            return User.objects.get(pk=user_id)
-        except User.DoesNotExist:
-            return None
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from .hashing import acheck_password, amake_password
+
+User = get_user_model()
+
+# The cache must be shared by all processes in production, otherwise a
+# password change only logs out other sessions once this expires
+USER_CACHE_TIMEOUT = getattr(settings, 'USER_CACHE_TIMEOUT', 300)
+
+
+def user_cache_key(user_id):
+    return f'accounts:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """Drop the cached user now and again once the change is committed"""
+    key = user_cache_key(user_id)
+    cache.delete(key)
+    # A request may cache the old row before the transaction commits
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend loading the user of every authenticated request from the
+    cache. Saving or deleting a user drops the entry (accounts/signals.py).
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        """
+        ``authenticate`` with the password checked in the hashing pool.
+        Raises ``HashingOverloaded`` when the pool is full.
+        """
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await self.aget_login_user(username)
+        except User.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            await amake_password(password)
+            return None
+        valid, must_update = await acheck_password(password, user.password)
+        if not valid or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            # Iterations or hasher changed in settings
+            user.password = await amake_password(password)
+            await user.asave(update_fields=['password'])
+        return user
+
+    async def aget_login_user(self, username):
+        """The user logging in as ``username``; raises ``User.DoesNotExist``"""
+        return await User._default_manager.aget_by_natural_key(username)
+
+
+class EmailBackend(CachedModelBackend):
+    """
+    Custom authentication backend that allows users to login with their email address.
+    """
+    
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        try:
+            # Check if the username field contains an email
+            if username and '@' in username:
+                user = User.objects.get(email=username)
+            else:
+                # Fall back to username authentication
+                user = User.objects.get(username=username)
+            
+            # Check if the password is correct
+            if user.check_password(password):
+                return user
+        except User.DoesNotExist:
+            return None
+        
+        return None
+
+    async def aget_login_user(self, username):
+        # Same lookup as authenticate(), for the async login view
+        if '@' in username:
+            return await User.objects.aget(email=username)
+        return await User.objects.aget(username=username)
@@ -0,0 +1,180 @@
+"""
+Password hashing off the web workers.
+
+PBKDF2 costs tens of milliseconds of CPU per hash by design. The async login
+and registration views hand ``check_password``/``make_password`` to a small
+process pool instead of running them on the request thread, so a burst of
+logins queues behind a bounded number of CPUs instead of occupying every
+worker.
+
+At most ``PASSWORD_HASHING_MAX_PENDING`` hashes may be queued or running per
+web process; beyond that ``HashingOverloaded`` is raised and the views answer
+503 with ``Retry-After``. ``hashing_metrics()`` reports hash cost, queue wait
+and depth to size the pool (also at ``accounts/hashing-metrics/`` for staff).
+
+Each web process starts its own pool on the first hash, so the pool size is
+per worker. A process forked after that (e.g. a server preloading the app
+and forking its workers) cannot use its parent's pool: the child forgets it
+and its counters and starts its own on first use.
+"""
+import asyncio
+import atexit
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+PASSWORD_HASHING_WORKERS = getattr(settings, 'PASSWORD_HASHING_WORKERS', 2)
+PASSWORD_HASHING_MAX_PENDING = getattr(settings, 'PASSWORD_HASHING_MAX_PENDING', 32)
+# Seconds a caller waits for its hash before giving up
+PASSWORD_HASHING_TIMEOUT = getattr(settings, 'PASSWORD_HASHING_TIMEOUT', 10)
+# Retry-After (seconds) of the 503 answered when the queue is full
+PASSWORD_HASHING_RETRY_AFTER = getattr(settings, 'PASSWORD_HASHING_RETRY_AFTER', 5)
+# Durations kept for the metrics
+SAMPLES = 1000
+
+
+class HashingOverloaded(Exception):
+    pass
+
+
+# Worker side
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        # Spawned rather than forked
+        django.setup()
+
+
+def _run(function, submitted, *args):
+    started = time.time()
+    result = function(*args)
+    return result, started - submitted, time.time() - started
+
+
+def _check(password, encoded):
+    """``(valid, must_update)`` like ``check_password`` with a setter"""
+    from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher
+
+    valid = check_password(password, encoded)
+    must_update = False
+    if valid:
+        hasher = identify_hasher(encoded)
+        preferred = get_hasher()
+        must_update = hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+    return valid, must_update
+
+
+def _make(password):
+    from django.contrib.auth.hashers import make_password
+
+    return make_password(password)
+
+
+# Web process side
+
+_executor = None
+_lock = threading.Lock()
+_pending = 0
+_peak_pending = 0
+_completed = 0
+_rejected = 0
+_hash_seconds = deque(maxlen=SAMPLES)
+_wait_seconds = deque(maxlen=SAMPLES)
+
+
+def _forget_pool():
+    # In a forked child: the parent's pool processes and lock are not ours
+    global _executor, _lock, _pending
+    _executor = None
+    _lock = threading.Lock()
+    _pending = 0
+
+
+os.register_at_fork(after_in_child=_forget_pool)
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASHING_WORKERS, initializer=_init_worker)
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+
+def submit(function, *args):
+    """Queue ``function(*args)`` in the pool, or raise ``HashingOverloaded``"""
+    global _pending, _peak_pending, _rejected
+    executor = get_executor()
+    with _lock:
+        if _pending >= PASSWORD_HASHING_MAX_PENDING:
+            _rejected += 1
+            raise HashingOverloaded(f'{_pending} password hashes already queued.')
+        _pending += 1
+        _peak_pending = max(_peak_pending, _pending)
+    future = executor.submit(_run, function, time.time(), *args)
+    future.add_done_callback(_done)
+    return future
+
+
+def _done(future):
+    # Runs on the executor's management thread
+    global _pending, _completed
+    with _lock:
+        _pending -= 1
+        if future.cancelled() or future.exception() is not None:
+            return
+        _completed += 1
+        _, waited, took = future.result()
+        _wait_seconds.append(waited)
+        _hash_seconds.append(took)
+
+
+async def _submit(function, *args):
+    future = submit(function, *args)
+    result, _, _ = await asyncio.wait_for(asyncio.wrap_future(future), PASSWORD_HASHING_TIMEOUT)
+    return result
+
+
+async def acheck_password(password, encoded):
+    """``(valid, must_update)`` computed in the pool"""
+    if not password or not encoded:
+        return False, False
+    return await _submit(_check, password, encoded)
+
+
+async def amake_password(password):
+    return await _submit(_make, password)
+
+
+def _summary(samples):
+    if not samples:
+        return {'p50': None, 'p95': None, 'max': None}
+    ordered = sorted(samples)
+    return {
+        'p50': round(statistics.median(ordered) * 1000, 2),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        'max': round(ordered[-1] * 1000, 2),
+    }
+
+
+def hashing_metrics():
+    with _lock:
+        return {
+            'workers': PASSWORD_HASHING_WORKERS,
+            'max_pending': PASSWORD_HASHING_MAX_PENDING,
+            'pending': _pending,
+            'peak_pending': _peak_pending,
+            'completed': _completed,
+            'rejected': _rejected,
+            'hash_ms': _summary(_hash_seconds),
+            'queue_wait_ms': _summary(_wait_seconds),
+        }
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from crowdfunding_projects.images import variants_changed
+
+from .backends import invalidate_cached_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, raw=False, **kwargs):
+    """Profile edits, password changes, deactivation and deletion"""
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(variants_changed, sender=User)
+def user_variants_changed(sender, pk, **kwargs):
+    # Stored with an UPDATE, which sends no post_save
+    invalidate_cached_user(pk)
@@ -0,0 +1,21 @@
+"""Background tasks of the accounts app (run by ``run_tasks``)"""
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives
+
+from crowdfunding_projects.background import task
+
+
+@task(priority=20)
+def send_email(subject, body, from_email, recipient_list, html_message=None):
+    message = EmailMultiAlternatives(subject, body, from_email, recipient_list)
+    if html_message:
+        message.attach_alternative(html_message, 'text/html')
+    message.send()
+
+
+@task
+def delete_user(user_id):
+    """Remove a deactivated account and everything that cascades from it"""
+    user = get_user_model().objects.filter(pk=user_id, is_active=False).first()
+    if user is not None:
+        user.delete()
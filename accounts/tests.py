@@ -1,3 +1,131 @@
-from django.test import TestCase
-
-# Create your tests here.
+import os
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts import hashing
+from accounts.backends import CachedModelBackend, EmailBackend, user_cache_key
+from crowdfunding_projects.background import PENDING
+from crowdfunding_projects.models import Task
+
+PASSWORD = 'correct horse battery'
+
+
+def create_user(name, **kwargs):
+    fields = dict(
+        email=f'{name}@example.com', password=PASSWORD,
+        first_name='First', last_name='Last', phone='01012345678',
+    )
+    fields.update(kwargs)
+    return get_user_model().objects.create_user(username=name, **fields)
+
+
+class AsyncLoginTests(TestCase):
+    def setUp(self):
+        self.user = create_user('donor')
+
+    async def login(self, password=PASSWORD):
+        return await self.async_client.post(
+            reverse('accounts:login'), {'email': self.user.email, 'password': password}
+        )
+
+    async def test_password_checked_in_the_pool(self):
+        completed = hashing.hashing_metrics()['completed']
+        response = await self.login()
+        self.assertRedirects(response, reverse('homepage:homepage'), fetch_redirect_response=False)
+        self.assertEqual((await self.async_client.get(reverse('accounts:profile'))).status_code, 200)
+        self.assertGreater(hashing.hashing_metrics()['completed'], completed)
+
+    async def test_wrong_password(self):
+        self.assertEqual((await self.login('wrong')).status_code, 200)
+        self.assertEqual((await self.async_client.get(reverse('accounts:profile'))).status_code, 302)
+
+    async def test_full_queue_answers_503(self):
+        with mock.patch.object(hashing, 'PASSWORD_HASHING_MAX_PENDING', 0):
+            response = await self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], str(hashing.PASSWORD_HASHING_RETRY_AFTER))
+
+    async def test_outdated_hash_is_upgraded(self):
+        self.user.password = make_password(PASSWORD, hasher='pbkdf2_sha1')
+        await self.user.asave(update_fields=['password'])
+        await self.login()
+        await self.user.arefresh_from_db(fields=['password'])
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+    async def test_email_backend_accepts_email_or_username(self):
+        backend = EmailBackend()
+        for login in (self.user.email, self.user.username):
+            self.assertEqual(await backend.aauthenticate(None, username=login, password=PASSWORD), self.user)
+        self.assertIsNone(await backend.aauthenticate(None, username='nobody', password=PASSWORD))
+
+
+class HashingPoolTests(TestCase):
+    def test_forked_child_does_not_reuse_the_pool(self):
+        hashing.get_executor()
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if hashing._executor is None and hashing._pending == 0 else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('donor')
+        self.backend = CachedModelBackend()
+        self.user_id = self.user.pk
+        self.backend.get_user(self.user_id)
+        self.assertIsNotNone(cache.get(user_cache_key(self.user_id)))
+
+    def assertEvicted(self):
+        # Deleting clears user.pk
+        self.assertIsNone(cache.get(user_cache_key(self.user_id)))
+
+    def test_password_change_evicts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('new password')
+            self.user.save()
+        self.assertEvicted()
+        self.assertTrue(self.backend.get_user(self.user.pk).check_password('new password'))
+
+    def test_deactivation_evicts(self):
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertEvicted()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_delete_evicts(self):
+        self.user.delete()
+        self.assertEvicted()
+        self.assertIsNone(self.backend.get_user(self.user_id))
+
+    def test_password_change_ends_other_sessions(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('accounts:profile')).status_code, 200)
+        self.user.set_password('new password')
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('accounts:profile')).status_code, 302)
+
+
+class DeleteAccountTests(TestCase):
+    def test_email_and_username_free_before_the_delete_runs(self):
+        user = create_user('donor')
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse('accounts:delete_account'), {'password': PASSWORD, 'confirm_delete': 'true'}, follow=True
+        )
+        self.assertContains(response, 'Your account has been deleted.')
+        user.refresh_from_db()
+        self.assertFalse(user.is_active)
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(Task.objects.filter(name='accounts.tasks.delete_user', status=PENDING).exists())
+
+        # Signing up again with the same details does not clash
+        create_user('donor')
+        self.assertEqual(get_user_model().objects.filter(email='donor@example.com', is_active=True).count(), 1)
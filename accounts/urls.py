@@ -1,6 +1,7 @@
-from django.urls import path
+from django.urls import path, reverse_lazy
 from django.contrib.auth import views as auth_views
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = "accounts"
 
@@ -14,13 +15,16 @@ urlpatterns = [
     path("profile/", views.profile_view, name="profile"),
     path("profile/edit/", views.edit_profile, name="edit_profile"),
     path("profile/delete/", views.delete_account, name="delete_account"),
+    path("hashing-metrics/", views.hashing_metrics_view, name="hashing_metrics"),
     
     # Password Reset URLs
     path("password-reset/", 
          auth_views.PasswordResetView.as_view(
+             form_class=QueuedPasswordResetForm,
              template_name='accounts/password_reset.html',
              email_template_name='accounts/password_reset_email.html',
-             subject_template_name='accounts/password_reset_subject.txt'
+             subject_template_name='accounts/password_reset_subject.txt',
+             success_url=reverse_lazy('accounts:password_reset_done')
          ), 
          name="password_reset"),
     
@@ -32,7 +36,8 @@ urlpatterns = [
     
     path("password-reset-confirm/<uidb64>/<token>/", 
          auth_views.PasswordResetConfirmView.as_view(
-             template_name='accounts/password_reset_confirm.html'
+             template_name='accounts/password_reset_confirm.html',
+             success_url=reverse_lazy('accounts:password_reset_complete')
          ), 
          name="password_reset_confirm"),
     
@@ -1,24 +1,43 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import authenticate, login, logout, get_user_model
+from django.contrib.auth import aauthenticate, alogin, logout, get_user_model
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.contrib.auth import update_session_auth_hash
 from .forms import RegistrationForm, ProfileEditForm
+from .hashing import PASSWORD_HASHING_RETRY_AFTER, HashingOverloaded, amake_password, hashing_metrics
+from .tasks import delete_user
 
 User = get_user_model()
 
-def register(request):
+PROFILE_PROJECTS_PER_PAGE = 6
+PROFILE_DONATIONS_PER_PAGE = 20
+
+def _busy(request, template, context=None):
+    """503 asking the client to retry when the hashing queue is full"""
+    messages.error(request, 'We are receiving a lot of requests right now. Please try again in a moment.')
+    response = render(request, template, context, status=503)
+    response['Retry-After'] = str(PASSWORD_HASHING_RETRY_AFTER)
+    return response
+
+
+async def register(request):
     if request.method == "POST":
         form = RegistrationForm(request.POST, request.FILES)
-        if form.is_valid():
+        if await sync_to_async(form.is_valid)():
+            try:
+                form.password_hash = await amake_password(form.cleaned_data['password1'])
+            except HashingOverloaded:
+                return await sync_to_async(_busy)(request, "accounts/register.html", {"form": form})
             user = form.save(commit=False)
             user.is_active = True  # Automatically activate account
-            user.save()
+            await user.asave()
             
             # Automatically log in the user after successful registration
-            login(request, user)
+            await alogin(request, user)
             messages.success(request, f'Welcome {user.first_name}! Your account has been created successfully.')
             return redirect('homepage:homepage')  # Redirect to homepage
         else:
@@ -26,19 +45,22 @@ def register(request):
     else:
         form = RegistrationForm()
     
-    return render(request, "accounts/register.html", {"form": form})
+    return await sync_to_async(render)(request, "accounts/register.html", {"form": form})
 
 
 
-def login_view(request):
+async def login_view(request):
     if request.method == "POST":
         email = request.POST.get("email")
         password = request.POST.get("password")
         
         if email and password:
-            user = authenticate(request, username=email, password=password)
+            try:
+                user = await aauthenticate(request, username=email, password=password)
+            except HashingOverloaded:
+                return await sync_to_async(_busy)(request, "accounts/login.html")
             if user is not None:
-                login(request, user)
+                await alogin(request, user)
                 messages.success(request, f'Welcome back, {user.first_name}!')
                 return redirect('homepage:homepage')  # Redirect to homepage
             else:
@@ -46,7 +68,7 @@ def login_view(request):
         else:
             messages.error(request, 'Please provide both email and password.')
     
-    return render(request, "accounts/login.html")
+    return await sync_to_async(render)(request, "accounts/login.html")
 
 def logout_view(request):
     logout(request)
@@ -58,30 +80,33 @@ def profile_view(request):
     """View user profile with projects and donations"""
     user = request.user
     
-    # Get user's created projects
-    from crowdfunding_projects.models import Project
-    projects = Project.objects.filter(
-        creator=user
-    ).select_related('category').prefetch_related('tags', 'images').order_by('-created_at')
+    # Stored totals and one page of each history, however long it is
+    from crowdfunding_projects.donor_stats import donor_stats_for
+    from crowdfunding_projects.models import Donation, Project
+    from crowdfunding_projects.pagination import CursorPaginator
+    stats = donor_stats_for(user)
     
-    # Get user's donations
-    from crowdfunding_projects.models import Donation
-    donations = Donation.objects.filter(
-        user=user
-    ).select_related('project').order_by('-created_at')
+    projects = CursorPaginator(
+        Project.objects.filter(creator=user).select_related('category').prefetch_related('images'),
+        PROFILE_PROJECTS_PER_PAGE, ('-created_at', '-pk'),
+    ).get_page(request.GET.get('projects_cursor'), request.GET, param='projects_cursor')
     
-    # Calculate statistics
-    total_donated = sum(donation.amount for donation in donations)
-    total_projects_created = projects.count()
-    total_donations_made = donations.count()
+    donations = CursorPaginator(
+        Donation.objects.filter(user=user).select_related(
+            'project__category'
+        ).prefetch_related('project__images'),
+        PROFILE_DONATIONS_PER_PAGE, ('-created_at', '-pk'),
+    ).get_page(request.GET.get('donations_cursor'), request.GET, param='donations_cursor')
     
     context = {
         'user': user,
         'projects': projects,
         'donations': donations,
-        'total_donated': total_donated,
-        'total_projects_created': total_projects_created,
-        'total_donations_made': total_donations_made,
+        'stats': stats,
+        'total_donated': stats.total_donated,
+        'total_projects_created': stats.projects_created,
+        'total_donations_made': stats.donation_count,
+        'total_projects_backed': stats.projects_backed,
     }
     
     return render(request, "accounts/profile.html", context)
@@ -127,14 +152,25 @@ def delete_account(request):
             messages.error(request, 'Incorrect password. Please try again.')
             return redirect('accounts:profile')
         
-        # Logout user first
-        logout(request)
+        # Deactivate the account now and free its email and username for a
+        # new account; the cascading delete runs in the task worker
+        user.is_active = False
+        user.email = f'deleted-{user.pk}@deleted.invalid'
+        user.username = f'deleted-{user.pk}'
+        user.set_unusable_password()
+        user.save(update_fields=['is_active', 'email', 'username', 'password'])
+        delete_user.enqueue(user.pk)
         
-        # Delete user account
-        user.delete()
+        # Logout user
+        logout(request)
         
-        messages.success(request, 'Your account has been permanently deleted.')
+        messages.success(request, 'Your account has been deleted.')
         return redirect('accounts:register')
     else:
         messages.error(request, 'Account deletion cancelled.')
         return redirect('accounts:profile')
+
+@staff_member_required
+def hashing_metrics_view(request):
+    """Password hashing pool metrics of this process, to size the pool"""
+    return JsonResponse(hashing_metrics())
@@ -1,206 +1,431 @@
-from django.contrib import admin
-from django.utils.html import format_html
-from django.urls import reverse
-from django.utils.safestring import mark_safe
-from .models import (
-    Category, Tag, Project, ProjectImage, Comment, 
-    Rating, Donation, Report
-)
-
-@admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'icon', 'color', 'project_count', 'is_active', 'created_at']
-    list_filter = ['is_active', 'created_at']
-    search_fields = ['name', 'description']
-    list_editable = ['is_active']
-    ordering = ['name']
-    
-    def project_count(self, obj):
-        return obj.projects.count()
-    project_count.short_description = 'Projects'
-
-@admin.register(Tag)
-class TagAdmin(admin.ModelAdmin):
-    list_display = ['name', 'color', 'project_count', 'created_at']
-    search_fields = ['name']
-    ordering = ['name']
-    
-    def project_count(self, obj):
-        return obj.projects.count()
-    project_count.short_description = 'Projects'
-
-class ProjectImageInline(admin.TabularInline):
-    model = ProjectImage
-    extra = 1
-    fields = ['image', 'caption', 'is_primary', 'order']
-
-@admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
-    list_display = [
-        'title', 'creator', 'category', 'status', 'progress_bar', 
-        'total_target', 'current_amount', 'days_remaining', 
-        'average_rating', 'is_featured', 'is_approved', 'created_at'
-    ]
-    list_filter = [
-        'status', 'category', 'is_featured', 'is_approved', 
-        'created_at', 'start_date', 'end_date'
-    ]
-    search_fields = ['title', 'details', 'creator__username', 'creator__email']
-    list_editable = ['status', 'is_featured', 'is_approved']
-    readonly_fields = [
-        'current_amount', 'progress_percentage', 'days_remaining', 
-        'average_rating', 'total_ratings', 'created_at', 'updated_at'
-    ]
-    filter_horizontal = ['tags']
-    date_hierarchy = 'created_at'
-    inlines = [ProjectImageInline]
-    
-    fieldsets = (
-        ('Basic Information', {
-            'fields': ('title', 'slug', 'details', 'category', 'tags', 'creator')
-        }),
-        ('Financial', {
-            'fields': ('total_target', 'current_amount', 'progress_percentage')
-        }),
-        ('Timeline', {
-            'fields': ('start_date', 'end_date', 'days_remaining')
-        }),
-        ('Status & Approval', {
-            'fields': ('status', 'is_featured', 'is_approved', 'approved_at', 'approved_by')
-        }),
-        ('Ratings', {
-            'fields': ('average_rating', 'total_ratings')
-        }),
-        ('Metadata', {
-            'fields': ('created_at', 'updated_at'),
-            'classes': ('collapse',)
-        }),
-    )
-    
-    def progress_bar(self, obj):
-        percentage = obj.progress_percentage
-        color = 'success' if percentage >= 100 else 'warning' if percentage >= 50 else 'danger'
-        return format_html(
-            '<div class="progress" style="width: 100px; height: 20px;">'
-            '<div class="progress-bar bg-{}" style="width: {}%">{}%</div>'
-            '</div>',
-            color, percentage, f"{percentage:.1f}"
-        )
-    progress_bar.short_description = 'Progress'
-    
-    def days_remaining(self, obj):
-        days = obj.days_remaining
-        if days == 0:
-            return format_html('<span class="badge bg-danger">Ended</span>')
-        elif days <= 7:
-            return format_html('<span class="badge bg-warning">{} days</span>', days)
-        else:
-            return format_html('<span class="badge bg-success">{} days</span>', days)
-    days_remaining.short_description = 'Days Left'
-    
-    def average_rating(self, obj):
-        rating = obj.average_rating
-        if rating == 0:
-            return 'No ratings'
-        stars = '★' * int(rating) + '☆' * (5 - int(rating))
-        return format_html('{} ({:.1f}/5)', stars, rating)
-    average_rating.short_description = 'Rating'
-
-@admin.register(ProjectImage)
-class ProjectImageAdmin(admin.ModelAdmin):
-    list_display = ['project', 'image_preview', 'caption', 'is_primary', 'order', 'created_at']
-    list_filter = ['is_primary', 'created_at']
-    search_fields = ['project__title', 'caption']
-    list_editable = ['order', 'is_primary']
-    ordering = ['project', 'order']
-    
-    def image_preview(self, obj):
-        if obj.image:
-            return format_html(
-                '<img src="{}" style="max-height: 50px; max-width: 50px;" />',
-                obj.image.url
-            )
-        return 'No image'
-    image_preview.short_description = 'Preview'
-
-@admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
-    list_display = [
-        'project', 'user', 'content_preview', 'is_reply', 'parent', 
-        'is_approved', 'reply_count', 'created_at'
-    ]
-    list_filter = ['is_approved', 'created_at']
-    search_fields = ['content', 'user__username', 'project__title']
-    list_editable = ['is_approved']
-    readonly_fields = ['reply_count', 'created_at', 'updated_at']
-    
-    def content_preview(self, obj):
-        return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
-    content_preview.short_description = 'Content'
-    
-    def is_reply(self, obj):
-        return obj.parent is not None
-    is_reply.boolean = True
-    is_reply.short_description = 'Reply'
-
-@admin.register(Rating)
-class RatingAdmin(admin.ModelAdmin):
-    list_display = ['project', 'user', 'rating', 'review_preview', 'created_at']
-    list_filter = ['rating', 'created_at']
-    search_fields = ['user__username', 'project__title', 'review']
-    readonly_fields = ['created_at', 'updated_at']
-    
-    def review_preview(self, obj):
-        if obj.review:
-            return obj.review[:100] + '...' if len(obj.review) > 100 else obj.review
-        return 'No review'
-    review_preview.short_description = 'Review'
-
-@admin.register(Donation)
-class DonationAdmin(admin.ModelAdmin):
-    list_display = [
-        'project', 'user', 'amount', 'message_preview', 
-        'is_anonymous', 'created_at'
-    ]
-    list_filter = ['is_anonymous', 'created_at']
-    search_fields = ['user__username', 'project__title', 'message']
-    readonly_fields = ['created_at']
-    
-    def message_preview(self, obj):
-        if obj.message:
-            return obj.message[:100] + '...' if len(obj.message) > 100 else obj.message
-        return 'No message'
-    message_preview.short_description = 'Message'
-
-@admin.register(Report)
-class ReportAdmin(admin.ModelAdmin):
-    list_display = [
-        'reporter', 'report_type', 'project_or_comment', 'reason', 
-        'is_resolved', 'resolved_by', 'created_at'
-    ]
-    list_filter = ['report_type', 'reason', 'is_resolved', 'created_at']
-    search_fields = ['reporter__username', 'description']
-    list_editable = ['is_resolved']
-    readonly_fields = ['created_at']
-    
-    def project_or_comment(self, obj):
-        if obj.report_type == 'project' and obj.project:
-            return format_html(
-                '<a href="{}">{}</a>',
-                reverse('admin:crowdfunding_projects_project_change', args=[obj.project.pk]),
-                obj.project.title
-            )
-        elif obj.report_type == 'comment' and obj.comment:
-            return format_html(
-                '<a href="{}">Comment on {}</a>',
-                reverse('admin:crowdfunding_projects_comment_change', args=[obj.comment.pk]),
-                obj.comment.project.title
-            )
-        return 'N/A'
-    project_or_comment.short_description = 'Reported Item'
-    
-    def resolved_by(self, obj):
-        if obj.resolved_by:
-            return obj.resolved_by.username
-        return '-'
-    resolved_by.short_description = 'Resolved By'
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, Q
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.utils.html import format_html
+from django.urls import path, reverse
+from django.utils.safestring import mark_safe
+from django.utils import timezone
+from .models import (
+    Category, Tag, Project, ProjectImage, Comment, 
+    Rating, Donation, Report, Task
+)
+from .moderation import (
+    approve_comments, approve_projects, feature_projects, hide_comments, hide_projects,
+    load_queue_items, moderation_queue, resolve_reports, resolve_reports_about,
+)
+from .pagination import EstimatedCountPaginator
+from .ratings import average_rating_expression
+
+MODERATION_QUEUE_PER_PAGE = 50
+
+
+def is_autocomplete(request):
+    """Whether ``request`` is a change form's autocomplete lookup"""
+    match = getattr(request, 'resolver_match', None)
+    return match is not None and match.url_name == 'autocomplete'
+
+
+def prefix_range(field, term):
+    """
+    ``field`` starting with ``term`` as a range on the column: SQLite can't
+    use an index for ``LIKE 'term%'`` (case-insensitive) but can for this.
+    """
+    return Q(**{f'{field}__gte': term, f'{field}__lt': term + '\U0010ffff'})
+
+
+class IndexedAutocompleteMixin:
+    """
+    Autocomplete lookups search the indexed ``autocomplete_search_fields``
+    by prefix (as typed, lowercased or capitalized), or the primary key for
+    a number, in the order of the first field's index. When no row matches
+    that way (other capitalizations, the middle of an email address) they
+    fall back to the ``search_fields`` substring search, which the
+    changelist search always uses.
+    """
+    autocomplete_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        if not is_autocomplete(request):
+            return super().get_search_results(request, queryset, search_term)
+        term = search_term.strip()
+        if self.autocomplete_search_fields:
+            queryset = queryset.order_by(self.autocomplete_search_fields[0], 'pk')
+        if not term:
+            return queryset, False
+        condition = Q()
+        for field in self.autocomplete_search_fields:
+            for prefix in {term, term.lower(), term.capitalize()}:
+                condition |= prefix_range(field, prefix)
+        if term.isdigit():
+            condition |= Q(pk=int(term))
+        results = queryset.filter(condition)
+        if results.exists():
+            return results, False
+        return super().get_search_results(request, queryset, search_term)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist of a table that keeps growing: the page count is estimated
+    when unfiltered, and the "N total" link's second COUNT(*) is skipped.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Rows only go in the cascade of a (rare) account or project delete, so
+    # the largest id is close to the row count (see pagination.py)
+    append_only = True
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page, append_only=self.append_only
+        )
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ['name', 'icon', 'color', 'project_count', 'is_active', 'created_at']
+    list_filter = ['is_active', 'created_at']
+    search_fields = ['name', 'description']
+    list_editable = ['is_active']
+    ordering = ['name']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(project_total=Count('projects'))
+    
+    def project_count(self, obj):
+        return obj.project_total
+    project_count.short_description = 'Projects'
+    project_count.admin_order_field = 'project_total'
+
+@admin.register(Tag)
+class TagAdmin(IndexedAutocompleteMixin, admin.ModelAdmin):
+    list_display = ['name', 'color', 'project_count', 'created_at']
+    search_fields = ['name']
+    autocomplete_search_fields = ['name']
+    ordering = ['name']
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if is_autocomplete(request):
+            return queryset
+        return queryset.annotate(project_total=Count('projects'))
+    
+    def project_count(self, obj):
+        return obj.project_total
+    project_count.short_description = 'Projects'
+    project_count.admin_order_field = 'project_total'
+
+class ProjectImageInline(admin.TabularInline):
+    model = ProjectImage
+    extra = 1
+    fields = ['image', 'caption', 'is_primary', 'order']
+
+@admin.register(Project)
+class ProjectAdmin(IndexedAutocompleteMixin, LargeTableAdmin):
+    list_display = [
+        'title', 'creator', 'category', 'status', 'progress_bar', 
+        'total_target', 'current_amount', 'days_remaining', 
+        'average_rating', 'is_featured', 'is_approved', 'created_at'
+    ]
+    list_filter = [
+        'status', 'category', 'is_featured', 'is_approved', 
+        'created_at', 'start_date', 'end_date'
+    ]
+    search_fields = ['title', 'details', 'creator__username', 'creator__email']
+    autocomplete_search_fields = ['title', 'slug']
+    autocomplete_fields = ['creator', 'approved_by', 'tags']
+    list_select_related = ['creator', 'category']
+    list_editable = ['status']
+    actions = ['approve_selected', 'hide_selected', 'feature_selected', 'unfeature_selected']
+    readonly_fields = [
+        'current_amount', 'progress_percentage', 'days_remaining', 
+        'average_rating', 'total_ratings', 'created_at', 'updated_at'
+    ]
+    date_hierarchy = 'created_at'
+    inlines = [ProjectImageInline]
+    
+    fieldsets = (
+        ('Basic Information', {
+            'fields': ('title', 'slug', 'details', 'category', 'tags', 'creator')
+        }),
+        ('Financial', {
+            'fields': ('total_target', 'current_amount', 'progress_percentage')
+        }),
+        ('Timeline', {
+            'fields': ('start_date', 'end_date', 'days_remaining')
+        }),
+        ('Status & Approval', {
+            'fields': ('status', 'is_featured', 'is_approved', 'approved_at', 'approved_by')
+        }),
+        ('Ratings', {
+            'fields': ('average_rating', 'total_ratings')
+        }),
+        ('Metadata', {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+    
+    def progress_bar(self, obj):
+        percentage = obj.progress_percentage
+        color = 'success' if percentage >= 100 else 'warning' if percentage >= 50 else 'danger'
+        return format_html(
+            '<div class="progress" style="width: 100px; height: 20px;">'
+            '<div class="progress-bar bg-{}" style="width: {}%">{}%</div>'
+            '</div>',
+            color, percentage, f"{percentage:.1f}"
+        )
+    progress_bar.short_description = 'Progress'
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if is_autocomplete(request):
+            return queryset
+        return queryset.annotate(avg_rating=average_rating_expression())
+    
+    def save_model(self, request, obj, form, change):
+        if obj.is_approved and obj.approved_at is None:
+            obj.approved_by = obj.approved_by or request.user
+            obj.approved_at = timezone.now()
+        elif not obj.is_approved:
+            # Same as hide_projects()
+            obj.approved_by = None
+            obj.approved_at = None
+        super().save_model(request, obj, form, change)
+    
+    def approve_selected(self, request, queryset):
+        updated = approve_projects(queryset, request.user)
+        self.message_user(request, f'{updated} project(s) approved.')
+    approve_selected.short_description = 'Approve selected projects'
+    
+    def hide_selected(self, request, queryset):
+        updated = hide_projects(queryset)
+        self.message_user(request, f'{updated} project(s) hidden.')
+    hide_selected.short_description = 'Hide selected projects'
+    
+    def feature_selected(self, request, queryset):
+        updated = feature_projects(queryset)
+        self.message_user(request, f'{updated} project(s) featured.')
+    feature_selected.short_description = 'Feature selected projects'
+    
+    def unfeature_selected(self, request, queryset):
+        updated = feature_projects(queryset, featured=False)
+        self.message_user(request, f'{updated} project(s) no longer featured.')
+    unfeature_selected.short_description = 'Stop featuring selected projects'
+    
+    def days_remaining(self, obj):
+        days = obj.days_remaining
+        if days == 0:
+            return format_html('<span class="badge bg-danger">Ended</span>')
+        elif days <= 7:
+            return format_html('<span class="badge bg-warning">{} days</span>', days)
+        else:
+            return format_html('<span class="badge bg-success">{} days</span>', days)
+    days_remaining.short_description = 'Days Left'
+    
+    def average_rating(self, obj):
+        rating = obj.average_rating
+        if rating == 0:
+            return 'No ratings'
+        stars = '★' * int(rating) + '☆' * (5 - int(rating))
+        return format_html('{} ({}/5)', stars, f"{rating:.1f}")
+    average_rating.short_description = 'Rating'
+    average_rating.admin_order_field = 'avg_rating'
+
+@admin.register(ProjectImage)
+class ProjectImageAdmin(LargeTableAdmin):
+    list_display = ['project', 'image_preview', 'caption', 'is_primary', 'order', 'created_at']
+    list_filter = ['is_primary', 'created_at']
+    search_fields = ['project__title', 'caption']
+    list_select_related = ['project']
+    autocomplete_fields = ['project']
+    list_editable = ['order', 'is_primary']
+    ordering = ['project', 'order']
+    
+    def image_preview(self, obj):
+        if obj.image:
+            return format_html(
+                '<img src="{}" style="max-height: 50px; max-width: 50px;" />',
+                obj.variant_url('thumb')
+            )
+        return 'No image'
+    image_preview.short_description = 'Preview'
+
+@admin.register(Comment)
+class CommentAdmin(IndexedAutocompleteMixin, LargeTableAdmin):
+    list_display = [
+        'project', 'user', 'content_preview', 'is_reply', 'parent', 
+        'is_approved', 'reply_count', 'created_at'
+    ]
+    list_filter = ['is_approved', 'created_at']
+    search_fields = ['content', 'user__username', 'project__title']
+    autocomplete_search_fields = ['project__title']
+    autocomplete_fields = ['project', 'user', 'parent']
+    list_select_related = ['project', 'user', 'parent__user', 'parent__project']
+    actions = ['approve_selected', 'hide_selected']
+    readonly_fields = ['reply_count', 'created_at', 'updated_at']
+    
+    def content_preview(self, obj):
+        return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
+    content_preview.short_description = 'Content'
+    
+    def is_reply(self, obj):
+        return obj.parent_id is not None
+    is_reply.boolean = True
+    is_reply.short_description = 'Reply'
+    
+    def approve_selected(self, request, queryset):
+        updated = approve_comments(queryset)
+        self.message_user(request, f'{updated} comment(s) approved.')
+    approve_selected.short_description = 'Approve selected comments'
+    
+    def hide_selected(self, request, queryset):
+        updated = hide_comments(queryset)
+        self.message_user(request, f'{updated} comment(s) hidden.')
+    hide_selected.short_description = 'Hide selected comments'
+
+@admin.register(Rating)
+class RatingAdmin(LargeTableAdmin):
+    list_display = ['project', 'user', 'rating', 'review_preview', 'created_at']
+    list_filter = ['rating', 'created_at']
+    search_fields = ['user__username', 'project__title', 'review']
+    autocomplete_fields = ['project', 'user']
+    list_select_related = ['project', 'user']
+    readonly_fields = ['created_at', 'updated_at']
+    
+    def review_preview(self, obj):
+        if obj.review:
+            return obj.review[:100] + '...' if len(obj.review) > 100 else obj.review
+        return 'No review'
+    review_preview.short_description = 'Review'
+
+@admin.register(Donation)
+class DonationAdmin(LargeTableAdmin):
+    list_display = [
+        'project', 'user', 'amount', 'message_preview', 
+        'is_anonymous', 'created_at'
+    ]
+    list_filter = ['is_anonymous', 'created_at']
+    search_fields = ['user__username', 'project__title', 'message']
+    autocomplete_fields = ['project', 'user']
+    list_select_related = ['project', 'user']
+    readonly_fields = ['created_at']
+    
+    def get_readonly_fields(self, request, obj=None):
+        # Ledger entries are append-only once recorded
+        if obj is not None:
+            return self.readonly_fields + ['project', 'user', 'amount']
+        return self.readonly_fields
+    
+    def message_preview(self, obj):
+        if obj.message:
+            return obj.message[:100] + '...' if len(obj.message) > 100 else obj.message
+        return 'No message'
+    message_preview.short_description = 'Message'
+
+@admin.register(Report)
+class ReportAdmin(LargeTableAdmin):
+    list_display = [
+        'reporter', 'report_type', 'project_or_comment', 'reason', 
+        'is_resolved', 'resolved_by', 'created_at'
+    ]
+    list_filter = ['report_type', 'reason', 'is_resolved', 'created_at']
+    search_fields = ['reporter__username', 'description']
+    autocomplete_fields = ['reporter', 'project', 'comment', 'resolved_by']
+    list_select_related = ['reporter', 'project', 'comment__project', 'resolved_by']
+    readonly_fields = ['created_at']
+    actions = ['resolve_selected']
+    
+    def project_or_comment(self, obj):
+        if obj.report_type == 'project' and obj.project:
+            return format_html(
+                '<a href="{}">{}</a>',
+                reverse('admin:crowdfunding_projects_project_change', args=[obj.project.pk]),
+                obj.project.title
+            )
+        elif obj.report_type == 'comment' and obj.comment:
+            return format_html(
+                '<a href="{}">Comment on {}</a>',
+                reverse('admin:crowdfunding_projects_comment_change', args=[obj.comment.pk]),
+                obj.comment.project.title
+            )
+        return 'N/A'
+    project_or_comment.short_description = 'Reported Item'
+    
+    def resolved_by(self, obj):
+        if obj.resolved_by:
+            return obj.resolved_by.username
+        return '-'
+    resolved_by.short_description = 'Resolved By'
+    
+    def save_model(self, request, obj, form, change):
+        if obj.is_resolved and obj.resolved_at is None:
+            obj.resolved_by = obj.resolved_by or request.user
+            obj.resolved_at = timezone.now()
+        super().save_model(request, obj, form, change)
+    
+    def resolve_selected(self, request, queryset):
+        updated = resolve_reports(queryset, request.user)
+        self.message_user(request, f'{updated} report(s) resolved.')
+    resolve_selected.short_description = 'Resolve selected reports'
+    
+    def get_urls(self):
+        return [
+            path(
+                'moderation-queue/',
+                self.admin_site.admin_view(self.moderation_queue_view),
+                name='crowdfunding_projects_report_moderation_queue',
+            ),
+        ] + super().get_urls()
+    
+    def moderation_queue_view(self, request):
+        """Reported projects and comments, most open reports first"""
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        if request.method == 'POST':
+            project_ids, comment_ids = [], []
+            for item in request.POST.getlist('item'):
+                kind, _, pk = item.partition(':')
+                if pk.isdigit():
+                    (project_ids if kind == 'project' else comment_ids).append(int(pk))
+            with transaction.atomic():
+                hidden = 0
+                if request.POST.get('action') == 'hide':
+                    hidden = hide_projects(Project.objects.filter(pk__in=project_ids))
+                    hidden += hide_comments(Comment.objects.filter(pk__in=comment_ids))
+                resolved = resolve_reports_about(request.user, project_ids, comment_ids)
+            self.message_user(request, f'{hidden} item(s) hidden, {resolved} report(s) resolved.')
+            return redirect(request.get_full_path())
+        
+        page = Paginator(moderation_queue(), MODERATION_QUEUE_PER_PAGE).get_page(request.GET.get('page'))
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Moderation queue',
+            'page_obj': page,
+            'rows': load_queue_items(page),
+        }
+        return TemplateResponse(request, 'admin/crowdfunding_projects/report/moderation_queue.html', context)
+
+@admin.register(Task)
+class TaskAdmin(LargeTableAdmin):
+    list_display = [
+        'name', 'status', 'priority', 'attempts', 'max_attempts',
+        'run_after', 'duration_ms', 'created_at'
+    ]
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['locked_by', 'started_at', 'finished_at', 'duration_ms', 'last_error', 'created_at']
+    # Finished tasks are purged (purge_tasks)
+    append_only = False
+    actions = ['retry_tasks']
+    
+    def retry_tasks(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='pending', attempts=0, run_after=timezone.now(), last_error=''
+        )
+        self.message_user(request, f'{updated} task(s) queued again.')
+    retry_tasks.short_description = 'Run selected tasks again'
@@ -0,0 +1,176 @@
+"""
+Read-only JSON API for the mobile app.
+
+The views are ``async def`` and use the async ORM (``afirst``, ``async for``),
+so under the ASGI entry point (``crowdfunding/asgi.py``) a client polling
+progress does not hold a worker thread while it waits on the database. Code
+that is only available synchronously (form validation, the cursor paginator,
+the comment loader) runs through ``sync_to_async``.
+
+Every endpoint accepts ``?fields=a,b`` to pick the serialized fields (see
+``serializers.py``). Lists are keyset paginated: follow ``next_cursor``.
+Pending projects are visible to their creator only, as on ``project_detail``.
+"""
+from asgiref.sync import sync_to_async
+from django.db.models import Count
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .comments import load_comment_threads
+from .forms import ProjectSearchForm
+from .models import Project, Rating
+from .pagination import CursorPaginator, ordering_for
+from .ratings import average_rating_expression
+from .search import filter_projects
+from .serializers import (
+    CommentSerializer, InvalidFields, ProgressSerializer,
+    ProjectDetailSerializer, ProjectSerializer,
+)
+
+API_PAGE_SIZE = 12
+API_MAX_PAGE_SIZE = 50
+
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _not_found():
+    return _error('Project not found or not approved yet.', 404)
+
+
+def _page_size(request):
+    try:
+        per_page = int(request.GET.get('per_page', API_PAGE_SIZE))
+    except ValueError:
+        return API_PAGE_SIZE
+    return max(1, min(per_page, API_MAX_PAGE_SIZE))
+
+
+async def _visible_project(request, queryset, slug):
+    """The project with ``slug`` if the requesting user may see it"""
+    project = await queryset.filter(slug=slug).afirst()
+    if project is None:
+        return None
+    if not project.is_approved:
+        user = await request.auser()
+        if user.pk != project.creator_id:
+            return None
+    return project
+
+
+@require_GET
+async def project_list(request):
+    """Approved projects with the listing filters, sort and a cursor"""
+    try:
+        serializer = ProjectSerializer(request.GET.get('fields'))
+    except InvalidFields as exc:
+        return _error(str(exc), 400)
+
+    projects = Project.objects.filter(is_approved=True, status__in=['active', 'funded'])
+    sort_by = request.GET.get('sort', '-created_at')
+    filters = request.GET.copy()
+    filters.setdefault('search_type', 'all')
+    search_form = ProjectSearchForm(filters)
+    if not await sync_to_async(search_form.is_valid)():
+        return JsonResponse({'error': 'Invalid filters.', 'fields': search_form.errors}, status=400)
+    projects = filter_projects(projects, search_form.cleaned_data, sort_by)
+    if sort_by == 'rating':
+        projects = projects.annotate(avg_rating=average_rating_expression())
+
+    paginator = CursorPaginator(
+        serializer.prepare(projects), _page_size(request), ordering_for(projects, sort_by)
+    )
+    page = await paginator.aget_page(request.GET.get('cursor'))
+    return JsonResponse({
+        'results': serializer.many(page),
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+@require_GET
+async def project_detail(request, slug):
+    try:
+        serializer = ProjectDetailSerializer(request.GET.get('fields'))
+    except InvalidFields as exc:
+        return _error(str(exc), 400)
+
+    project = await _visible_project(request, serializer.prepare(Project.objects.all()), slug)
+    if project is None:
+        return _not_found()
+    return JsonResponse(serializer.to_dict(project))
+
+
+@require_GET
+async def project_comments(request, slug):
+    """One page of approved comments, each with its newest replies"""
+    try:
+        serializer = CommentSerializer(request.GET.get('fields'))
+    except InvalidFields as exc:
+        return _error(str(exc), 400)
+
+    project = await _visible_project(request, Project.objects.only('id', 'is_approved', 'creator_id'), slug)
+    if project is None:
+        return _not_found()
+
+    page = await sync_to_async(load_comment_threads)(
+        project, request.GET.get('cursor'), per_page=_page_size(request)
+    )
+    results = []
+    for comment in page:
+        data = serializer.to_dict(comment)
+        data['replies'] = serializer.many(comment.reply_preview)
+        data['replies_cursor'] = comment.replies_cursor
+        results.append(data)
+    return JsonResponse({
+        'results': results,
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+@require_GET
+async def project_ratings(request, slug):
+    """Average, count and per-star distribution of a project's ratings"""
+    project = await _visible_project(
+        request,
+        Project.objects.only('id', 'is_approved', 'creator_id', 'rating_sum', 'rating_count'),
+        slug,
+    )
+    if project is None:
+        return _not_found()
+
+    distribution = {str(stars): 0 for stars in range(1, 6)}
+    async for row in Rating.objects.filter(project=project).order_by().values(
+        'rating'
+    ).annotate(total=Count('pk')):
+        distribution[str(row['rating'])] = row['total']
+
+    data = {
+        'average_rating': round(project.average_rating, 2),
+        'total_ratings': project.total_ratings,
+        'distribution': distribution,
+    }
+    user = await request.auser()
+    if user.is_authenticated:
+        data['user_rating'] = await Rating.objects.filter(
+            project=project, user=user
+        ).values_list('rating', flat=True).afirst()
+    return JsonResponse(data)
+
+
+@require_GET
+async def project_progress(request, slug):
+    """Funding progress, cheap enough to poll"""
+    try:
+        serializer = ProgressSerializer(request.GET.get('fields'))
+    except InvalidFields as exc:
+        return _error(str(exc), 400)
+
+    project = await _visible_project(
+        request, Project.objects.only(*ProgressSerializer.columns), slug
+    )
+    if project is None:
+        return _not_found()
+    return JsonResponse(serializer.to_dict(project))
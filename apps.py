@@ -1,6 +1,17 @@
-from django.apps import AppConfig
-
-
-class CrowdfundingProjectsConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'crowdfunding_projects'
+from django.apps import AppConfig
+
+
+class CrowdfundingProjectsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'crowdfunding_projects'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .database import apply_pragmas
+        from .instrumentation import install_query_recorder, install_template_timer
+
+        install_template_timer()
+        connection_created.connect(apply_pragmas, dispatch_uid='crowdfunding_sqlite_pragmas')
+        connection_created.connect(install_query_recorder, dispatch_uid='crowdfunding_query_recorder')
@@ -0,0 +1,218 @@
+"""
+Durable background tasks without an external broker.
+
+Functions decorated with ``@task`` can be queued with ``fn.enqueue(...)``.
+Queuing inserts a ``Task`` row in the caller's transaction, so a task exists
+exactly when the write that queued it committed. ``python manage.py run_tasks``
+claims ready rows (highest priority first) and runs them on a thread or
+process pool. Each attempt records its duration. A failing task is retried
+with exponential backoff until ``max_attempts`` is reached, and then left
+``failed`` with its traceback.
+
+Arguments must be JSON serializable: pass primary keys, not model instances.
+Task functions live in each app's ``tasks.py``, which the worker imports.
+
+With ``TASKS_RUN_INLINE = True`` queued tasks run in-process right after the
+commit instead, so no worker is needed (tests, local scripts).
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+TASKS_RUN_INLINE = getattr(settings, 'TASKS_RUN_INLINE', False)
+DEFAULT_MAX_ATTEMPTS = getattr(settings, 'TASKS_MAX_ATTEMPTS', 5)
+# Retry n waits RETRY_BACKOFF * 2 ** (n - 1) seconds, capped at RETRY_BACKOFF_MAX
+RETRY_BACKOFF = getattr(settings, 'TASKS_RETRY_BACKOFF', 10)
+RETRY_BACKOFF_MAX = getattr(settings, 'TASKS_RETRY_BACKOFF_MAX', 3600)
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+_registry = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+class TaskFunction:
+    """A registered task; calling it runs the function directly"""
+
+    def __init__(self, func, name, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, priority=None, delay=None, **kwargs):
+        return enqueue(
+            self.name, args, kwargs,
+            priority=self.priority if priority is None else priority,
+            delay=delay, max_attempts=self.max_attempts,
+        )
+
+
+def task(func=None, *, name=None, priority=0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Register ``func`` as a background task"""
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        wrapped = TaskFunction(func, task_name, priority, max_attempts)
+        _registry[task_name] = wrapped
+        return wrapped
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    if name not in _registry:
+        autodiscover_modules('tasks')
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownTask(name) from None
+
+
+def enqueue(name, args=(), kwargs=None, priority=0, delay=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Queue the task ``name``; returns the ``Task`` row (None when run inline)"""
+    from .models import Task
+
+    args, kwargs = list(args), dict(kwargs or {})
+    if TASKS_RUN_INLINE:
+        transaction.on_commit(lambda: _run_inline(name, args, kwargs))
+        return None
+    run_after = timezone.now() + timedelta(seconds=delay) if delay else timezone.now()
+    return Task.objects.create(
+        name=name, args=args, kwargs=kwargs, priority=priority,
+        max_attempts=max_attempts, run_after=run_after,
+    )
+
+
+def _run_inline(name, args, kwargs):
+    try:
+        get_task(name)(*args, **kwargs)
+    except Exception:
+        logger.exception('Task %s failed', name)
+
+
+def retry_delay(attempts):
+    return min(RETRY_BACKOFF * 2 ** max(attempts - 1, 0), RETRY_BACKOFF_MAX)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+# Worker side
+
+def claim_tasks(limit, worker=None):
+    """
+    Mark up to ``limit`` ready tasks as running for this worker and return
+    their ids. Each claim is a conditional UPDATE, so concurrent workers never
+    run the same task.
+    """
+    from .models import Task
+
+    now = timezone.now()
+    worker = worker or worker_id()
+    candidates = Task.objects.filter(status=PENDING, run_after__lte=now).order_by(
+        '-priority', 'run_after', 'pk'
+    ).values_list('pk', flat=True)[:limit * 2]
+    claimed = []
+    for pk in candidates:
+        if Task.objects.filter(pk=pk, status=PENDING).update(
+            status=RUNNING, locked_by=worker, started_at=now, attempts=F('attempts') + 1
+        ):
+            claimed.append(pk)
+            if len(claimed) >= limit:
+                break
+    return claimed
+
+
+def execute_task(task_id):
+    """Run one claimed task and record the outcome; returns the new status"""
+    from .models import Task
+
+    try:
+        task_row = Task.objects.get(pk=task_id)
+        started = time.perf_counter()
+        try:
+            get_task(task_row.name)(*task_row.args, **task_row.kwargs)
+        except Exception as exc:
+            duration_ms = (time.perf_counter() - started) * 1000
+            error = traceback.format_exc()
+            retry = not isinstance(exc, UnknownTask) and task_row.attempts < task_row.max_attempts
+            if retry:
+                status = PENDING
+                run_after = timezone.now() + timedelta(seconds=retry_delay(task_row.attempts))
+            else:
+                status, run_after = FAILED, task_row.run_after
+            logger.warning('Task %s #%s failed (attempt %s)', task_row.name, task_id, task_row.attempts)
+            Task.objects.filter(pk=task_id).update(
+                status=status, run_after=run_after, last_error=error, locked_by='',
+                finished_at=timezone.now(), duration_ms=duration_ms,
+            )
+            return status
+
+        Task.objects.filter(pk=task_id).update(
+            status=DONE, locked_by='', finished_at=timezone.now(),
+            duration_ms=(time.perf_counter() - started) * 1000,
+        )
+        return DONE
+    finally:
+        close_old_connections()
+
+
+def recover_stale_tasks(older_than=timedelta(minutes=30)):
+    """Requeue tasks left running by a worker that died"""
+    from .models import Task
+
+    return Task.objects.filter(
+        status=RUNNING, started_at__lt=timezone.now() - older_than
+    ).update(status=PENDING, locked_by='')
+
+
+def purge_tasks(older_than=timedelta(days=7)):
+    """Delete finished tasks (failed ones are kept for inspection)"""
+    from .models import Task
+
+    deleted, _ = Task.objects.filter(
+        status=DONE, finished_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
+
+
+def task_metrics(since=None):
+    """Per task name: counts by status and run time of the last attempts"""
+    from .models import Task
+
+    tasks = Task.objects.all()
+    if since is not None:
+        tasks = tasks.filter(created_at__gte=since)
+    return list(
+        tasks.order_by().values('name').annotate(
+            total=Count('pk'),
+            pending=Count('pk', filter=Q(status=PENDING)),
+            running=Count('pk', filter=Q(status=RUNNING)),
+            done=Count('pk', filter=Q(status=DONE)),
+            failed=Count('pk', filter=Q(status=FAILED)),
+            retried=Count('pk', filter=Q(attempts__gt=1)),
+            avg_ms=Avg('duration_ms'),
+            max_ms=Max('duration_ms'),
+        ).order_by('name')
+    )
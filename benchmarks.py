@@ -0,0 +1,290 @@
+"""
+View-level benchmarks.
+
+Each scenario is one request driven through the test client against a
+generated dataset (``generate_dataset``). For every scenario the suite
+records wall time, the number of queries, the time spent in SQL and the peak
+Python memory allocated while serving the request, and produces a JSON report
+per dataset scale. Reports can be compared with a saved baseline to catch
+slow-downs and query count regressions before they ship.
+
+Run it with ``python manage.py run_benchmarks`` (each scale is generated in a
+throwaway test database) or through the test suite (``tests.py``), which runs
+the smallest scale. Scenarios that write (the donation) run in a transaction
+that is rolled back, so ``--current-db`` leaves the data as it was.
+"""
+import io
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .instrumentation import record_queries
+
+# name -> generate_dataset options
+SCALES = {
+    'tiny': {
+        'users': 60, 'projects': 120, 'donations': 1500, 'ratings': 600,
+        'comments': 300, 'images': 0, 'categories': 6, 'tags': 20,
+    },
+    'small': {
+        'users': 400, 'projects': 800, 'donations': 20000, 'ratings': 6000,
+        'comments': 3000, 'images': 0, 'categories': 10, 'tags': 40,
+    },
+    'medium': {
+        'users': 2000, 'projects': 5000, 'donations': 200000, 'ratings': 40000,
+        'comments': 20000, 'images': 0, 'categories': 12, 'tags': 60,
+    },
+    'large': {
+        'users': 10000, 'projects': 25000, 'donations': 1000000, 'ratings': 150000,
+        'comments': 80000, 'images': 0, 'categories': 20, 'tags': 120,
+    },
+}
+DEFAULT_SCALES = ('tiny', 'small')
+
+LIST_SORTS = ('-created_at', 'relevance', 'rating', 'target', 'deadline')
+SEARCH_TYPES = ('title', 'tag', 'category', 'creator', 'details', 'all')
+SEARCH_TERM = 'solar'
+
+# Relative wall time increase reported as a regression
+DEFAULT_THRESHOLD = 0.25
+# Wall times under this many milliseconds are too noisy to compare
+MIN_COMPARABLE_MS = 5.0
+
+
+@dataclass
+class Scenario:
+    name: str
+    path: str
+    method: str = 'get'
+    data: dict = field(default_factory=dict)
+    user: object = None
+    # Clear the cache before every run (measures the uncached page)
+    cold: bool = False
+    expected_status: tuple = (200,)
+
+
+def _list_url(**params):
+    return f"{reverse('projects:project_list')}?{urlencode(params)}"
+
+
+def build_scenarios():
+    """The scenarios for the dataset currently in the database"""
+    from django.contrib.auth import get_user_model
+    from .models import Category, Project, Tag
+
+    visible = Project.objects.filter(is_approved=True, status__in=['active', 'funded'])
+    # The most donated project and the most active donor: the worst cases
+    hot_project = visible.filter(status='active').annotate(
+        donation_total=Count('donations')
+    ).order_by('-donation_total', 'pk').first()
+    donor = get_user_model().objects.annotate(
+        donation_total=Count('project_donations')
+    ).order_by('-donation_total', 'pk').first()
+    category = Category.objects.filter(is_active=True).order_by('pk').first()
+    tag = Tag.objects.annotate(project_total=Count('projects')).order_by('-project_total', 'pk').first()
+    if hot_project is None or donor is None or category is None or tag is None:
+        raise ValueError('The database has no data to benchmark; run generate_dataset first.')
+
+    scenarios = [
+        Scenario('homepage', reverse('homepage:homepage')),
+        Scenario('homepage_cold', reverse('homepage:homepage'), cold=True),
+    ]
+    for sort in LIST_SORTS:
+        scenarios.append(Scenario(f'project_list[sort={sort}]', _list_url(sort=sort)))
+    for search_type in SEARCH_TYPES:
+        scenarios.append(Scenario(
+            f'project_list[search={search_type}]',
+            _list_url(search_query=SEARCH_TERM, search_type=search_type, sort='relevance'),
+        ))
+    scenarios += [
+        Scenario('project_list[category]', _list_url(search_type='all', category=category.pk)),
+        Scenario('project_detail', reverse('projects:project_detail', args=[hot_project.slug])),
+        Scenario('project_detail[logged_in]',
+                 reverse('projects:project_detail', args=[hot_project.slug]), user=donor),
+        Scenario('search_results', f"{reverse('homepage:search_results')}?" + urlencode({
+            'search_query': SEARCH_TERM, 'search_type': 'all', 'sort': 'relevance',
+        })),
+        Scenario('category_explore', reverse('homepage:category_explore')),
+        Scenario('category_detail', reverse('projects:category_detail', args=[category.pk])),
+        Scenario('tag_detail', reverse('projects:tag_detail', args=[tag.pk])),
+        Scenario('profile_view', reverse('accounts:profile'), user=donor),
+        Scenario(
+            'add_donation', reverse('projects:add_donation', args=[hot_project.slug]),
+            method='post', data={'amount': '50', 'message': '', 'is_anonymous': ''},
+            user=donor, expected_status=(302,),
+        ),
+    ]
+    return scenarios
+
+
+@contextmanager
+def generated_dataset(scale, seed=42):
+    """Generate ``scale`` in a throwaway test database for the duration of the block"""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        call_command('generate_dataset', seed=seed, prefix='bench', stdout=io.StringIO(), **SCALES[scale])
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def _request(client, scenario):
+    if scenario.cold:
+        cache.clear()
+    if scenario.method == 'get':
+        return getattr(client, scenario.method)(scenario.path, scenario.data)
+    # Leave the data as it was (``--current-db`` runs on the real database)
+    with transaction.atomic():
+        response = getattr(client, scenario.method)(scenario.path, scenario.data)
+        transaction.set_rollback(True)
+    return response
+
+
+def measure(scenario, repeat=5, warmup=1):
+    """Serve ``scenario`` ``warmup + repeat`` times and summarise the measured runs"""
+    client = Client()
+    if scenario.user is not None:
+        client.force_login(scenario.user)
+
+    for _ in range(warmup):
+        _request(client, scenario)
+
+    wall, sql, queries = [], [], []
+    status = None
+    for _ in range(repeat):
+        with record_queries() as recorder:
+            started = time.perf_counter()
+            response = _request(client, scenario)
+            wall.append((time.perf_counter() - started) * 1000)
+        status = response.status_code
+        queries.append(recorder.count)
+        sql.append(recorder.duration * 1000)
+
+    # Tracing slows everything down: measure memory in a separate run
+    tracemalloc.start()
+    try:
+        _request(client, scenario)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': status,
+        'ok': status in scenario.expected_status,
+        'wall_ms': {
+            'median': round(statistics.median(wall), 3),
+            'min': round(min(wall), 3),
+            'max': round(max(wall), 3),
+        },
+        'queries': max(queries),
+        'sql_ms': round(statistics.median(sql), 3),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_scenarios(repeat=5, warmup=1, only=None):
+    """Measure every scenario against the current database"""
+    results = {}
+    for scenario in build_scenarios():
+        if only and not any(name in scenario.name for name in only):
+            continue
+        results[scenario.name] = measure(scenario, repeat=repeat, warmup=warmup)
+    return results
+
+
+def dataset_counts():
+    from django.contrib.auth import get_user_model
+    from .models import Comment, Donation, Project, Rating
+
+    return {
+        'users': get_user_model().objects.count(),
+        'projects': Project.objects.count(),
+        'donations': Donation.objects.count(),
+        'ratings': Rating.objects.count(),
+        'comments': Comment.objects.count(),
+    }
+
+
+def new_report(repeat):
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'scales': {},
+    }
+
+
+# Reports
+
+def save_report(report, path):
+    with open(path, 'w') as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+
+
+def load_report(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def compare_reports(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Differences between ``report`` and ``baseline`` for the scales and
+    scenarios both contain. Returns a list of
+    ``(scale, scenario, metric, before, after, is_regression)``; any increase
+    in the query count is a regression, wall and SQL time only past
+    ``threshold``.
+    """
+    changes = []
+    for scale, current in report['scales'].items():
+        previous = baseline.get('scales', {}).get(scale)
+        if not previous:
+            continue
+        for name, after in current['scenarios'].items():
+            before = previous['scenarios'].get(name)
+            if not before:
+                continue
+            if after['queries'] != before['queries']:
+                changes.append((
+                    scale, name, 'queries', before['queries'], after['queries'],
+                    after['queries'] > before['queries'],
+                ))
+            for metric, old, new in (
+                ('wall_ms', before['wall_ms']['median'], after['wall_ms']['median']),
+                ('sql_ms', before['sql_ms'], after['sql_ms']),
+            ):
+                if max(old, new) < MIN_COMPARABLE_MS:
+                    continue
+                ratio = new / old if old else float('inf')
+                if ratio > 1 + threshold or ratio < 1 - threshold:
+                    changes.append((scale, name, metric, old, new, ratio > 1 + threshold))
+            if after['ok'] != before['ok']:
+                changes.append((scale, name, 'status', before['status'], after['status'], not after['ok']))
+    return changes
+
+
+def format_results(scenarios):
+    lines = [f"{'scenario':<34} {'status':>6} {'wall ms':>9} {'queries':>8} {'sql ms':>8} {'peak kb':>9}"]
+    for name, result in scenarios.items():
+        lines.append(
+            f"{name:<34} {result['status']:>6} {result['wall_ms']['median']:>9.1f} "
+            f"{result['queries']:>8} {result['sql_ms']:>8.1f} {result['peak_kb']:>9.0f}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,130 @@
+"""
+Threaded comment loading.
+
+The project page shows one page of approved top-level comments, each with a
+preview of its newest approved replies. ``load_comment_threads`` fetches the
+page (keyset paginated, see ``pagination.py``) and the reply previews of all
+its comments in two queries, users included, and assembles the tree in
+memory. ``load_replies`` serves the "load more" requests for one comment.
+
+``Comment.reply_count`` is a stored count of approved replies maintained by
+``Comment.save`` and by the ``post_delete`` receiver in signals.py, which also
+runs for cascades (a replier's account being deleted) and queryset deletes;
+``recompute_reply_counts`` rebuilds it after bulk updates.
+``Project.comment_count``, the project's approved comments and replies shown
+on its page, is kept the same way (``apply_comment_delta`` and
+``recompute_comment_counts``).
+"""
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .grouping import group_rows, top_n_per_group
+from .pagination import CursorPaginator, NEXT
+
+COMMENTS_PER_PAGE = 10
+REPLIES_PREVIEW = 3
+REPLIES_PER_PAGE = 10
+COMMENT_ORDERING = ('-created_at', '-pk')
+
+
+def apply_reply_delta(comment_id, delta):
+    """Shift a comment's stored approved-reply count with one atomic UPDATE"""
+    from .models import Comment
+
+    if not comment_id or not delta:
+        return 0
+    return Comment.objects.filter(pk=comment_id).update(reply_count=F('reply_count') + delta)
+
+
+def recompute_reply_counts(comment_ids=None):
+    """Rebuild ``reply_count`` from the approved replies"""
+    from .models import Comment
+
+    counts = Comment.objects.filter(
+        parent=OuterRef('pk'), is_approved=True
+    ).order_by().values('parent').annotate(total=Count('pk')).values('total')
+    comments = Comment.objects.filter(parent__isnull=True)
+    if comment_ids is not None:
+        comments = comments.filter(pk__in=comment_ids)
+    with transaction.atomic():
+        return comments.update(
+            reply_count=Coalesce(Subquery(counts), Value(0), output_field=IntegerField())
+        )
+
+
+def apply_comment_delta(project_id, delta):
+    """Shift a project's stored approved-comment count with one atomic UPDATE"""
+    from .models import Project
+
+    if not project_id or not delta:
+        return 0
+    return Project.objects.filter(pk=project_id).update(comment_count=F('comment_count') + delta)
+
+
+def recompute_comment_counts(project_ids=None):
+    """Rebuild ``Project.comment_count`` from the approved comments"""
+    from .models import Comment, Project
+
+    counts = Comment.objects.filter(
+        project=OuterRef('pk'), is_approved=True
+    ).order_by().values('project').annotate(total=Count('pk')).values('total')
+    projects = Project.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+    with transaction.atomic():
+        return projects.update(
+            comment_count=Coalesce(Subquery(counts), Value(0), output_field=IntegerField())
+        )
+
+
+def approved_replies(parent_ids):
+    from .models import Comment
+
+    return Comment.objects.filter(
+        parent_id__in=parent_ids, is_approved=True
+    ).select_related('user')
+
+
+def _reply_paginator(parent_id, per_page=REPLIES_PER_PAGE):
+    return CursorPaginator(approved_replies([parent_id]), per_page, COMMENT_ORDERING)
+
+
+def load_comment_threads(project, cursor=None, query=None, per_page=COMMENTS_PER_PAGE,
+                         replies_preview=REPLIES_PREVIEW):
+    """
+    One page of approved top-level comments with their newest replies
+    attached as ``comment.reply_preview``. When a comment has more replies,
+    ``comment.replies_cursor`` continues after the preview.
+    """
+    from .models import Comment
+
+    top_level = Comment.objects.filter(
+        project=project, parent__isnull=True, is_approved=True
+    ).select_related('user')
+    page = CursorPaginator(top_level, per_page, COMMENT_ORDERING).get_page(
+        cursor, query, param='comments_cursor'
+    )
+
+    comments = list(page)
+    replies = []
+    if comments and replies_preview:
+        replies = top_n_per_group(
+            approved_replies([comment.pk for comment in comments]),
+            'parent_id', replies_preview, COMMENT_ORDERING,
+        )
+    previews = group_rows(replies, 'parent_id', keys=[comment.pk for comment in comments])
+
+    for comment in comments:
+        comment.reply_preview = previews[comment.pk]
+        comment.replies_cursor = None
+        if comment.reply_count > len(comment.reply_preview) and comment.reply_preview:
+            comment.replies_cursor = _reply_paginator(comment.pk).encode_cursor(
+                comment.reply_preview[-1], NEXT
+            )
+    return page
+
+
+def load_replies(comment, cursor=None, per_page=REPLIES_PER_PAGE):
+    """A page of approved replies to ``comment`` for "load more" requests"""
+    return _reply_paginator(comment.pk, per_page).get_page(cursor)
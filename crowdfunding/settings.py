@@ -1,158 +1,242 @@
-"""
-Django settings for crowdfunding project.
-
-Generated by 'django-admin startproject' using Django 5.2.5.
-
-For more information on this file, see
-https://docs.djangoproject.com/en/5.2/topics/settings/
-
-For the full list of settings and their values, see
-https://docs.djangoproject.com/en/5.2/ref/settings/
-"""
-
-from pathlib import Path
-
-# Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-
-# Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
-
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure--pxnze1e=cwe7%qcy7-ab(_t2yhke!!2nhanjx_)fr16)%=$(l'
-
-# SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
-
-ALLOWED_HOSTS = []
-
-
-# Application definition
-
-INSTALLED_APPS = [
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    'accounts',
-    'crowdfunding_projects',
-    'crowdfunding_homepage',
-    'home',
-    'projects',
-]
-
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
-
-ROOT_URLCONF = 'crowdfunding.urls'
-
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
-        },
-    },
-]
-
-WSGI_APPLICATION = 'crowdfunding.wsgi.application'
-
-
-# Database
-# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
-
-
-# Password validation
-# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
-
-AUTH_PASSWORD_VALIDATORS = [
-    {
-        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
-    },
-]
-
-
-# Internationalization
-# https://docs.djangoproject.com/en/5.2/topics/i18n/
-
-LANGUAGE_CODE = 'en-us'
-
-TIME_ZONE = 'UTC'
-
-USE_I18N = True
-
-USE_TZ = True
-
-
-# Static files (CSS, JavaScript, Images)
-# https://docs.djangoproject.com/en/5.2/howto/static-files/
-
-STATIC_URL = 'static/'
-
-# Default primary key field type
-# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
-
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-
-# Custom User Model
-AUTH_USER_MODEL = 'accounts.CustomUser'
-
-# Media files configuration
-MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
-
-# Email settings for development (console backend)
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
-DEFAULT_FROM_EMAIL = "noreply@crowdfunding.com"
-
-# Password reset timeout (24 hours in seconds)
-PASSWORD_RESET_TIMEOUT = 86400
-
-# Site name for password reset emails
-SITE_NAME = "Crowdfunding Platform"
-
-# Authentication backends
-AUTHENTICATION_BACKENDS = [
-    # 'accounts.backends.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
-]
-
-# For production, uncomment and configure these settings:
-# EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
-# EMAIL_HOST = "smtp.gmail.com"
-# EMAIL_PORT = 587
-# EMAIL_HOST_USER = "your-email@gmail.com"
-# EMAIL_HOST_PASSWORD = "your-app-password"
-# EMAIL_USE_TLS = True
+"""
+Django settings for crowdfunding project.
+
+Generated by 'django-admin startproject' using Django 5.2.5.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.2/ref/settings/
+"""
+
+from pathlib import Path
+
+from decouple import config
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure--pxnze1e=cwe7%qcy7-ab(_t2yhke!!2nhanjx_)fr16)%=$(l'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = []
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'accounts',
+    'crowdfunding_projects',
+    'crowdfunding_homepage',
+    'home',
+    'projects',
+]
+
+MIDDLEWARE = [
+    'crowdfunding_projects.instrumentation.RequestMetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'crowdfunding_projects.replica.ReplicaMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'crowdfunding.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'crowdfunding.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+
+# DATABASE_PROFILE=production (environment or .env) tunes SQLite for several
+# web workers: WAL lets reads run while a write commits, writers queue on the
+# lock for busy_timeout ms instead of failing with "database is locked", and
+# atomic blocks take the write lock up front (BEGIN IMMEDIATE), so two
+# transactions never deadlock upgrading from a read lock. Connections are kept
+# between requests. PRAGMAS are run on every new connection by
+# crowdfunding_projects.database.
+
+DATABASE_PROFILE = config('DATABASE_PROFILE', default='development')
+
+SQLITE_PRODUCTION_PROFILE = {
+    'CONN_MAX_AGE': config('DATABASE_CONN_MAX_AGE', default=600, cast=int),
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'transaction_mode': 'IMMEDIATE',
+    },
+    'PRAGMAS': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+        'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+        # Negative: size in KiB rather than pages
+        'cache_size': config('SQLITE_CACHE_SIZE', default=-64000, cast=int),
+        'temp_store': 'MEMORY',
+    },
+}
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': config('DATABASE_NAME', default=BASE_DIR / 'db.sqlite3'),
+        **(SQLITE_PRODUCTION_PROFILE if DATABASE_PROFILE == 'production' else {}),
+    }
+}
+
+# DATABASE_REPLICA=True serves public pages from a copy of the database,
+# refreshed by `python manage.py refresh_replica --interval 5` (see
+# crowdfunding_projects/replica.py).
+
+if config('DATABASE_REPLICA', default=False, cast=bool):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': config('DATABASE_REPLICA_NAME', default=BASE_DIR / 'db.replica.sqlite3'),
+        'PRAGMAS': {**DATABASES['default'].get('PRAGMAS', {}), 'query_only': 'ON'},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['crowdfunding_projects.replica.ReplicaRouter']
+    # Seconds after a refresh before the replica counts as stale
+    REPLICA_MAX_LAG = config('REPLICA_MAX_LAG', default=60, cast=int)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Homepage sections are cached and invalidated by signals, so every worker
+# process must share one cache in production (e.g. Redis or Memcached).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'crowdfunding',
+    }
+}
+
+# Background tasks (search indexing, emails, account deletion) are stored in
+# the database and run by `python manage.py run_tasks`. Set TASKS_RUN_INLINE
+# to True to run them in the web process right after each commit instead.
+
+TASKS_RUN_INLINE = False
+
+# Per-request query counts and timings are logged by RequestMetricsMiddleware
+# and sent in a Server-Timing header. Requests running more queries than
+# their URL's budget are logged as warnings (QUERY_BUDGET_ACTION = 'raise'
+# turns them into errors).
+
+QUERY_BUDGETS = {
+    'homepage:homepage': 20,
+    'homepage:search_results': 10,
+    'homepage:category_explore': 6,
+    'projects:project_list': 10,
+    'projects:project_detail': 15,
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
+
+STATIC_URL = 'static/'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Custom User Model
+AUTH_USER_MODEL = 'accounts.CustomUser'
+
+# Media files configuration
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Email settings for development (console backend)
+EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+DEFAULT_FROM_EMAIL = "noreply@crowdfunding.com"
+
+# Password reset timeout (24 hours in seconds)
+PASSWORD_RESET_TIMEOUT = 86400
+
+# Site name for password reset emails
+SITE_NAME = "Crowdfunding Platform"
+
+# Authentication backends
+# The user of each request is loaded from the cache (accounts/backends.py)
+AUTHENTICATION_BACKENDS = [
+    # 'accounts.backends.EmailBackend',
+    'accounts.backends.CachedModelBackend',
+]
+
+# Sessions are read from the cache and written through to the database, so
+# an authenticated request needs no query before the view runs
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# For production, uncomment and configure these settings:
+# EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# EMAIL_HOST = "smtp.gmail.com"
+# EMAIL_PORT = 587
+# EMAIL_HOST_USER = "your-email@gmail.com"
+# EMAIL_HOST_PASSWORD = "your-app-password"
+# EMAIL_USE_TLS = True
@@ -1,6 +1,9 @@
-from django.apps import AppConfig
-
-
-class CrowdfundingHomepageConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'crowdfunding_homepage'
+from django.apps import AppConfig
+
+
+class CrowdfundingHomepageConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'crowdfunding_homepage'
+
+    def ready(self):
+        from . import signals  # noqa: F401
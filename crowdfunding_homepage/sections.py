@@ -0,0 +1,266 @@
+"""
+Cached homepage sections.
+
+Every homepage block is built by its own function and cached independently
+under a versioned key (``homepage:<section>:v<version>``). Writes bump the
+version of exactly the sections they affect (see ``signals.py``), so stale
+entries are never read again and simply expire. Time-based sections also
+carry a short TTL so they roll forward without any write.
+
+A rebuild is guarded by a short-lived lock so that concurrent misses do not
+all hit the database: the first request rebuilds, the others serve the last
+good copy of the section (or wait briefly for the rebuild when there is none).
+
+Cached values are fully evaluated lists with their related objects already
+loaded, so rendering a cached homepage runs no queries.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from crowdfunding_projects.models import Category, Project, Tag
+from crowdfunding_projects.ratings import average_rating_expression
+from crowdfunding_projects.replica import primary
+from crowdfunding_projects.trending import trending_projects
+
+KEY_PREFIX = 'homepage'
+
+# Seconds a section stays cached when nothing invalidates it
+DEFAULT_TIMEOUTS = {
+    'top_rated_projects': 3600,
+    'latest_projects': 3600,
+    'featured_projects': 3600,
+    'trending_projects': 300,
+    'ending_soon': 300,
+    'categories': 3600,
+    'popular_tags': 3600,
+}
+SECTION_TIMEOUTS = {**DEFAULT_TIMEOUTS, **getattr(settings, 'HOMEPAGE_CACHE_TIMEOUTS', {})}
+
+# Sections whose items are projects (invalidated when one of them changes)
+PROJECT_SECTIONS = [
+    'top_rated_projects', 'latest_projects', 'featured_projects',
+    'trending_projects', 'ending_soon',
+]
+
+# Project fields deciding which projects the project sections list, and in
+# which order; a change may move any project in or out of them
+PROJECT_LISTING_FIELDS = {
+    'is_approved', 'status', 'is_featured', 'created_at', 'end_date', 'rating_sum', 'rating_count',
+}
+# Project fields shown on the cards; a change only affects the sections
+# showing that project
+PROJECT_CARD_FIELDS = {'title', 'slug', 'creator_id', 'current_amount', 'total_target'}
+# Project fields counted by the categories and popular tags sections
+PROJECT_COUNT_FIELDS = {'is_approved', 'category_id'}
+
+TRENDING_WINDOW_HOURS = 7 * 24
+TRENDING_LIMIT = 3
+
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 2.0
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _cards(projects):
+    """Project cards with everything the homepage template reads preloaded"""
+    return projects.select_related('category', 'creator').prefetch_related('tags', 'images')
+
+
+def build_top_rated_projects():
+    # Highest rated running projects for slider (top 5)
+    return _cards(Project.objects.filter(
+        is_approved=True,
+        status='active',
+        rating_count__gte=1  # At least one rating
+    ).annotate(
+        avg_rating=average_rating_expression()
+    ).order_by('-avg_rating', '-rating_count'))[:5]
+
+
+def build_latest_projects():
+    return _cards(Project.objects.filter(
+        is_approved=True,
+        status__in=['active', 'funded']
+    ).order_by('-created_at'))[:5]
+
+
+def build_featured_projects():
+    return _cards(Project.objects.filter(
+        is_approved=True,
+        is_featured=True,
+        status__in=['active', 'funded']
+    ).order_by('-created_at'))[:5]
+
+
+def build_trending_projects():
+    # Projects with most donations in last 7 days, from the hourly buckets
+    return _cards(trending_projects(window_hours=TRENDING_WINDOW_HOURS))[:TRENDING_LIMIT]
+
+
+def build_ending_soon():
+    # Projects ending within 7 days
+    now = timezone.now()
+    return _cards(Project.objects.filter(
+        is_approved=True,
+        status='active',
+        end_date__lte=now + timedelta(days=7),
+        end_date__gt=now
+    ).order_by('end_date'))[:3]
+
+
+def build_categories():
+    return Category.objects.filter(is_active=True).annotate(
+        project_count=Count('projects', filter=Q(projects__is_approved=True))
+    ).order_by('name')
+
+
+def build_popular_tags():
+    return Tag.objects.annotate(
+        project_count=Count('projects', filter=Q(projects__is_approved=True))
+    ).filter(project_count__gt=0).order_by('-project_count')[:10]
+
+
+BUILDERS = {
+    'top_rated_projects': build_top_rated_projects,
+    'latest_projects': build_latest_projects,
+    'featured_projects': build_featured_projects,
+    'trending_projects': build_trending_projects,
+    'ending_soon': build_ending_soon,
+    'categories': build_categories,
+    'popular_tags': build_popular_tags,
+}
+
+
+def _version_key(section):
+    return f'{KEY_PREFIX}:version:{section}'
+
+
+def _data_key(section, version):
+    return f'{KEY_PREFIX}:{section}:v{version}'
+
+
+def _stale_key(section):
+    return f'{KEY_PREFIX}:{section}:last'
+
+
+def _new_version():
+    # Time based so a version key lost from the cache never reuses old data
+    return time.time_ns()
+
+
+def get_versions(sections):
+    versions = cache.get_many([_version_key(section) for section in sections])
+    result = {}
+    missing = {}
+    for section in sections:
+        version = versions.get(_version_key(section))
+        if version is None:
+            version = _new_version()
+            missing[_version_key(section)] = version
+        result[section] = version
+    if missing:
+        cache.set_many(missing, None)
+    return result
+
+
+def invalidate(*sections):
+    """Bump the version of the given sections so their next read rebuilds"""
+    for section in sections:
+        try:
+            cache.incr(_version_key(section))
+        except ValueError:
+            cache.set(_version_key(section), _new_version(), None)
+
+
+def invalidate_project(project_id, always=()):
+    """
+    Invalidate the project sections currently showing ``project_id``, plus
+    the sections listed in ``always``.
+    """
+    versions = get_versions(PROJECT_SECTIONS)
+    cached = cache.get_many([_data_key(section, versions[section]) for section in PROJECT_SECTIONS])
+    stale = set(always)
+    for section in PROJECT_SECTIONS:
+        entry = cached.get(_data_key(section, versions[section]))
+        if entry is not None and project_id in entry['project_ids']:
+            stale.add(section)
+    invalidate(*stale)
+
+
+def invalidate_donation(project_id):
+    """
+    Invalidate the sections showing the donated project, and trending when
+    the donation may bring the project into it.
+    """
+    from crowdfunding_projects.models import DonationBucket
+    from crowdfunding_projects.trending import hour_number
+
+    version = get_versions(['trending_projects'])['trending_projects']
+    entry = cache.get(_data_key('trending_projects', version))
+    always = []
+    # Not cached: rebuilt on the next read anyway. Listed: invalidate_project
+    if entry is not None and project_id not in entry['project_ids']:
+        items = entry['items']
+        if len(items) < TRENDING_LIMIT:
+            always.append('trending_projects')
+        else:
+            # It enters only by reaching the count of the last one listed
+            recent = DonationBucket.objects.filter(
+                project_id=project_id, hour__gt=hour_number() - TRENDING_WINDOW_HOURS
+            ).aggregate(total=Sum('donation_count'))['total'] or 0
+            if recent >= min(item.recent_donations for item in items):
+                always.append('trending_projects')
+    invalidate_project(project_id, always=always)
+
+
+def _build(section):
+    # Cached for every visitor: never fill it from a lagging replica
+    with primary():
+        items = list(BUILDERS[section]())
+    project_ids = {item.pk for item in items} if section in PROJECT_SECTIONS else set()
+    return {'items': items, 'project_ids': project_ids}
+
+
+def _rebuild(section, version):
+    key = _data_key(section, version)
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            entry = _build(section)
+            cache.set(key, entry, SECTION_TIMEOUTS[section])
+            cache.set(_stale_key(section), entry, None)
+            return entry
+        finally:
+            cache.delete(lock_key)
+
+    # Another request is rebuilding: serve the last good copy if there is one
+    entry = cache.get(_stale_key(section))
+    if entry is not None:
+        return entry
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return _build(section)
+
+
+def get_sections(sections=None):
+    """Return ``{section: items}`` for the requested homepage sections"""
+    sections = list(sections or BUILDERS)
+    versions = get_versions(sections)
+    keys = {section: _data_key(section, versions[section]) for section in sections}
+    cached = cache.get_many(list(keys.values()))
+    result = {}
+    for section in sections:
+        entry = cached.get(keys[section])
+        if entry is None:
+            entry = _rebuild(section, versions[section])
+        result[section] = entry['items']
+    return result
@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from crowdfunding_projects.models import (
+    Category, Donation, Project, ProjectImage, Rating, Tag
+)
+from crowdfunding_projects.signals import projects_updated
+from .sections import (
+    PROJECT_CARD_FIELDS, PROJECT_COUNT_FIELDS, PROJECT_LISTING_FIELDS, PROJECT_SECTIONS,
+    invalidate, invalidate_donation, invalidate_project,
+)
+
+
+def _on_commit(func, *args, **kwargs):
+    transaction.on_commit(lambda: func(*args, **kwargs))
+
+
+@receiver(post_save, sender=Donation)
+def donation_saved(sender, instance, created, raw=False, **kwargs):
+    """New donations change trending counts and the donated project's progress"""
+    if created and not raw:
+        _on_commit(invalidate_donation, instance.project_id)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def rating_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _on_commit(invalidate_project, instance.project_id, always=['top_rated_projects'])
+
+
+@receiver(post_save, sender=ProjectImage)
+@receiver(post_delete, sender=ProjectImage)
+def project_image_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _on_commit(invalidate_project, instance.project_id)
+
+
+def _changed_fields(instance, update_fields):
+    """Attnames of the fields a save changed, or None when unknown"""
+    loaded = getattr(instance, '_loaded_values', None)
+    fields = [field for field in instance._meta.concrete_fields if field.attname in instance.__dict__]
+    if update_fields is not None:
+        fields = [field for field in fields if {field.name, field.attname} & set(update_fields)]
+    saved = {field.attname: instance.__dict__[field.attname] for field in fields}
+    # Compare the next save with this one
+    instance._loaded_values = {**(loaded or {}), **saved}
+    if loaded is None:
+        return None
+    return {name for name, value in saved.items() if name not in loaded or loaded[name] != value}
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Invalidate only the sections the changed fields can affect"""
+    if raw:
+        return
+    changed = _changed_fields(instance, update_fields)
+    if created:
+        # Unapproved projects are in no section and no count
+        if instance.is_approved:
+            _on_commit(invalidate, *PROJECT_SECTIONS, 'categories', 'popular_tags')
+        return
+    if changed is None:
+        changed = PROJECT_LISTING_FIELDS | PROJECT_COUNT_FIELDS
+    stale = []
+    if changed & PROJECT_COUNT_FIELDS:
+        stale += ['categories', 'popular_tags']
+    if changed & PROJECT_LISTING_FIELDS:
+        stale += PROJECT_SECTIONS
+    if stale:
+        _on_commit(invalidate, *stale)
+    if changed & PROJECT_CARD_FIELDS and not changed & PROJECT_LISTING_FIELDS:
+        _on_commit(invalidate_project, instance.pk)
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    if instance.is_approved:
+        _on_commit(invalidate, *PROJECT_SECTIONS, 'categories', 'popular_tags')
+
+
+@receiver(projects_updated, sender=Project)
+def projects_bulk_updated(sender, project_ids, **kwargs):
+    # Sent after commit
+    invalidate(*PROJECT_SECTIONS, 'categories', 'popular_tags')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _on_commit(invalidate, 'categories', *PROJECT_SECTIONS)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _on_commit(invalidate, 'popular_tags', *PROJECT_SECTIONS)
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+def project_tags_changed(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _on_commit(invalidate, 'popular_tags', *PROJECT_SECTIONS)
@@ -1,3 +1,199 @@
-from django.test import TestCase
-
-# Create your tests here.
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from crowdfunding_projects.models import Category, Donation, DonationBucket, Project
+from crowdfunding_projects.trending import (
+    SCORE_DECAYED_SUM, TRENDING_RETENTION_HOURS, record_donation_bucket, trending_projects,
+)
+
+from . import sections
+from .sections import PROJECT_SECTIONS, get_sections, get_versions
+
+
+def create_user(name):
+    return get_user_model().objects.create_user(
+        username=name, email=f'{name}@example.com', password='x',
+        first_name='First', last_name='Last', phone='01012345678',
+    )
+
+
+def create_project(creator, title='Project', category=None, **kwargs):
+    now = timezone.now()
+    fields = dict(
+        details='Details', total_target=Decimal('5000'), start_date=now,
+        end_date=now + timedelta(days=30), status='active', is_approved=True,
+    )
+    fields.update(kwargs)
+    category = category or Category.objects.get_or_create(name='Category')[0]
+    return Project.objects.create(title=title, category=category, creator=creator, **fields)
+
+
+class SectionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = create_user('creator')
+        self.project = create_project(self.creator)
+
+    def versions(self):
+        return get_versions(list(sections.BUILDERS))
+
+    def test_second_read_runs_no_queries(self):
+        get_sections()
+        with self.assertNumQueries(0):
+            result = get_sections()
+        self.assertEqual(result['latest_projects'], [self.project])
+
+    def test_homepage_served_from_cache(self):
+        self.client.get(reverse('homepage:homepage'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('homepage:homepage')).status_code, 200)
+        self.assertFalse([query for query in queries if 'crowdfunding_projects_project' in query['sql']])
+
+    def test_listing_change_invalidates_the_project_sections(self):
+        get_sections()
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.is_featured = True
+            self.project.save()
+        after = self.versions()
+        self.assertEqual(
+            {section for section in before if before[section] != after[section]}, set(PROJECT_SECTIONS)
+        )
+        self.assertEqual(get_sections(['featured_projects'])['featured_projects'], [self.project])
+
+    def test_card_change_invalidates_the_sections_showing_it(self):
+        get_sections()
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.title = 'Renamed'
+            self.project.save()
+        after = self.versions()
+        # Listed in latest only (not featured, rated, trending or ending soon)
+        self.assertEqual({section for section in before if before[section] != after[section]}, {'latest_projects'})
+        self.assertEqual(get_sections(['latest_projects'])['latest_projects'][0].title, 'Renamed')
+
+    def test_unrelated_change_keeps_every_section(self):
+        get_sections()
+        before = self.versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.details = 'New details'
+            self.project.save()
+            create_project(self.creator, title='Pending', is_approved=False, status='pending')
+        self.assertEqual(self.versions(), before)
+
+    def test_donation_enters_trending_only_when_it_can(self):
+        others = [create_project(self.creator, title=f'Trending {i}') for i in range(3)]
+        donor = create_user('donor')
+        for other in others:
+            for _ in range(2):
+                Donation.objects.create(project=other, user=donor, amount=Decimal('10'))
+        get_sections(['trending_projects'])
+        version = get_versions(['trending_projects'])
+
+        # One donation cannot reach the last listed project's two
+        with self.captureOnCommitCallbacks(execute=True):
+            Donation.objects.create(project=self.project, user=donor, amount=Decimal('50'))
+        self.assertEqual(get_versions(['trending_projects']), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Donation.objects.create(project=self.project, user=donor, amount=Decimal('50'))
+        self.assertIn(self.project, get_sections(['trending_projects'])['trending_projects'])
+
+
+class TrendingSectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        creator = create_user('creator')
+        self.steady = create_project(creator, title='Steady')
+        self.recent = create_project(creator, title='Recent')
+        self.now = timezone.now()
+
+    def bucket(self, project, hours_ago, count, amount='10'):
+        for _ in range(count):
+            record_donation_bucket(project.pk, Decimal(amount), self.now - timedelta(hours=hours_ago))
+
+    def test_counts_only_the_window(self):
+        self.bucket(self.steady, hours_ago=30, count=5)
+        self.bucket(self.recent, hours_ago=1, count=2)
+        self.assertEqual(list(trending_projects(window_hours=24)), [self.recent])
+        ranked = list(trending_projects(window_hours=48))
+        self.assertEqual(ranked, [self.steady, self.recent])
+        self.assertEqual([project.recent_donations for project in ranked], [5, 2])
+
+    def test_decayed_sum_favours_recent_money(self):
+        self.bucket(self.steady, hours_ago=72, count=1, amount='400')
+        self.bucket(self.recent, hours_ago=1, count=1, amount='100')
+        ranked = list(trending_projects(score=SCORE_DECAYED_SUM, half_life_hours=24))
+        self.assertEqual(ranked, [self.recent, self.steady])
+
+    def test_opening_a_bucket_drops_expired_ones(self):
+        self.bucket(self.steady, hours_ago=TRENDING_RETENTION_HOURS + 1, count=1)
+        self.bucket(self.steady, hours_ago=0, count=1)
+        self.assertEqual(DonationBucket.objects.filter(project=self.steady).count(), 1)
+
+    def test_section_served_from_cache(self):
+        self.bucket(self.recent, hours_ago=1, count=1)
+        self.assertEqual(get_sections(['trending_projects'])['trending_projects'], [self.recent])
+        # Buckets written without a donation do not invalidate the section
+        self.bucket(self.steady, hours_ago=1, count=3)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_sections(['trending_projects'])['trending_projects'], [self.recent])
+        sections.invalidate('trending_projects')
+        self.assertEqual(
+            get_sections(['trending_projects'])['trending_projects'], [self.steady, self.recent]
+        )
+
+
+class CategoryExploreTests(TestCase):
+    def test_newest_three_featured_per_category_in_fixed_queries(self):
+        creator = create_user('creator')
+        education = Category.objects.create(name='Education')
+        health = Category.objects.create(name='Health')
+        featured = [
+            create_project(creator, title=f'Education {n}', category=education, is_featured=True)
+            for n in range(4)
+        ]
+        create_project(creator, title='Not featured', category=health)
+        create_project(creator, title='Hidden', category=health, is_featured=True, is_approved=False)
+        clinic = create_project(creator, title='Clinic', category=health, is_featured=True)
+
+        def explore():
+            return self.client.get(reverse('homepage:category_explore')).context['featured_by_category']
+
+        self.assertEqual(explore(), {education: featured[:0:-1], health: [clinic]})
+        with CaptureQueriesContext(connection) as few:
+            explore()
+        Category.objects.create(name='Water')
+        with self.assertNumQueries(len(few)):
+            explore()
+
+
+class StampedeLockTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.project = create_project(create_user('creator'))
+
+    def lock(self, section):
+        version = get_versions([section])[section]
+        cache.add(f'{sections._data_key(section, version)}:lock', 1)
+
+    def test_rebuilding_elsewhere_serves_the_last_copy(self):
+        get_sections(['latest_projects'])
+        sections.invalidate('latest_projects')
+        self.lock('latest_projects')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_sections(['latest_projects'])['latest_projects'], [self.project])
+
+    def test_without_a_copy_waits_then_builds(self):
+        self.lock('latest_projects')
+        with mock.patch.object(sections, 'LOCK_WAIT', 0.1):
+            self.assertEqual(get_sections(['latest_projects'])['latest_projects'], [self.project])
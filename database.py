@@ -0,0 +1,44 @@
+"""
+SQLite connection setup.
+
+Every new SQLite connection runs the ``PRAGMAS`` of its ``DATABASES`` entry
+(see ``DATABASE_PROFILE`` in settings), e.g. ``{'journal_mode': 'WAL',
+'busy_timeout': 5000}`` runs ``PRAGMA journal_mode = WAL`` and
+``PRAGMA busy_timeout = 5000``. Most PRAGMAs only last as long as the
+connection, which is why they are applied on ``connection_created`` rather
+than once; ``journal_mode = WAL`` is stored in the database file.
+"""
+import re
+
+_NAME = re.compile(r'^[a-z_]+$')
+_VALUE = re.compile(r'^-?\w+$')
+
+
+def pragma_statements(pragmas):
+    statements = []
+    for name, value in (pragmas or {}).items():
+        value = str(value)
+        if not _NAME.match(name) or not _VALUE.match(value):
+            raise ValueError(f'Invalid SQLite PRAGMA {name} = {value}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """``connection_created`` receiver running the database's PRAGMAS"""
+    if connection.vendor != 'sqlite':
+        return
+    # Straight on the sqlite3 connection: not a query of the request
+    for statement in pragma_statements(connection.settings_dict.get('PRAGMAS')):
+        connection.connection.execute(statement)
+
+
+def current_pragmas(connection, names):
+    """``{name: value}`` as SQLite reports them for ``connection``"""
+    with connection.cursor() as cursor:
+        values = {}
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
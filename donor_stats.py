@@ -0,0 +1,139 @@
+"""
+Per-user donation and project totals.
+
+The profile page shows how much a user donated, how many donations they made,
+how many projects they created and how many projects they backed. Computing
+those from the donation history grows with the history, so ``DonorStats``
+keeps them in one row per user, maintained on the write paths in the same
+transaction: ``Donation.save`` records a new donation and ``Project.save``
+a new project, each with one atomic ``UPDATE ... SET x = x + n`` (the row is
+created on the first write). Whether a donation backs a new project is
+decided under a lock on the donor's row, so concurrent first donations to the
+same project count it once.
+
+Deleting a project removes its donations through the cascade, which calls no
+``delete()``; the ``post_delete`` receiver recomputes the stats of its
+creator and donors instead. ``reconcile_donor_stats`` rebuilds any stats from
+the donations and projects (``manage.py reconcile_donor_stats``).
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+STAT_FIELDS = ('total_donated', 'donation_count', 'projects_created', 'projects_backed')
+
+
+def apply_donor_delta(user_id, **deltas):
+    """Add ``deltas`` (field -> amount) to a user's stats, creating the row"""
+    from .models import DonorStats
+
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not user_id or not deltas:
+        return
+    updates = {name: F(name) + value for name, value in deltas.items()}
+    if DonorStats.objects.filter(user_id=user_id).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            DonorStats.objects.create(user_id=user_id, **deltas)
+    except IntegrityError:
+        # Another write created the row first
+        DonorStats.objects.filter(user_id=user_id).update(**updates)
+
+
+def record_donation_stats(donation):
+    """Count a new donation in its donor's stats"""
+    from .models import Donation, DonorStats
+
+    if not donation.user_id:
+        return
+    with transaction.atomic():
+        # Lock the donor's row before looking for earlier donations: of two
+        # concurrent first donations to a project, the second to get the
+        # lock then sees the first and does not count the project again
+        DonorStats.objects.bulk_create([DonorStats(user_id=donation.user_id)], ignore_conflicts=True)
+        list(DonorStats.objects.select_for_update().filter(user_id=donation.user_id).values_list('pk'))
+        first_to_project = not Donation.objects.filter(
+            user_id=donation.user_id, project_id=donation.project_id
+        ).exclude(pk=donation.pk).exists()
+        apply_donor_delta(
+            donation.user_id,
+            total_donated=donation.amount,
+            donation_count=1,
+            projects_backed=1 if first_to_project else 0,
+        )
+
+
+def record_project_stats(project):
+    """Count a new project in its creator's stats"""
+    apply_donor_delta(project.creator_id, projects_created=1)
+
+
+def donor_stats_for(user):
+    """The user's stats, or an unsaved all-zero row when they have none yet"""
+    from .models import DonorStats
+
+    return DonorStats.objects.filter(user=user).first() or DonorStats(user=user)
+
+
+def _stat_subqueries():
+    from .models import Donation, Project
+
+    def aggregate(queryset, expression, output_field):
+        values = queryset.order_by().values('user').annotate(value=expression).values('value')
+        return Coalesce(Subquery(values), Value(0), output_field=output_field)
+
+    donations = Donation.objects.filter(user=OuterRef('user'))
+    projects = Project.objects.filter(creator=OuterRef('user')).order_by().values('creator').annotate(
+        value=Count('pk')
+    ).values('value')
+    return {
+        'total_donated': aggregate(
+            donations, Sum('amount'), DecimalField(max_digits=14, decimal_places=2)
+        ),
+        'donation_count': aggregate(donations, Count('pk'), IntegerField()),
+        'projects_backed': aggregate(donations, Count('project', distinct=True), IntegerField()),
+        'projects_created': Coalesce(Subquery(projects), Value(0), output_field=IntegerField()),
+    }
+
+
+def find_drifted_donor_stats(user_ids=None):
+    """Stats rows that differ from the donations and projects they count"""
+    from .models import DonorStats
+
+    stats = DonorStats.objects.all()
+    if user_ids is not None:
+        stats = stats.filter(user_id__in=user_ids)
+    expected = {f'expected_{name}': value for name, value in _stat_subqueries().items()}
+    drifted = Q()
+    for name in STAT_FIELDS:
+        drifted |= ~Q(**{name: F(f'expected_{name}')})
+    return stats.annotate(**expected).filter(drifted).order_by('pk')
+
+
+def reconcile_donor_stats(user_ids=None, create=True):
+    """
+    Recompute stats from the donations and projects. With ``create`` the
+    users who have donated or created projects but have no row get one.
+    Returns the ids of the users whose stats were corrected.
+    """
+    from .models import DonorStats
+
+    User = get_user_model()
+    with transaction.atomic():
+        if create:
+            missing = User.objects.filter(
+                Q(project_donations__isnull=False) | Q(created_projects__isnull=False),
+                donor_stats__isnull=True,
+            )
+            if user_ids is not None:
+                missing = missing.filter(pk__in=user_ids)
+            DonorStats.objects.bulk_create(
+                [DonorStats(user_id=user_id) for user_id in set(missing.values_list('pk', flat=True))],
+                ignore_conflicts=True,
+            )
+        drifted = list(find_drifted_donor_stats(user_ids).values_list('pk', flat=True))
+        if drifted:
+            DonorStats.objects.filter(pk__in=drifted).update(**_stat_subqueries())
+    return drifted
@@ -0,0 +1,36 @@
+"""
+Top-N-per-group queries.
+
+Pages that show "the best few X of every Y" used to run one query per group.
+``top_n_per_group`` ranks the rows of each group with a
+``ROW_NUMBER() OVER (PARTITION BY ...)`` window and keeps the first ``n``, so
+all groups come back in one query; ``prefetch_related`` on the result then
+batches the related rows of every group as well.
+"""
+from collections import defaultdict
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+
+def top_n_per_group(queryset, group_by, n, ordering):
+    """
+    The first ``n`` rows of ``queryset`` per value of the ``group_by`` field,
+    ranked by ``ordering`` (field names, ``-`` for descending). Rows are
+    annotated with their 1-based ``group_position``.
+    """
+    return queryset.annotate(
+        group_position=Window(
+            RowNumber(),
+            partition_by=[F(group_by)],
+            order_by=list(ordering),
+        )
+    ).filter(group_position__lte=n).order_by(group_by, 'group_position')
+
+
+def group_rows(rows, group_by, keys=()):
+    """``{key: [rows]}`` keyed by the ``group_by`` attribute, in row order"""
+    groups = defaultdict(list, {key: [] for key in keys})
+    for row in rows:
+        groups[getattr(row, group_by)].append(row)
+    return dict(groups)
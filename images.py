@@ -0,0 +1,245 @@
+"""
+Resized image variants for uploaded pictures.
+
+Uploads (``ProjectImage.image``, ``CustomUser.profile_picture``) are stored as
+sent, often multi-megabyte phone photos. After the upload commits, the
+original is handed to a process pool that decodes it once and renders every
+size in ``IMAGE_VARIANTS`` as JPEG and WebP; the parent process then saves the
+files next to the original, named after the content hash of the original
+(``photo.3f2a9c1be4d0.card.webp``), and records them on the model's
+``<field>_variants`` JSON column.
+
+Pages read the variants through ``variant_url`` (the ``variant`` template
+filter or the model accessors). Until the variants exist, or when the picture
+was replaced since they were made, the original is served instead.
+``generate_image_variants`` builds the variants of existing uploads.
+"""
+import atexit
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height, crop). Cropped variants fill the box exactly,
+# the others are scaled down to fit inside it.
+DEFAULT_IMAGE_VARIANTS = {
+    'thumb': (160, 160, True),
+    'card': (480, 300, True),
+    'hero': (1280, 720, False),
+}
+IMAGE_VARIANTS = getattr(settings, 'IMAGE_VARIANTS', DEFAULT_IMAGE_VARIANTS)
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_VARIANT_QUALITY = getattr(settings, 'IMAGE_VARIANT_QUALITY', 80)
+IMAGE_VARIANT_WORKERS = getattr(settings, 'IMAGE_VARIANT_WORKERS', 2)
+# Render in the pool after commit; False renders inline (tests, scripts)
+IMAGE_VARIANTS_ASYNC = getattr(settings, 'IMAGE_VARIANTS_ASYNC', True)
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+HASH_LENGTH = 12
+
+# Sent with ``pk`` after a row's ``<field>_variants`` column was updated
+# (the UPDATE sends no post_save)
+variants_changed = Signal()
+
+
+def variants_attr(field_name):
+    return f'{field_name}_variants'
+
+
+# Rendering (runs in the worker processes, no Django access)
+
+def render_variants(source, sizes=None, quality=IMAGE_VARIANT_QUALITY):
+    """
+    Decode ``source`` (a path or bytes) once and encode every size in every
+    format. Returns ``(content_hash, {size: {format: bytes}})``.
+    """
+    from PIL import Image, ImageOps
+
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+    else:
+        with open(source, 'rb') as handle:
+            data = handle.read()
+    content_hash = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+    with Image.open(io.BytesIO(data)) as original:
+        # Phone photos are stored sideways with an EXIF rotation flag
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'L'):
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            rgba = image.convert('RGBA')
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            image = background
+        elif image.mode == 'L':
+            image = image.convert('RGB')
+
+        rendered = {}
+        for size, (width, height, crop) in (sizes or IMAGE_VARIANTS).items():
+            if crop:
+                resized = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+            else:
+                resized = image.copy()
+                resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+            rendered[size] = {}
+            for image_format in IMAGE_VARIANT_FORMATS:
+                buffer = io.BytesIO()
+                options = {'quality': quality}
+                if image_format == 'jpeg':
+                    options.update(optimize=True, progressive=True)
+                else:
+                    options.update(method=4)
+                resized.save(buffer, image_format.upper(), **options)
+                rendered[size][image_format] = buffer.getvalue()
+    return content_hash, rendered
+
+
+# Storing (parent process)
+
+def variant_name(source_name, content_hash, size, image_format):
+    """``dir/photo.jpg`` -> ``dir/photo.<hash>.<size>.<ext>``"""
+    stem, _ = os.path.splitext(source_name)
+    return f'{stem}.{content_hash}.{size}.{EXTENSIONS[image_format]}'
+
+
+def _delete_files(storage, variants):
+    for formats in variants.values():
+        if not isinstance(formats, dict):
+            continue
+        for name in formats.values():
+            try:
+                storage.delete(name)
+            except OSError:
+                logger.warning('Could not delete image variant %s', name)
+
+
+def store_variants(model, pk, field_name, source_name, content_hash, rendered):
+    """Save rendered variants and record them if the upload is still current"""
+    field = model._meta.get_field(field_name)
+    storage = field.storage
+    attr = variants_attr(field_name)
+
+    variants = {'source': source_name, 'hash': content_hash}
+    for size, formats in rendered.items():
+        variants[size] = {}
+        for image_format, data in formats.items():
+            name = variant_name(source_name, content_hash, size, image_format)
+            if not storage.exists(name):
+                name = storage.save(name, ContentFile(data))
+            variants[size][image_format] = name
+
+    previous = model.objects.filter(pk=pk).values_list(attr, flat=True).first()
+    updated = model.objects.filter(pk=pk, **{field_name: source_name}).update(**{attr: variants})
+    if not updated:
+        # Picture replaced or row deleted while rendering
+        _delete_files(storage, {k: v for k, v in variants.items() if k not in ('source', 'hash')})
+        return None
+    if previous and previous.get('hash') != content_hash:
+        _delete_files(storage, {
+            k: v for k, v in previous.items() if k not in ('source', 'hash')
+        })
+    variants_changed.send(sender=model, pk=pk)
+    return variants
+
+
+def image_source(fieldfile):
+    """What the workers read: a filesystem path, or the bytes for remote storage"""
+    try:
+        return fieldfile.path
+    except NotImplementedError:
+        # Remote storage: send the bytes to the worker
+        with fieldfile.open('rb') as handle:
+            return handle.read()
+
+
+def generate_variants(instance, field_name):
+    """Render and store the variants of one upload in this process"""
+    fieldfile = getattr(instance, field_name)
+    if not fieldfile:
+        return None
+    content_hash, rendered = render_variants(image_source(fieldfile))
+    return store_variants(
+        type(instance), instance.pk, field_name, fieldfile.name, content_hash, rendered
+    )
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=IMAGE_VARIANT_WORKERS)
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+
+def _stored(model, pk, field_name, source_name):
+    def done(future):
+        # Runs on the executor's management thread
+        try:
+            content_hash, rendered = future.result()
+            store_variants(model, pk, field_name, source_name, content_hash, rendered)
+        except Exception:
+            logger.exception('Image variants failed for %s %s', model._meta.label, pk)
+        finally:
+            close_old_connections()
+    return done
+
+
+def schedule_variants(instance, field_name):
+    """Render the variants in the process pool once the upload is committed"""
+    fieldfile = getattr(instance, field_name)
+    if not fieldfile:
+        return
+    model, pk, source_name = type(instance), instance.pk, fieldfile.name
+
+    def submit():
+        if not IMAGE_VARIANTS_ASYNC:
+            generate_variants(model.objects.get(pk=pk), field_name)
+            return
+        try:
+            source = image_source(getattr(instance, field_name))
+        except OSError:
+            logger.warning('Image %s is missing, no variants made', source_name)
+            return
+        future = get_executor().submit(render_variants, source)
+        future.add_done_callback(_stored(model, pk, field_name, source_name))
+
+    transaction.on_commit(submit)
+
+
+def needs_variants(instance, field_name):
+    fieldfile = getattr(instance, field_name)
+    variants = getattr(instance, variants_attr(field_name)) or {}
+    return bool(fieldfile) and variants.get('source') != fieldfile.name
+
+
+def delete_variants(instance, field_name):
+    variants = getattr(instance, variants_attr(field_name)) or {}
+    storage = instance._meta.get_field(field_name).storage
+    _delete_files(storage, {k: v for k, v in variants.items() if k not in ('source', 'hash')})
+
+
+# Reading
+
+def variant_url(fieldfile, size, image_format='webp'):
+    """URL of the ``size`` variant of ``fieldfile``, or of the original"""
+    if not fieldfile:
+        return ''
+    variants = getattr(fieldfile.instance, variants_attr(fieldfile.field.name), None) or {}
+    if variants.get('source') == fieldfile.name:
+        name = (variants.get(size) or {}).get(image_format)
+        if name:
+            return fieldfile.storage.url(name)
+    return fieldfile.url
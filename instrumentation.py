@@ -0,0 +1,273 @@
+"""
+Per-request SQL and timing instrumentation.
+
+``RequestMetricsMiddleware`` records for every request the number of queries,
+the time spent in the database, duplicate queries (same SQL and parameters)
+and N+1 patterns (the same SQL run many times with different parameters),
+template render time and view time. Queries are counted by an execute
+wrapper installed on every connection (``install_query_recorder``), which
+records into the metrics of the request in the current context, so it works
+with DEBUG off, where ``connection.queries`` stays empty, and for async views
+whose queries run in ``sync_to_async`` threads. The middleware is async
+capable, so under ASGI it does not push async views onto a thread.
+
+The numbers are sent back in a ``Server-Timing`` header (visible in the
+browser dev tools) and written as one JSON log line per request to the
+``crowdfunding_projects.instrumentation`` logger. ``QUERY_BUDGETS`` maps URL
+names to the most queries a request may run; going over is logged, or raised
+as ``QueryBudgetExceeded`` when ``QUERY_BUDGET_ACTION`` is ``'raise'`` (handy
+in tests).
+
+``QueryRecorder`` can also be used on its own::
+
+    with record_queries() as recorder:
+        ...
+    recorder.count, recorder.duration
+"""
+import contextvars
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+REQUEST_METRICS = getattr(settings, 'REQUEST_METRICS', True)
+# Send the Server-Timing header (it tells clients how the page is built)
+REQUEST_METRICS_HEADER = getattr(settings, 'REQUEST_METRICS_HEADER', True)
+# The same SQL run this many times with different parameters is an N+1
+N_PLUS_ONE_THRESHOLD = getattr(settings, 'N_PLUS_ONE_THRESHOLD', 5)
+# URL name ('projects:project_list') -> most queries allowed
+QUERY_BUDGETS = getattr(settings, 'QUERY_BUDGETS', {})
+# 'log' or 'raise'
+QUERY_BUDGET_ACTION = getattr(settings, 'QUERY_BUDGET_ACTION', 'log')
+# Fingerprints listed in the log line
+REPORTED_FINGERPRINTS = 5
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+_IN_LIST = re.compile(r'IN \((?:(?:%s|\?), )*(?:%s|\?)\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql):
+    """SQL with literals and IN lists collapsed, to group queries by shape"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Execute wrapper counting and timing queries and grouping them by shape"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.calls = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql] += 1
+            self.calls[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        """Queries repeated with the same parameters (cacheable)"""
+        return sum(times - 1 for times in self.calls.values())
+
+    def n_plus_one(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """``[(fingerprint, times)]`` of queries run per row of another query"""
+        repeated = Counter()
+        for sql, times in self.shapes.items():
+            repeated[fingerprint(sql)] += times
+        return [(shape, times) for shape, times in repeated.most_common() if times >= threshold]
+
+
+@contextmanager
+def record_queries(recorder=None, using=None):
+    """Record the queries run on ``using`` (default: every database)"""
+    recorder = recorder or QueryRecorder()
+    with ExitStack() as stack:
+        for alias in [using] if using else connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield recorder
+
+
+def _record_request_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.queries(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    """Record ``connection``'s queries into the current request's metrics"""
+    if _record_request_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_request_query)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = QueryRecorder()
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_duration = 0.0
+        self.template_duration = 0.0
+        self.template_depth = 0
+
+
+def current_metrics():
+    """The metrics of the request being served in this context, if any"""
+    return _current.get()
+
+
+def install_template_timer():
+    """Time template rendering (outermost ``render`` calls only)"""
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'instrumented', False):
+        return
+    render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return render(self, context, request)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_duration += time.perf_counter() - started
+
+    timed_render.instrumented = True
+    Template.render = timed_render
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Called by the async handler without a thread hop
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not REQUEST_METRICS:
+            return self.get_response(request)
+
+        # Connections opened before the app was ready have no recorder yet
+        for alias in connections:
+            install_query_recorder(connections[alias])
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not REQUEST_METRICS:
+            return await self.get_response(request)
+
+        # Queries run in sync_to_async threads, whose connections get the
+        # recorder when they connect
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        if metrics.view_started is not None:
+            metrics.view_duration = time.perf_counter() - metrics.view_started
+        total = time.perf_counter() - metrics.started
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.view_name if match else None
+        queries = metrics.queries
+        n_plus_one = queries.n_plus_one()
+        budget = QUERY_BUDGETS.get(url_name)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'url_name': url_name,
+            'status': response.status_code,
+            'total_ms': _ms(total),
+            'view_ms': _ms(metrics.view_duration),
+            'template_ms': _ms(metrics.template_duration),
+            'db_ms': _ms(queries.duration),
+            'queries': queries.count,
+            'duplicate_queries': queries.duplicates,
+            'n_plus_one': [
+                {'sql': shape[:200], 'count': times}
+                for shape, times in n_plus_one[:REPORTED_FINGERPRINTS]
+            ],
+        }
+        over_budget = budget is not None and queries.count > budget
+        if over_budget:
+            record['query_budget'] = budget
+
+        if REQUEST_METRICS_HEADER:
+            response.headers['Server-Timing'] = ', '.join([
+                f'db;dur={record["db_ms"]};desc="{queries.count} queries"',
+                f'tpl;dur={record["template_ms"]}',
+                f'view;dur={record["view_ms"]}',
+                f'total;dur={record["total_ms"]}',
+                f'dup;desc="{queries.duplicates}"',
+                f'n1;desc="{len(n_plus_one)}"',
+            ])
+
+        level = logging.WARNING if over_budget or n_plus_one else logging.INFO
+        logger.log(level, json.dumps(record))
+        if over_budget and QUERY_BUDGET_ACTION == 'raise':
+            raise QueryBudgetExceeded(
+                f'{url_name} ran {queries.count} queries, its budget is {budget}.'
+            )
+        return response
+
+    def start_view(self):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.start_view()
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.start_view()
+        return None
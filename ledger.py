@@ -0,0 +1,95 @@
+"""
+Donation ledger.
+
+Every ``Donation`` row is an append-only ledger entry. ``Project.current_amount``
+is a running total of those entries and ``Project.donation_count`` their
+number, maintained with a single atomic ``UPDATE ... SET current_amount =
+current_amount + <amount>, donation_count = donation_count + 1`` in the same
+transaction that inserts the donation (``Donation.save``), so concurrent
+donations never lose updates and the project row is only locked for one
+statement.
+
+Entries are never removed while their project exists: when a donor deletes
+their account the donations stay, detached from the user and marked
+anonymous (``Donation.user`` is ``SET_NULL``, see ``signals.py``), so the
+money they raised still counts.
+
+The running total and count can always be rebuilt from the ledger with
+``reconcile_project_totals``.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _ledger_count_subquery():
+    """Subquery counting the ledger entries of the outer project"""
+    from .models import Donation
+
+    counts = Donation.objects.filter(
+        project=OuterRef('pk')
+    ).order_by().values('project').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), Value(0), output_field=IntegerField())
+
+
+def _ledger_total_subquery():
+    """Subquery summing the ledger entries of the outer project"""
+    from .models import Donation
+
+    totals = Donation.objects.filter(
+        project=OuterRef('pk')
+    ).order_by().values('project').annotate(total=Sum('amount')).values('total')
+    return Coalesce(
+        Subquery(totals),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def apply_donation(project_id, amount):
+    """Add a donation of ``amount`` to a project's running total with one atomic UPDATE"""
+    from .models import Project
+
+    return Project.objects.filter(pk=project_id).update(
+        current_amount=F('current_amount') + amount,
+        donation_count=F('donation_count') + 1,
+    )
+
+
+def find_drifted_projects(project_ids=None):
+    """Return projects whose ``current_amount`` or ``donation_count`` differs from their ledger"""
+    from .models import Project
+
+    projects = Project.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+    return projects.annotate(
+        ledger_total=_ledger_total_subquery(),
+        ledger_count=_ledger_count_subquery(),
+    ).filter(
+        ~Q(current_amount=F('ledger_total')) | ~Q(donation_count=F('ledger_count'))
+    ).order_by('pk')
+
+
+def reconcile_project_totals(project_ids=None):
+    """
+    Recompute ``current_amount`` and ``donation_count`` from the donation ledger.
+
+    Only projects whose stored total has drifted are rewritten, with a single
+    set-based UPDATE. Returns a list of ``(project_id, stored, ledger)`` tuples
+    describing the corrections that were applied.
+    """
+    from .models import Project
+
+    with transaction.atomic():
+        drifted = list(
+            find_drifted_projects(project_ids).values_list('pk', 'current_amount', 'ledger_total')
+        )
+        if drifted:
+            Project.objects.filter(pk__in=[pk for pk, _, _ in drifted]).update(
+                current_amount=_ledger_total_subquery(),
+                donation_count=_ledger_count_subquery(),
+            )
+    return drifted
@@ -0,0 +1,100 @@
+"""
+Campaign lifecycle.
+
+A project's status only moves forward on a schedule, not on page views:
+
+* ``active`` -> ``funded`` once ``current_amount`` reaches ``total_target``;
+* ``active`` -> ``completed`` and ``funded`` -> ``completed`` once
+  ``end_date`` has passed.
+
+``run_lifecycle`` (``manage.py run_lifecycle --interval N``) finds the due
+projects of each transition with a range query on a ``(status, end_date)``
+index (for ``funded``, the one partial on ``current_amount >= total_target``)
+and moves them in batches, one ``UPDATE`` per batch that
+repeats the due condition so a row changed meanwhile is left alone. Each
+batch sends ``project_status_changed`` (who moved, from and to which status)
+and ``projects_updated`` (search and similarity indexes, homepage cache) once
+committed, since ``update()`` sends no ``post_save``.
+"""
+import logging
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .signals import project_status_changed, projects_updated
+
+logger = logging.getLogger(__name__)
+
+LIFECYCLE_BATCH_SIZE = getattr(settings, 'LIFECYCLE_BATCH_SIZE', 500)
+
+
+@dataclass(frozen=True)
+class Transition:
+    name: str
+    source: str
+    target: str
+
+    def due(self, now):
+        """Condition selecting the projects this transition applies to"""
+        if self.name == 'funded':
+            return Q(status=self.source, end_date__gt=now, current_amount__gte=F('total_target'))
+        return Q(status=self.source, end_date__lte=now)
+
+
+# In order: a campaign that reached its target and ended since the last run
+# goes straight to completed
+TRANSITIONS = [
+    Transition('ended', 'active', 'completed'),
+    Transition('funded', 'active', 'funded'),
+    Transition('ended_funded', 'funded', 'completed'),
+]
+
+
+def due_projects(transition, now=None):
+    from .models import Project
+
+    return Project.objects.filter(transition.due(now or timezone.now()))
+
+
+def _apply_batch(transition, now, batch_size):
+    """Move one batch; returns the ids selected and the number moved"""
+    from .models import Project
+
+    with transaction.atomic():
+        project_ids = list(
+            due_projects(transition, now).order_by('end_date', 'pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not project_ids:
+            return [], 0
+        moved = Project.objects.filter(transition.due(now), pk__in=project_ids).update(
+            status=transition.target, updated_at=now
+        )
+
+        def announce():
+            project_status_changed.send(
+                sender=Project, project_ids=project_ids,
+                source=transition.source, target=transition.target,
+            )
+            projects_updated.send(sender=Project, project_ids=project_ids)
+        transaction.on_commit(announce)
+    return project_ids, moved
+
+
+def run_transitions(now=None, batch_size=LIFECYCLE_BATCH_SIZE, transitions=TRANSITIONS):
+    """Apply every due transition; returns ``{transition name: projects moved}``"""
+    now = now or timezone.now()
+    moved = {}
+    for transition in transitions:
+        moved[transition.name] = 0
+        while True:
+            project_ids, count = _apply_batch(transition, now, batch_size)
+            moved[transition.name] += count
+            if count:
+                logger.info('%s: %d project(s) %s -> %s', transition.name, count,
+                            transition.source, transition.target)
+            if len(project_ids) < batch_size:
+                break
+    return moved
@@ -1 +1 @@
-# Management package for crowdfunding_projects
+# Management package for crowdfunding_projects
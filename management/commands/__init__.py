@@ -1 +1 @@
-# Commands package for crowdfunding_projects
+# Commands package for crowdfunding_projects
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from crowdfunding_projects.ratings import recompute_rating_aggregates
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored rating_sum/rating_count columns from project ratings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project', type=int, action='append', dest='project_ids',
+            help='Only backfill the given project id (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        updated = recompute_rating_aggregates(options['project_ids'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Backfilled rating aggregates for {updated} project(s).')
+        )
@@ -0,0 +1,187 @@
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection, connections
+from crowdfunding_projects.benchmarks import SCALES, generated_dataset
+from crowdfunding_projects.database import current_pragmas
+from crowdfunding_projects.models import Comment, Donation, Project
+
+# Django's stock SQLite settings against the production profile from settings
+PROFILES = {
+    'default': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}, 'PRAGMAS': {}},
+    'production': settings.SQLITE_PRODUCTION_PROFILE,
+}
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * fraction))] * 1000, 2)
+
+
+def read_page(rng, project_ids):
+    """What an anonymous visitor costs: a listing page and a project page"""
+    list(Project.objects.filter(
+        is_approved=True, status__in=['active', 'funded']
+    ).select_related('category', 'creator').order_by('-created_at', '-pk')[:12])
+    project = Project.objects.select_related('category', 'creator').get(pk=rng.choice(project_ids))
+    list(Comment.objects.filter(
+        project=project, parent__isnull=True, is_approved=True
+    ).select_related('user').order_by('-created_at', '-pk')[:10])
+
+
+def write(rng, project_ids, user_ids):
+    """A donation (insert + ledger and bucket updates) or a comment"""
+    if rng.random() < 0.7:
+        Donation(
+            project_id=rng.choice(project_ids), user_id=rng.choice(user_ids),
+            amount=Decimal(rng.choice((10, 50, 100, 500))),
+        ).save()
+    else:
+        Comment.objects.create(
+            project_id=rng.choice(project_ids), user_id=rng.choice(user_ids), content='Benchmark comment'
+        )
+
+
+def worker(profile, path, seconds, write_ratio, seed, project_ids, user_ids):
+    """Run reads and writes against ``path`` until the time is up (in a child process)"""
+    wrapper = connections['default']
+    wrapper.close()
+    wrapper.settings_dict.update(PROFILES[profile], NAME=path)
+    rng = random.Random(seed)
+    latencies = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        kind = 'write' if rng.random() < write_ratio else 'read'
+        started = time.perf_counter()
+        try:
+            if kind == 'write':
+                write(rng, project_ids, user_ids)
+            else:
+                read_page(rng, project_ids)
+        except OperationalError:
+            # "database is locked"
+            errors[kind] += 1
+            wrapper.close()
+        else:
+            latencies[kind].append(time.perf_counter() - started)
+        # End of "request": closes the connection unless CONN_MAX_AGE keeps it
+        close_old_connections()
+    wrapper.close()
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = 'Measure concurrent read/write throughput of SQLite with the default and production profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='tiny', help='Dataset to load first')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent processes (like gunicorn workers)')
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='Share of operations that write')
+        parser.add_argument(
+            '--profile', action='append', choices=sorted(PROFILES), dest='profiles',
+            help='Profile to measure, repeatable (default: all)'
+        )
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('benchmark_database measures SQLite; the database is '
+                               f'{connection.vendor}.')
+        if not 0 <= options['write_ratio'] <= 1:
+            raise CommandError('--write-ratio must be between 0 and 1.')
+
+        directory = tempfile.mkdtemp(prefix='crowdfunding-db-bench-')
+        try:
+            base = os.path.join(directory, 'base.sqlite3')
+            self.stdout.write(f"Generating the {options['scale']} dataset...")
+            with generated_dataset(options['scale']):
+                connection.ensure_connection()
+                target = sqlite3.connect(base)
+                connection.connection.backup(target)
+                target.close()
+                project_ids = list(Project.objects.filter(
+                    is_approved=True, status='active'
+                ).values_list('pk', flat=True))
+                user_ids = list(get_user_model().objects.values_list('pk', flat=True))
+
+            results = {}
+            for profile in options['profiles'] or PROFILES:
+                path = os.path.join(directory, f'{profile}.sqlite3')
+                shutil.copyfile(base, path)
+                results[profile] = self.run_profile(profile, path, options, project_ids, user_ids)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        self.stdout.write(
+            f"{'profile':<12} {'reads/s':>9} {'writes/s':>9} {'read p50':>9} {'read p95':>9} "
+            f"{'write p50':>10} {'write p95':>10} {'locked':>7}"
+        )
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile:<12} {result['reads_per_second']:>9.1f} {result['writes_per_second']:>9.1f} "
+                f"{result['read_ms']['p50']!s:>9} {result['read_ms']['p95']!s:>9} "
+                f"{result['write_ms']['p50']!s:>10} {result['write_ms']['p95']!s:>10} "
+                f"{result['locked_errors']:>7}"
+            )
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+                handle.write('\n')
+            self.stdout.write(f"Results written to {options['output']}")
+        self.stdout.write(self.style.SUCCESS('Database benchmark finished.'))
+
+    def run_profile(self, profile, path, options, project_ids, user_ids):
+        self.stdout.write(f"Running {options['workers']} workers for {options['seconds']}s ({profile})...")
+        # Children must open their own connections
+        connections.close_all()
+        with ProcessPoolExecutor(options['workers'], mp_context=get_context('fork')) as executor:
+            futures = [
+                executor.submit(
+                    worker, profile, path, options['seconds'], options['write_ratio'],
+                    seed, project_ids, user_ids,
+                )
+                for seed in range(options['workers'])
+            ]
+            outcomes = [future.result() for future in futures]
+
+        reads = [value for latencies, _ in outcomes for value in latencies['read']]
+        writes = [value for latencies, _ in outcomes for value in latencies['write']]
+        locked = sum(sum(errors.values()) for _, errors in outcomes)
+
+        wrapper = connections['default']
+        original = dict(wrapper.settings_dict)
+        wrapper.settings_dict.update(PROFILES[profile], NAME=path)
+        try:
+            pragmas = current_pragmas(wrapper, ['journal_mode', 'synchronous', 'busy_timeout'])
+        finally:
+            wrapper.close()
+            wrapper.settings_dict.clear()
+            wrapper.settings_dict.update(original)
+
+        return {
+            'pragmas': pragmas,
+            'reads': len(reads),
+            'writes': len(writes),
+            'reads_per_second': len(reads) / options['seconds'],
+            'writes_per_second': len(writes) / options['seconds'],
+            'read_ms': {'p50': _percentile(reads, 0.5), 'p95': _percentile(reads, 0.95)},
+            'write_ms': {'p50': _percentile(writes, 0.5), 'p95': _percentile(writes, 0.95)},
+            'write_mean_ms': round(statistics.mean(writes) * 1000, 2) if writes else None,
+            'locked_errors': locked,
+        }
@@ -0,0 +1,342 @@
+import io
+import itertools
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from crowdfunding_projects.comments import recompute_comment_counts, recompute_reply_counts
+from crowdfunding_projects.donor_stats import reconcile_donor_stats
+from crowdfunding_projects.ledger import reconcile_project_totals
+from crowdfunding_projects.models import (
+    Category, Comment, Donation, DonationBucket, Project, ProjectImage, Rating, Tag,
+)
+from crowdfunding_projects.ratings import recompute_rating_aggregates
+from crowdfunding_projects.search import fts_available, rebuild_search_index
+from crowdfunding_projects.similarity import build_similarity_index
+from crowdfunding_projects.trending import TRENDING_RETENTION_HOURS, hour_number
+
+User = get_user_model()
+
+WORDS = (
+    'solar water school clinic library garden bakery studio robot film album '
+    'game app bike farm kitchen workshop theatre museum river desert village '
+    'smart green open mobile community local tiny digital handmade sustainable'
+).split()
+
+
+@contextmanager
+def historical_timestamps(*models):
+    """Let bulk_create keep the created_at values we generate"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Generate a large synthetic dataset with bulk inserts for load testing'
+
+    def add_arguments(self, parser):
+        sizes = parser.add_argument_group('sizes')
+        sizes.add_argument('--users', type=int, default=1000)
+        sizes.add_argument('--projects', type=int, default=2000)
+        sizes.add_argument('--donations', type=int, default=50000)
+        sizes.add_argument('--ratings', type=int, default=20000)
+        sizes.add_argument('--comments', type=int, default=10000, help='Top-level comments')
+        sizes.add_argument('--max-replies', type=int, default=6, help='Most replies under one comment')
+        sizes.add_argument('--images', type=int, default=2000)
+        sizes.add_argument('--categories', type=int, default=12)
+        sizes.add_argument('--tags', type=int, default=60)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Zipf exponent for hot projects and power donors (0 = uniform)'
+        )
+        parser.add_argument('--days', type=int, default=90, help='Spread activity over this many days')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--prefix', default='load',
+            help='Prefix of generated usernames, category and tag names'
+        )
+        parser.add_argument(
+            '--skip-indexes', action='store_true',
+            help='Do not rebuild the search and similarity indexes afterwards'
+        )
+
+    # Helpers
+
+    def stage(self, name, rows, started):
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(f'  {name:<22} {rows:>10} rows in {elapsed:7.2f}s ({rate:,.0f}/s)')
+
+    def insert(self, model, objects, **kwargs):
+        """bulk_create ``objects`` (any iterable) in batches; returns the created objects"""
+        created = []
+        iterator = iter(objects)
+        while True:
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                return created
+            with transaction.atomic():
+                created.extend(model.objects.bulk_create(batch, batch_size=self.batch_size, **kwargs))
+
+    def zipf_cum_weights(self, count):
+        """Cumulative weights giving rank r a share of 1 / r ** skew"""
+        return list(itertools.accumulate(1 / (rank ** self.skew) for rank in range(1, count + 1)))
+
+    def pick(self, population, cum_weights, k):
+        return self.rng.choices(population, cum_weights=cum_weights, k=k)
+
+    def moment(self):
+        return self.now - timedelta(seconds=self.rng.uniform(0, self.days * 86400))
+
+    def sentence(self, words):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(words))
+
+    # Stages
+
+    def create_taxonomy(self, options):
+        prefix = options['prefix']
+        categories = self.insert(Category, (
+            Category(name=f'{prefix} {self.sentence(1)} {i}', description=self.sentence(8))
+            for i in range(options['categories'])
+        ))
+        tags = self.insert(Tag, (Tag(name=f'{prefix}-{self.sentence(1)}-{i}') for i in range(options['tags'])))
+        return [c.pk for c in categories], [t.pk for t in tags]
+
+    def create_users(self, options):
+        prefix = options['prefix']
+        password = make_password('password')  # hashed once, shared by every user
+        users = self.insert(User, (
+            User(
+                username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password=password,
+                first_name=self.rng.choice(WORDS).title(), last_name=self.rng.choice(WORDS).title(),
+                phone=f'010{self.rng.randrange(10 ** 8):08d}',
+            )
+            for i in range(options['users'])
+        ))
+        return [u.pk for u in users]
+
+    def create_projects(self, options, user_ids, category_ids, tag_ids):
+        statuses = ['active'] * 70 + ['funded'] * 10 + ['completed'] * 8 + ['cancelled'] * 4 + ['pending'] * 8
+        # A few prolific creators own many projects
+        creator_weights = self.zipf_cum_weights(len(user_ids))
+
+        def projects():
+            creators = self.pick(user_ids, creator_weights, options['projects'])
+            for i, creator in enumerate(creators):
+                created = self.moment()
+                status = self.rng.choice(statuses)
+                title = f'{self.sentence(3).title()} {i}'
+                yield Project(
+                    title=title, slug=f'{self.prefix}-{i}', details=self.sentence(60),
+                    category_id=self.rng.choice(category_ids), creator_id=creator,
+                    total_target=Decimal(self.rng.randrange(1000, 500000, 500)),
+                    start_date=created, end_date=created + timedelta(days=self.rng.randint(14, 120)),
+                    status=status, is_approved=status != 'pending',
+                    is_featured=self.rng.random() < 0.05, created_at=created,
+                )
+
+        project_ids = [p.pk for p in self.insert(Project, projects())]
+        through = Project.tags.through
+        self.insert(through, (
+            through(project_id=pk, tag_id=tag_id)
+            for pk in project_ids
+            for tag_id in self.rng.sample(tag_ids, min(len(tag_ids), self.rng.randint(1, 5)))
+        ))
+        return project_ids
+
+    def create_donations(self, options, user_ids, project_ids):
+        # Hot projects attract most donations; power donors give most often
+        project_weights = self.zipf_cum_weights(len(project_ids))
+        donor_weights = self.zipf_cum_weights(len(user_ids))
+        hot_projects = self.rng.sample(project_ids, len(project_ids))
+        donors = self.rng.sample(user_ids, len(user_ids))
+        oldest_hour = hour_number(self.now) - TRENDING_RETENTION_HOURS
+        buckets = {}
+
+        def donations():
+            remaining = options['donations']
+            while remaining:
+                k = min(remaining, self.batch_size)
+                remaining -= k
+                for project_id, user_id in zip(
+                    self.pick(hot_projects, project_weights, k), self.pick(donors, donor_weights, k)
+                ):
+                    created = self.moment()
+                    amount = self.rng.choice((10, 25, 50, 100, 100, 200, 250, 500, 1000, 5000))
+                    hour = hour_number(created)
+                    if hour > oldest_hour:
+                        bucket = buckets.setdefault((project_id, hour), [0, 0])
+                        bucket[0] += 1
+                        bucket[1] += amount
+                    yield Donation(
+                        project_id=project_id, user_id=user_id, amount=Decimal(amount),
+                        is_anonymous=self.rng.random() < 0.1, created_at=created,
+                    )
+
+        # Keep only counts in memory: donations are written batch by batch
+        total = 0
+        iterator = donations()
+        while True:
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                Donation.objects.bulk_create(batch, batch_size=self.batch_size)
+            total += len(batch)
+
+        self.insert(DonationBucket, (
+            DonationBucket(project_id=project_id, hour=hour, donation_count=count, amount_sum=Decimal(amount))
+            for (project_id, hour), (count, amount) in buckets.items()
+        ))
+        return total
+
+    def create_ratings(self, options, user_ids, project_ids):
+        project_weights = self.zipf_cum_weights(len(project_ids))
+        hot_projects = self.rng.sample(project_ids, len(project_ids))
+
+        def ratings():
+            remaining = options['ratings']
+            while remaining:
+                k = min(remaining, self.batch_size)
+                remaining -= k
+                for project_id in self.pick(hot_projects, project_weights, k):
+                    yield Rating(
+                        project_id=project_id, user_id=self.rng.choice(user_ids),
+                        rating=self.rng.choices((1, 2, 3, 4, 5), weights=(1, 1, 3, 6, 6))[0],
+                        review=self.sentence(12) if self.rng.random() < 0.3 else '',
+                        created_at=self.moment(),
+                    )
+
+        # Duplicate (project, user) pairs are skipped by the unique constraint
+        before = Rating.objects.count()
+        self.insert(Rating, ratings(), ignore_conflicts=True)
+        return Rating.objects.count() - before
+
+    def create_comments(self, options, user_ids, project_ids):
+        project_weights = self.zipf_cum_weights(len(project_ids))
+        hot_projects = self.rng.sample(project_ids, len(project_ids))
+        top_level = self.insert(Comment, (
+            Comment(
+                project_id=project_id, user_id=self.rng.choice(user_ids),
+                content=self.sentence(self.rng.randint(5, 40)),
+                is_approved=self.rng.random() < 0.97, created_at=self.moment(),
+            )
+            for project_id in self.pick(hot_projects, project_weights, options['comments'])
+        ))
+        replies = self.insert(Comment, (
+            Comment(
+                project_id=parent.project_id, parent_id=parent.pk, user_id=self.rng.choice(user_ids),
+                content=self.sentence(self.rng.randint(3, 25)),
+                is_approved=self.rng.random() < 0.97,
+                created_at=parent.created_at + timedelta(minutes=self.rng.randint(1, 5000)),
+            )
+            for parent in top_level
+            # Most threads are short, a few are long
+            for _ in range(min(int(self.rng.paretovariate(1.5)) - 1, options['max_replies']))
+        ))
+        return len(top_level) + len(replies)
+
+    def create_images(self, options, project_ids):
+        from PIL import Image
+
+        # A small palette of real files shared by all rows
+        names = []
+        for i in range(8):
+            buffer = io.BytesIO()
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            Image.new('RGB', (1200, 800), color).save(buffer, 'JPEG', quality=85)
+            names.append(default_storage.save(
+                f'project_images/{self.prefix}-placeholder-{i}.jpg', ContentFile(buffer.getvalue())
+            ))
+        orders = Counter()
+
+        def images():
+            for project_id in self.rng.choices(project_ids, k=options['images']):
+                order = orders[project_id]
+                orders[project_id] += 1
+                yield ProjectImage(
+                    project_id=project_id, image=self.rng.choice(names),
+                    order=order, is_primary=order == 0,
+                )
+
+        self.insert(ProjectImage, images())
+        return options['images']
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.skew = options['skew']
+        self.days = options['days']
+        self.prefix = f"{options['prefix']}{options['seed']}"
+        self.now = timezone.now()
+
+        if User.objects.filter(username=f"{options['prefix']}0").exists():
+            raise CommandError(
+                f"Users with prefix '{options['prefix']}' already exist; pass another --prefix."
+            )
+        if options['users'] < 1 or options['projects'] < 1 or options['categories'] < 1:
+            raise CommandError('At least one user, project and category are needed.')
+
+        self.stdout.write(f"Generating dataset (seed {options['seed']})...")
+        with historical_timestamps(Project, Donation, Rating, Comment):
+            started = time.perf_counter()
+            category_ids, tag_ids = self.create_taxonomy(options)
+            self.stage('categories + tags', len(category_ids) + len(tag_ids), started)
+
+            started = time.perf_counter()
+            user_ids = self.create_users(options)
+            self.stage('users', len(user_ids), started)
+
+            started = time.perf_counter()
+            project_ids = self.create_projects(options, user_ids, category_ids, tag_ids)
+            self.stage('projects + tags', len(project_ids), started)
+
+            started = time.perf_counter()
+            self.stage('donations', self.create_donations(options, user_ids, project_ids), started)
+
+            started = time.perf_counter()
+            self.stage('ratings', self.create_ratings(options, user_ids, project_ids), started)
+
+            started = time.perf_counter()
+            self.stage('comments + replies', self.create_comments(options, user_ids, project_ids), started)
+
+            if options['images']:
+                started = time.perf_counter()
+                self.stage('images', self.create_images(options, project_ids), started)
+
+        # bulk_create skips save(): derive the stored aggregates in bulk
+        started = time.perf_counter()
+        reconcile_project_totals()
+        recompute_rating_aggregates()
+        recompute_reply_counts()
+        recompute_comment_counts()
+        reconcile_donor_stats()
+        self.stage('aggregates', len(project_ids), started)
+
+        if not options['skip_indexes']:
+            started = time.perf_counter()
+            if fts_available():
+                rebuild_search_index(batch_size=self.batch_size)
+            self.stage('similarity + search', build_similarity_index(), started)
+
+        self.stdout.write(self.style.SUCCESS('Dataset generated.'))
@@ -0,0 +1,62 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from crowdfunding_projects.images import (
+    IMAGE_VARIANT_WORKERS, image_source, needs_variants, render_variants, store_variants,
+)
+from crowdfunding_projects.models import ProjectImage
+
+class Command(BaseCommand):
+    help = 'Render resized/WebP variants of project images and profile pictures'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Re-render images that already have variants'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=IMAGE_VARIANT_WORKERS,
+            help='Number of worker processes'
+        )
+
+    def targets(self, force):
+        for image in ProjectImage.objects.exclude(image='').iterator():
+            if force or needs_variants(image, 'image'):
+                yield image, 'image'
+        users = get_user_model().objects.exclude(profile_picture='').exclude(profile_picture=None)
+        for user in users.iterator():
+            if force or needs_variants(user, 'profile_picture'):
+                yield user, 'profile_picture'
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {}
+            for instance, field_name in self.targets(options['force']):
+                fieldfile = getattr(instance, field_name)
+                try:
+                    source = image_source(fieldfile)
+                except OSError:
+                    self.stdout.write(self.style.WARNING(f'Missing file: {fieldfile.name}'))
+                    failed += 1
+                    continue
+                futures[pool.submit(render_variants, source)] = (instance, field_name)
+
+            for future in as_completed(futures):
+                instance, field_name = futures[future]
+                fieldfile = getattr(instance, field_name)
+                try:
+                    content_hash, rendered = future.result()
+                except Exception as exc:
+                    self.stdout.write(self.style.WARNING(f'Could not render {fieldfile.name}: {exc}'))
+                    failed += 1
+                    continue
+                store_variants(
+                    type(instance), instance.pk, field_name, fieldfile.name, content_hash, rendered
+                )
+                done += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rendered variants for {done} image(s); {failed} failed.')
+        )
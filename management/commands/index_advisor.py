@@ -0,0 +1,60 @@
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from crowdfunding_projects.benchmarks import SCALES, build_scenarios, generated_dataset
+from crowdfunding_projects.query_plans import DEFAULT_MIN_ROWS, analyse, capture_page_queries
+
+
+class Command(BaseCommand):
+    help = 'Explain the queries behind the main pages and flag full scans and temp B-trees'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=sorted(SCALES),
+            help='Generate a dataset of this size in a test database instead of using the current data'
+        )
+        parser.add_argument('--only', action='append', help='Only pages whose name contains this')
+        parser.add_argument(
+            '--min-rows', type=int, default=DEFAULT_MIN_ROWS,
+            help='Ignore full scans of tables with fewer rows (default: %(default)s)'
+        )
+        parser.add_argument('--all', action='store_true', help='Show the plans of every query')
+        parser.add_argument(
+            '--fail', action='store_true', help='Exit with an error when problems are found'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('index_advisor reads SQLite query plans; the database is '
+                               f'{connection.vendor}.')
+
+        setup_test_environment()
+        try:
+            with generated_dataset(options['scale']) if options['scale'] else nullcontext():
+                scenarios = [
+                    scenario for scenario in build_scenarios()
+                    if not options['only'] or any(name in scenario.name for name in options['only'])
+                ]
+                queries = analyse(capture_page_queries(scenarios), options['min_rows'])
+        finally:
+            teardown_test_environment()
+
+        flagged = [query for query in queries.values() if query.problems]
+        for query in queries.values():
+            if not (query.problems or options['all']):
+                continue
+            style = self.style.WARNING if query.problems else self.style.SUCCESS
+            self.stdout.write(style(', '.join(query.scenarios)))
+            self.stdout.write(f'  {query.sql}')
+            for line in query.plan:
+                self.stdout.write(f'    {line}')
+            for problem in query.problems:
+                self.stdout.write(self.style.ERROR(f'    ! {problem}'))
+            self.stdout.write('')
+
+        summary = f'{len(queries)} distinct queries, {len(flagged)} with full scans or temp B-trees.'
+        if flagged and options['fail']:
+            raise CommandError(summary)
+        self.stdout.write((self.style.WARNING if flagged else self.style.SUCCESS)(summary))
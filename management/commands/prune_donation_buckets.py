@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from crowdfunding_projects.trending import TRENDING_RETENTION_HOURS, prune_donation_buckets
+
+class Command(BaseCommand):
+    help = 'Delete hourly donation buckets that fell out of the trending window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-hours', type=int, default=TRENDING_RETENTION_HOURS,
+            help='Keep buckets from this many most recent hours'
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_donation_buckets(options['retention_hours'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Deleted {deleted} donation bucket(s).')
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from crowdfunding_projects.search import fts_available, rebuild_search_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text project search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of projects indexed per batch'
+        )
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write(self.style.WARNING('Full-text search requires SQLite FTS5; nothing to do.'))
+            return
+        indexed = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {indexed} project(s).')
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from crowdfunding_projects.similarity import SIMILAR_PROJECTS_TOP_K, build_similarity_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed similar-projects index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project', type=int, action='append', dest='project_ids',
+            help='Only rebuild the neighbours of the given project id (can be repeated)'
+        )
+        parser.add_argument(
+            '--top-k', type=int, default=SIMILAR_PROJECTS_TOP_K,
+            help='Number of neighbours stored per project'
+        )
+
+    def handle(self, *args, **options):
+        rows = build_similarity_index(options['project_ids'], top_k=options['top_k'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Stored {rows} similar-project entries.')
+        )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from crowdfunding_projects.ledger import find_drifted_projects, reconcile_project_totals
+
+class Command(BaseCommand):
+    help = 'Recompute project funding totals from the donation ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project', type=int, action='append', dest='project_ids',
+            help='Only reconcile the given project id (can be repeated)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drifted totals without correcting them'
+        )
+
+    def handle(self, *args, **options):
+        project_ids = options['project_ids']
+        
+        if options['dry_run']:
+            drifted = list(
+                find_drifted_projects(project_ids).values_list('pk', 'current_amount', 'ledger_total')
+            )
+        else:
+            drifted = reconcile_project_totals(project_ids)
+        
+        for project_id, stored, ledger in drifted:
+            self.stdout.write(f'Project {project_id}: stored {stored} EGP, ledger {ledger} EGP')
+        
+        action = 'Found' if options['dry_run'] else 'Reconciled'
+        self.stdout.write(
+            self.style.SUCCESS(f'{action} {len(drifted)} project(s) with drifted totals.')
+        )
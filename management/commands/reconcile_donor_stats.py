@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from crowdfunding_projects.donor_stats import find_drifted_donor_stats, reconcile_donor_stats
+
+class Command(BaseCommand):
+    help = 'Recompute the per-user donation and project totals shown on profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only reconcile the given user id (can be repeated)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drifted stats without correcting them'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+
+        if options['dry_run']:
+            drifted = list(find_drifted_donor_stats(user_ids).values_list('pk', flat=True))
+        else:
+            drifted = reconcile_donor_stats(user_ids)
+
+        for user_id in drifted:
+            self.stdout.write(f'User {user_id}')
+
+        action = 'Found' if options['dry_run'] else 'Reconciled'
+        self.stdout.write(
+            self.style.SUCCESS(f'{action} {len(drifted)} user(s) with drifted stats.')
+        )
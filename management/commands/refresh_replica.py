@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from crowdfunding_projects.replica import REPLICA, refresh_replica, replica_enabled
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary database into the read replica with the SQLite backup API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep refreshing every this many seconds (default: refresh once)'
+        )
+
+    def handle(self, *args, **options):
+        if not replica_enabled():
+            raise CommandError(f"No '{REPLICA}' database configured; set DATABASE_REPLICA=True.")
+        while True:
+            elapsed = refresh_replica()
+            self.stdout.write(self.style.SUCCESS(f'Replica refreshed in {elapsed:.2f}s.'))
+            if not options['interval']:
+                return
+            time.sleep(max(0, options['interval'] - elapsed))
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+from crowdfunding_projects.benchmarks import (
+    DEFAULT_SCALES, DEFAULT_THRESHOLD, SCALES, compare_reports, dataset_counts,
+    format_results, generated_dataset, load_report, new_report, run_scenarios, save_report,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the main views against generated datasets of several sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', action='append', choices=sorted(SCALES), dest='scales',
+            help=f"Dataset scale, repeatable (default: {', '.join(DEFAULT_SCALES)})"
+        )
+        parser.add_argument(
+            '--current-db', action='store_true',
+            help='Benchmark the data already in the database instead of generating datasets'
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Measured runs per scenario')
+        parser.add_argument('--only', action='append', help='Only scenarios whose name contains this')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--baseline', help='Compare with this saved JSON report')
+        parser.add_argument(
+            '--threshold', type=float, default=DEFAULT_THRESHOLD,
+            help='Relative time increase counted as a regression (default: %(default)s)'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit with an error when the baseline comparison finds regressions'
+        )
+
+    def run_scale(self, label, options):
+        self.stdout.write(f'Running scenarios ({label})...')
+        scenarios = run_scenarios(repeat=options['repeat'], only=options['only'])
+        self.stdout.write(format_results(scenarios))
+        return {'dataset': dataset_counts(), 'scenarios': scenarios}
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+        baseline = load_report(options['baseline']) if options['baseline'] else None
+
+        report = new_report(options['repeat'])
+        setup_test_environment()
+        try:
+            if options['current_db']:
+                report['scales']['current'] = self.run_scale('current database', options)
+            else:
+                for scale in options['scales'] or DEFAULT_SCALES:
+                    self.stdout.write(f'Generating the {scale} dataset...')
+                    with generated_dataset(scale, options['seed']):
+                        report['scales'][scale] = self.run_scale(scale, options)
+        finally:
+            teardown_test_environment()
+
+        if options['output']:
+            save_report(report, options['output'])
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if baseline is None:
+            self.stdout.write(self.style.SUCCESS('Benchmarks finished.'))
+            return
+
+        changes = compare_reports(report, baseline, options['threshold'])
+        regressions = [change for change in changes if change[-1]]
+        for scale, name, metric, before, after, regressed in changes:
+            line = f'  {scale:<8} {name:<34} {metric:<8} {before} -> {after}'
+            self.stdout.write(self.style.ERROR(line) if regressed else self.style.SUCCESS(line))
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Benchmarks finished: {len(regressions)} regression(s), '
+            f'{len(changes) - len(regressions)} improvement(s) against the baseline.'
+        ))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from crowdfunding_projects.lifecycle import LIFECYCLE_BATCH_SIZE, TRANSITIONS, due_projects, run_transitions
+
+
+class Command(BaseCommand):
+    help = 'Move campaigns that reached their target or end date to funded/completed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep running every this many seconds (default: run once)'
+        )
+        parser.add_argument('--batch-size', type=int, default=LIFECYCLE_BATCH_SIZE)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report how many projects are due without moving them'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for transition in TRANSITIONS:
+                self.stdout.write(
+                    f'{transition.name}: {due_projects(transition).count()} project(s) '
+                    f'{transition.source} -> {transition.target}'
+                )
+            return
+        while True:
+            started = time.monotonic()
+            moved = run_transitions(batch_size=options['batch_size'])
+            summary = ', '.join(f'{name} {count}' for name, count in moved.items())
+            self.stdout.write(self.style.SUCCESS(f'Lifecycle run finished: {summary}.'))
+            if not options['interval']:
+                return
+            time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
@@ -0,0 +1,127 @@
+import signal
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait,
+)
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.module_loading import autodiscover_modules
+from crowdfunding_projects.background import (
+    DONE, FAILED, claim_tasks, execute_task, purge_tasks, recover_stale_tasks,
+    task_metrics, worker_id,
+)
+
+
+def _init_process():
+    # Forked workers must not share the parent's database connections
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Number of tasks run concurrently'
+        )
+        parser.add_argument(
+            '--processes', action='store_true',
+            help='Run tasks in worker processes instead of threads (CPU-bound tasks)'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to wait for new tasks when the queue is empty'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once no task is ready instead of waiting for more'
+        )
+        parser.add_argument(
+            '--stale-minutes', type=int, default=30,
+            help='Requeue tasks left running for longer than this (dead workers)'
+        )
+        parser.add_argument(
+            '--purge-days', type=int, default=None,
+            help='Delete tasks finished more than this many days ago before starting'
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Print per-task counts and timings, then exit'
+        )
+
+    def print_stats(self):
+        rows = task_metrics()
+        if not rows:
+            self.stdout.write('No tasks recorded.')
+            return
+        width = max(len(row['name']) for row in rows)
+        self.stdout.write(
+            f"{'task':<{width}} {'total':>7} {'pending':>7} {'done':>7} {'failed':>7} "
+            f"{'retried':>7} {'avg ms':>9} {'max ms':>9}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['name']:<{width}} {row['total']:>7} {row['pending']:>7} {row['done']:>7} "
+                f"{row['failed']:>7} {row['retried']:>7} {row['avg_ms'] or 0:>9.1f} "
+                f"{row['max_ms'] or 0:>9.1f}"
+            )
+
+    def count(self, finished, counts):
+        for future in finished:
+            status = future.result()
+            counts[status if status in counts else 'retry'] += 1
+
+    def stop(self, signum, frame):
+        self.stdout.write('Finishing running tasks...')
+        self.stopping = True
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats()
+            return
+
+        autodiscover_modules('tasks')
+        if options['purge_days'] is not None:
+            purged = purge_tasks(timedelta(days=options['purge_days']))
+            self.stdout.write(f'Purged {purged} finished task(s).')
+        recovered = recover_stale_tasks(timedelta(minutes=options['stale_minutes']))
+        if recovered:
+            self.stdout.write(self.style.WARNING(f'Requeued {recovered} stale task(s).'))
+
+        self.stopping = False
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        workers = max(options['workers'], 1)
+        if options['processes']:
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_process)
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='task')
+
+        worker = worker_id()
+        counts = {DONE: 0, FAILED: 0, 'retry': 0}
+        running = set()
+        try:
+            while not self.stopping:
+                claimed = claim_tasks(workers - len(running), worker) if len(running) < workers else []
+                running.update(pool.submit(execute_task, pk) for pk in claimed)
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                finished, running = wait(
+                    running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED
+                )
+                self.count(finished, counts)
+            self.count(wait(running).done, counts)
+        finally:
+            pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Ran {counts[DONE]} task(s); {counts['retry']} to retry, {counts[FAILED]} failed."
+        ))
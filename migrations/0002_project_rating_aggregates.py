@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:56
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Project = apps.get_model('crowdfunding_projects', 'Project')
+    Rating = apps.get_model('crowdfunding_projects', 'Rating')
+
+    def aggregate(expression):
+        values = Rating.objects.filter(
+            project=OuterRef('pk')
+        ).order_by().values('project').annotate(value=expression).values('value')
+        return Coalesce(Subquery(values), Value(0), output_field=IntegerField())
+
+    Project.objects.update(
+        rating_sum=aggregate(Sum('rating')),
+        rating_count=aggregate(Count('pk')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crowdfunding_projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
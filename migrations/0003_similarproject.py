@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crowdfunding_projects', '0002_project_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='crowdfunding_projects.project')),
+                ('similar_project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='crowdfunding_projects.project')),
+            ],
+            options={
+                'ordering': ['project', 'rank'],
+                'unique_together': {('project', 'rank')},
+            },
+        ),
+    ]
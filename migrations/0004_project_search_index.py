@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import migrations
+
+FTS_TABLE = 'crowdfunding_projects_project_fts'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Project = apps.get_model('crowdfunding_projects', 'Project')
+    Category = apps.get_model('crowdfunding_projects', 'Category')
+    Tag = apps.get_model('crowdfunding_projects', 'Tag')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    project_tags = Project._meta.get_field('tags').remote_field.through._meta.db_table
+
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"title, details, tags, category, creator, "
+        f"tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, details, tags, category, creator) "
+        f"SELECT p.id, p.title, p.details, "
+        f"COALESCE((SELECT group_concat(t.name, ' ') FROM {project_tags} pt "
+        f"JOIN {Tag._meta.db_table} t ON t.id = pt.tag_id WHERE pt.project_id = p.id), ''), "
+        f"c.name, u.username "
+        f"FROM {Project._meta.db_table} p "
+        f"JOIN {Category._meta.db_table} c ON c.id = p.category_id "
+        f"JOIN {User._meta.db_table} u ON u.id = p.creator_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('crowdfunding_projects', '0003_similarproject'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
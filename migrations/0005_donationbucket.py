@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:01
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_donation_buckets(apps, schema_editor):
+    # Only the last week matters for trending
+    Donation = apps.get_model('crowdfunding_projects', 'Donation')
+    DonationBucket = apps.get_model('crowdfunding_projects', 'DonationBucket')
+
+    buckets = {}
+    recent = Donation.objects.filter(created_at__gte=timezone.now() - timedelta(days=7))
+    for project_id, amount, created_at in recent.values_list('project_id', 'amount', 'created_at').iterator():
+        key = (project_id, int(created_at.timestamp() // 3600))
+        count, total = buckets.get(key, (0, 0))
+        buckets[key] = (count + 1, total + amount)
+    DonationBucket.objects.bulk_create(
+        [
+            DonationBucket(project_id=project_id, hour=hour, donation_count=count, amount_sum=total)
+            for (project_id, hour), (count, total) in buckets.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crowdfunding_projects', '0004_project_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonationBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.PositiveIntegerField(help_text='Hours since the Unix epoch')),
+                ('donation_count', models.PositiveIntegerField(default=0)),
+                ('amount_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='donation_buckets', to='crowdfunding_projects.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='crowdfundin_hour_41dabd_idx')],
+                'unique_together': {('project', 'hour')},
+            },
+        ),
+        migrations.RunPython(backfill_donation_buckets, migrations.RunPython.noop),
+    ]
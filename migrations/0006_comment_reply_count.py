@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:04
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_reply_counts(apps, schema_editor):
+    Comment = apps.get_model('crowdfunding_projects', 'Comment')
+    counts = Comment.objects.filter(
+        parent=OuterRef('pk'), is_approved=True
+    ).order_by().values('parent').annotate(total=Count('pk')).values('total')
+    Comment.objects.update(
+        reply_count=Coalesce(Subquery(counts), Value(0), output_field=IntegerField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crowdfunding_projects', '0005_donationbucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Approved replies'),
+        ),
+        migrations.RunPython(backfill_reply_counts, migrations.RunPython.noop),
+    ]
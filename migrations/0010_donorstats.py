@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_donor_stats(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Donation = apps.get_model('crowdfunding_projects', 'Donation')
+    Project = apps.get_model('crowdfunding_projects', 'Project')
+    DonorStats = apps.get_model('crowdfunding_projects', 'DonorStats')
+
+    def aggregate(queryset, group_by, expression, output_field):
+        values = queryset.order_by().values(group_by).annotate(value=expression).values('value')
+        return Coalesce(Subquery(values), Value(0), output_field=output_field)
+
+    active = User.objects.filter(
+        Q(project_donations__isnull=False) | Q(created_projects__isnull=False)
+    ).values_list('pk', flat=True).distinct()
+    DonorStats.objects.bulk_create([DonorStats(user_id=user_id) for user_id in active], batch_size=1000)
+    donations = Donation.objects.filter(user=OuterRef('user'))
+    DonorStats.objects.update(
+        total_donated=aggregate(donations, 'user', Sum('amount'), DecimalField(max_digits=14, decimal_places=2)),
+        donation_count=aggregate(donations, 'user', Count('pk'), IntegerField()),
+        projects_backed=aggregate(donations, 'user', Count('project', distinct=True), IntegerField()),
+        projects_created=aggregate(
+            Project.objects.filter(creator=OuterRef('user')), 'creator', Count('pk'), IntegerField()
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_customuser_profile_picture_variants'),
+        ('crowdfunding_projects', '0009_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='donor_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_donated', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('donation_count', models.PositiveIntegerField(default=0)),
+                ('projects_created', models.PositiveIntegerField(default=0)),
+                ('projects_backed', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'donor stats',
+            },
+        ),
+        migrations.RunPython(backfill_donor_stats, migrations.RunPython.noop),
+    ]
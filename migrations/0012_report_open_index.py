@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crowdfunding_projects', '0011_project_title_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(('is_resolved', False)), fields=['report_type', 'project', 'comment', 'created_at'], name='report_open_idx'),
+        ),
+    ]
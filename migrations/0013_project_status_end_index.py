@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crowdfunding_projects', '0012_report_open_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', 'end_date'], name='project_status_end_idx'),
+        ),
+    ]
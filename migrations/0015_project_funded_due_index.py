@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crowdfunding_projects', '0014_donation_user_set_null'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('current_amount__gte', models.F('total_target'))), fields=['status', 'end_date'], name='project_funded_due_idx'),
+        ),
+    ]
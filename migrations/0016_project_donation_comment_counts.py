@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:34
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counts(apps, schema_editor):
+    Project = apps.get_model('crowdfunding_projects', 'Project')
+    Comment = apps.get_model('crowdfunding_projects', 'Comment')
+    Donation = apps.get_model('crowdfunding_projects', 'Donation')
+
+    def count(queryset):
+        totals = queryset.filter(
+            project=OuterRef('pk')
+        ).order_by().values('project').annotate(total=Count('pk')).values('total')
+        return Coalesce(Subquery(totals), Value(0), output_field=IntegerField())
+
+    Project.objects.update(
+        donation_count=count(Donation.objects.all()),
+        comment_count=count(Comment.objects.filter(is_approved=True)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crowdfunding_projects', '0015_project_funded_due_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='donation_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
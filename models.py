@@ -1,315 +1,524 @@
-from django.db import models
-from django.contrib.auth import get_user_model
-from django.core.validators import MinValueValidator, MaxValueValidator
-from django.utils import timezone
-from django.urls import reverse
-from django.db.models import Avg, Count
-import uuid
-
-User = get_user_model()
-
-class Category(models.Model):
-    """Project categories managed by admins"""
-    name = models.CharField(max_length=100, unique=True)
-    description = models.TextField(blank=True)
-    icon = models.CharField(max_length=50, blank=True, help_text="FontAwesome icon class")
-    color = models.CharField(max_length=7, default="#667eea", help_text="Hex color code")
-    is_active = models.BooleanField(default=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-
-    class Meta:
-        verbose_name_plural = "Categories"
-        ordering = ['name']
-
-    def __str__(self):
-        return self.name
-
-    def get_absolute_url(self):
-        return reverse('projects:category_detail', kwargs={'pk': self.pk})
-
-class Tag(models.Model):
-    """Project tags for categorization and search"""
-    name = models.CharField(max_length=50, unique=True)
-    color = models.CharField(max_length=7, default="#6c757d", help_text="Hex color code")
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        ordering = ['name']
-
-    def __str__(self):
-        return self.name
-
-    def get_absolute_url(self):
-        return reverse('projects:tag_detail', kwargs={'pk': self.pk})
-
-class Project(models.Model):
-    """Crowdfunding project model"""
-    STATUS_CHOICES = [
-        ('draft', 'Draft'),
-        ('pending', 'Pending Approval'),
-        ('active', 'Active'),
-        ('funded', 'Fully Funded'),
-        ('cancelled', 'Cancelled'),
-        ('completed', 'Completed'),
-    ]
-
-    # Basic Information
-    title = models.CharField(max_length=200)
-    slug = models.SlugField(max_length=200, unique=True, blank=True)
-    details = models.TextField()
-    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='projects')
-    tags = models.ManyToManyField(Tag, related_name='projects', blank=True)
-    
-    # Creator
-    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_projects')
-    
-    # Financial
-    total_target = models.DecimalField(
-        max_digits=12, 
-        decimal_places=2,
-        validators=[MinValueValidator(1000)],  # Minimum 1000 EGP
-        help_text="Target amount in EGP"
-    )
-    current_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
-    
-    # Timeline
-    start_date = models.DateTimeField()
-    end_date = models.DateTimeField()
-    
-    # Status and Approval
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
-    is_featured = models.BooleanField(default=False)
-    is_approved = models.BooleanField(default=False)
-    approved_at = models.DateTimeField(null=True, blank=True)
-    approved_by = models.ForeignKey(
-        User, 
-        on_delete=models.SET_NULL, 
-        null=True, 
-        blank=True, 
-        related_name='approved_projects'
-    )
-    
-    # Metadata
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-    
-    class Meta:
-        ordering = ['-created_at']
-
-    def __str__(self):
-        return self.title
-
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = f"{uuid.uuid4().hex[:8]}-{self.title.lower().replace(' ', '-')}"
-        super().save(*args, **kwargs)
-
-    def get_absolute_url(self):
-        return reverse('projects:project_detail', kwargs={'slug': self.slug})
-
-    @property
-    def progress_percentage(self):
-        """Calculate funding progress percentage"""
-        if self.total_target and self.total_target > 0:
-            return min((self.current_amount / self.total_target) * 100, 100)
-        return 0
-
-    @property
-    def days_remaining(self):
-        """Calculate days remaining in campaign"""
-        if self.status == 'active':
-            remaining = self.end_date - timezone.now()
-            return max(remaining.days, 0)
-        return 0
-
-    @property
-    def is_cancellable(self):
-        """Check if project can be cancelled (less than 25% funded)"""
-        return self.status == 'active' and self.progress_percentage < 25
-
-    @property
-    def average_rating(self):
-        """Calculate average project rating"""
-        return self.ratings.aggregate(Avg('rating'))['rating__avg'] or 0
-
-    @property
-    def total_ratings(self):
-        """Get total number of ratings"""
-        return self.ratings.count()
-    
-    @property
-    def status_color(self):
-        """Get Bootstrap color class for status"""
-        status_colors = {
-            'draft': 'secondary',
-            'pending': 'warning',
-            'active': 'success',
-            'funded': 'info',
-            'cancelled': 'danger',
-            'completed': 'primary',
-        }
-        return status_colors.get(self.status, 'secondary')
-
-    def get_similar_projects(self, limit=4):
-        """Get similar projects based on tags and category"""
-        similar = Project.objects.filter(
-            models.Q(category=self.category) | models.Q(tags__in=self.tags.all()),
-            status='active',
-            is_approved=True
-        ).exclude(pk=self.pk).distinct()
-        
-        # Score based on tag matches
-        scored_projects = []
-        for project in similar:
-            score = 0
-            if project.category == self.category:
-                score += 2
-            common_tags = set(project.tags.all()) & set(self.tags.all())
-            score += len(common_tags)
-            scored_projects.append((project, score))
-        
-        # Sort by score and return top results
-        scored_projects.sort(key=lambda x: x[1], reverse=True)
-        return [project for project, score in scored_projects[:limit]]
-
-class ProjectImage(models.Model):
-    """Multiple images for a project"""
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='images')
-    image = models.ImageField(upload_to='project_images/')
-    caption = models.CharField(max_length=200, blank=True)
-    is_primary = models.BooleanField(default=False)
-    order = models.PositiveIntegerField(default=0)
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        ordering = ['order', 'created_at']
-
-    def __str__(self):
-        return f"{self.project.title} - Image {self.order}"
-
-    def save(self, *args, **kwargs):
-        if self.is_primary:
-            # Ensure only one primary image per project
-            ProjectImage.objects.filter(project=self.project, is_primary=True).update(is_primary=False)
-        super().save(*args, **kwargs)
-
-class Comment(models.Model):
-    """Project comments with reply support"""
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='comments')
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_comments')
-    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
-    content = models.TextField()
-    is_approved = models.BooleanField(default=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-
-    class Meta:
-        ordering = ['-created_at']
-
-    def __str__(self):
-        return f"Comment by {self.user.username} on {self.project.title}"
-
-    @property
-    def is_reply(self):
-        return self.parent is not None
-
-    @property
-    def reply_count(self):
-        return self.replies.filter(is_approved=True).count()
-
-class Rating(models.Model):
-    """Project ratings by users"""
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='ratings')
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_ratings')
-    rating = models.PositiveIntegerField(
-        validators=[MinValueValidator(1), MaxValueValidator(5)],
-        help_text="Rating from 1 to 5"
-    )
-    review = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-
-    class Meta:
-        unique_together = ['project', 'user']
-        ordering = ['-created_at']
-
-    def __str__(self):
-        return f"{self.rating}/5 by {self.user.username} on {self.project.title}"
-
-class Donation(models.Model):
-    """Project donations by users"""
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='donations')
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_donations')
-    amount = models.DecimalField(
-        max_digits=10, 
-        decimal_places=2,
-        validators=[MinValueValidator(10)],  # Minimum 10 EGP
-        help_text="Donation amount in EGP"
-    )
-    message = models.TextField(blank=True)
-    is_anonymous = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        ordering = ['-created_at']
-
-    def __str__(self):
-        return f"{self.amount} EGP by {self.user.username} to {self.project.title}"
-
-    def save(self, *args, **kwargs):
-        # Update project current amount
-        if not self.pk:  # New donation
-            self.project.current_amount += self.amount
-            self.project.save()
-        super().save(*args, **kwargs)
-
-class Report(models.Model):
-    """Reports for inappropriate projects or comments"""
-    REPORT_TYPES = [
-        ('project', 'Project'),
-        ('comment', 'Comment'),
-    ]
-    
-    REPORT_REASONS = [
-        ('inappropriate', 'Inappropriate Content'),
-        ('spam', 'Spam'),
-        ('fake', 'Fake or Misleading'),
-        ('violence', 'Violence or Hate Speech'),
-        ('copyright', 'Copyright Violation'),
-        ('other', 'Other'),
-    ]
-
-    reporter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports')
-    report_type = models.CharField(max_length=20, choices=REPORT_TYPES)
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name='reports')
-    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, null=True, blank=True, related_name='reports')
-    reason = models.CharField(max_length=20, choices=REPORT_REASONS)
-    description = models.TextField(blank=True)
-    is_resolved = models.BooleanField(default=False)
-    resolved_by = models.ForeignKey(
-        User, 
-        on_delete=models.SET_NULL, 
-        null=True, 
-        blank=True, 
-        related_name='resolved_reports'
-    )
-    resolved_at = models.DateTimeField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        ordering = ['-created_at']
-
-    def __str__(self):
-        return f"Report by {self.reporter.username} on {self.get_report_type_display()}"
-
-    def clean(self):
-        from django.core.exceptions import ValidationError
-        if self.report_type == 'project' and not self.project:
-            raise ValidationError('Project must be specified for project reports')
-        if self.report_type == 'comment' and not self.comment:
-            raise ValidationError('Comment must be specified for comment reports')
-
-    def save(self, *args, **kwargs):
-        self.clean()
-        super().save(*args, **kwargs)
+from django.db import models, transaction
+from django.contrib.auth import get_user_model
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from django.urls import reverse
+from django.db.models import F, Q
+import uuid
+
+from .comments import apply_comment_delta, apply_reply_delta
+from .donor_stats import record_donation_stats, record_project_stats
+from .images import variant_url
+from .ledger import apply_donation
+from .ratings import apply_rating_delta
+from .trending import record_donation_bucket
+
+User = get_user_model()
+
+class Category(models.Model):
+    """Project categories managed by admins"""
+    name = models.CharField(max_length=100, unique=True)
+    description = models.TextField(blank=True)
+    icon = models.CharField(max_length=50, blank=True, help_text="FontAwesome icon class")
+    color = models.CharField(max_length=7, default="#667eea", help_text="Hex color code")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Categories"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse('projects:category_detail', kwargs={'pk': self.pk})
+
+class Tag(models.Model):
+    """Project tags for categorization and search"""
+    name = models.CharField(max_length=50, unique=True)
+    color = models.CharField(max_length=7, default="#6c757d", help_text="Hex color code")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return reverse('projects:tag_detail', kwargs={'pk': self.pk})
+
+class Project(models.Model):
+    """Crowdfunding project model"""
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('pending', 'Pending Approval'),
+        ('active', 'Active'),
+        ('funded', 'Fully Funded'),
+        ('cancelled', 'Cancelled'),
+        ('completed', 'Completed'),
+    ]
+
+    # Basic Information
+    title = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=200, unique=True, blank=True)
+    details = models.TextField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='projects')
+    tags = models.ManyToManyField(Tag, related_name='projects', blank=True)
+    
+    # Creator
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_projects')
+    
+    # Financial
+    total_target = models.DecimalField(
+        max_digits=12, 
+        decimal_places=2,
+        validators=[MinValueValidator(1000)],  # Minimum 1000 EGP
+        help_text="Target amount in EGP"
+    )
+    current_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Donations in the ledger and approved comments (see ledger.py, comments.py)
+    donation_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    # Ratings (denormalized, maintained by Rating.save/delete)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    # Timeline
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    
+    # Status and Approval
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    is_featured = models.BooleanField(default=False)
+    is_approved = models.BooleanField(default=False)
+    approved_at = models.DateTimeField(null=True, blank=True)
+    approved_by = models.ForeignKey(
+        User, 
+        on_delete=models.SET_NULL, 
+        null=True, 
+        blank=True, 
+        related_name='approved_projects'
+    )
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        # Public listings filter is_approved and page through one sort
+        # column: partial indexes walk the approved rows in order and stop
+        # after a page (see ``manage.py index_advisor``)
+        indexes = [
+            models.Index(fields=['-created_at'], name='project_public_created_idx',
+                         condition=Q(is_approved=True)),
+            models.Index(fields=['end_date'], name='project_public_end_idx',
+                         condition=Q(is_approved=True)),
+            models.Index(fields=['-total_target'], name='project_public_target_idx',
+                         condition=Q(is_approved=True)),
+            models.Index(fields=['category', '-created_at'], name='project_category_created_idx',
+                         condition=Q(is_approved=True)),
+            models.Index(fields=['creator', '-created_at'], name='project_creator_created_idx'),
+            # Admin autocomplete (title prefix)
+            models.Index(fields=['title'], name='project_title_idx'),
+            # Lifecycle scheduler: due campaigns of a status (lifecycle.py)
+            models.Index(fields=['status', 'end_date'], name='project_status_end_idx'),
+            # Lifecycle scheduler: campaigns that reached their target (a
+            # column comparison the index above cannot narrow). Status is a
+            # key column, not in the condition: SQLite only uses a partial
+            # index whose condition the query implies without its parameters
+            models.Index(fields=['status', 'end_date'], name='project_funded_due_idx',
+                         condition=Q(current_amount__gte=F('total_target'))),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the similarity index was built from
+        instance._similarity_key = instance.similarity_key
+        # And the stored row, to tell which fields a save changes
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    @property
+    def similarity_key(self):
+        return (
+            self.__dict__.get('category_id'),
+            self.__dict__.get('status'),
+            self.__dict__.get('is_approved'),
+        )
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = f"{uuid.uuid4().hex[:8]}-{self.title.lower().replace(' ', '-')}"
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            record_project_stats(self)
+
+    def get_absolute_url(self):
+        return reverse('projects:project_detail', kwargs={'slug': self.slug})
+
+    @property
+    def progress_percentage(self):
+        """Calculate funding progress percentage"""
+        if self.total_target and self.total_target > 0:
+            return min((self.current_amount / self.total_target) * 100, 100)
+        return 0
+
+    @property
+    def days_remaining(self):
+        """Calculate days remaining in campaign"""
+        if self.status == 'active':
+            remaining = self.end_date - timezone.now()
+            return max(remaining.days, 0)
+        return 0
+
+    @property
+    def is_cancellable(self):
+        """Check if project can be cancelled (less than 25% funded)"""
+        return self.status == 'active' and self.progress_percentage < 25
+
+    @property
+    def average_rating(self):
+        """Average project rating from the stored aggregates"""
+        if self.rating_count:
+            return self.rating_sum / self.rating_count
+        return 0
+
+    @property
+    def total_ratings(self):
+        """Get total number of ratings"""
+        return self.rating_count
+    
+    @property
+    def status_color(self):
+        """Get Bootstrap color class for status"""
+        status_colors = {
+            'draft': 'secondary',
+            'pending': 'warning',
+            'active': 'success',
+            'funded': 'info',
+            'cancelled': 'danger',
+            'completed': 'primary',
+        }
+        return status_colors.get(self.status, 'secondary')
+
+    def get_similar_projects(self, limit=4):
+        """Get similar projects from the precomputed similarity index"""
+        return list(
+            Project.objects.filter(
+                neighbour_of__project=self,
+                status='active',
+                is_approved=True
+            ).select_related('creator').order_by('neighbour_of__rank')[:limit]
+        )
+
+class SimilarProject(models.Model):
+    """Precomputed nearest neighbours of a project (see similarity.py)"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='neighbours')
+    similar_project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='neighbour_of')
+    score = models.PositiveIntegerField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['project', 'rank']
+        unique_together = ['project', 'rank']
+
+    def __str__(self):
+        return f"{self.similar_project_id} is #{self.rank} for {self.project_id}"
+
+class ProjectImage(models.Model):
+    """Multiple images for a project"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='images')
+    image = models.ImageField(upload_to='project_images/')
+    caption = models.CharField(max_length=200, blank=True)
+    is_primary = models.BooleanField(default=False)
+    order = models.PositiveIntegerField(default=0)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['order', 'created_at']
+
+    def __str__(self):
+        return f"{self.project.title} - Image {self.order}"
+
+    def variant_url(self, size='card', image_format='webp'):
+        """URL of a resized variant, or of the original until it exists"""
+        return variant_url(self.image, size, image_format)
+
+    def save(self, *args, **kwargs):
+        if self.is_primary:
+            # Ensure only one primary image per project
+            ProjectImage.objects.filter(project=self.project, is_primary=True).update(is_primary=False)
+        super().save(*args, **kwargs)
+
+class Comment(models.Model):
+    """Project comments with reply support"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='comments')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_comments')
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
+    content = models.TextField()
+    is_approved = models.BooleanField(default=True)
+    reply_count = models.PositiveIntegerField(default=0, editable=False, help_text="Approved replies")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Top-level threads of a project, newest first
+            models.Index(fields=['project', '-created_at', '-id'], name='comment_thread_idx',
+                         condition=Q(parent__isnull=True, is_approved=True)),
+            models.Index(fields=['parent', '-created_at', '-id'], name='comment_reply_idx',
+                         condition=Q(is_approved=True)),
+        ]
+
+    def __str__(self):
+        return f"Comment by {self.user.username} on {self.project.title}"
+
+    @property
+    def is_reply(self):
+        return self.parent_id is not None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember whether this row is counted in its parent's reply_count
+        instance._stored_reply_state = (
+            instance.__dict__.get('parent_id'), instance.__dict__.get('is_approved')
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if self._state.adding:
+                stored_parent_id, stored_approved = None, False
+            elif hasattr(self, '_stored_reply_state') and None not in self._stored_reply_state[1:]:
+                stored_parent_id, stored_approved = self._stored_reply_state
+            else:
+                stored_parent_id, stored_approved = Comment.objects.filter(
+                    pk=self.pk
+                ).values_list('parent_id', 'is_approved').first() or (None, False)
+            super().save(*args, **kwargs)
+            was_counted = stored_parent_id is not None and stored_approved
+            is_counted = self.parent_id is not None and self.is_approved
+            moved = stored_parent_id != self.parent_id
+            if was_counted and (moved or not is_counted):
+                apply_reply_delta(stored_parent_id, -1)
+            if is_counted and (moved or not was_counted):
+                apply_reply_delta(self.parent_id, 1)
+            if stored_approved != self.is_approved:
+                apply_comment_delta(self.project_id, 1 if self.is_approved else -1)
+        self._stored_reply_state = (self.parent_id, self.is_approved)
+
+class Rating(models.Model):
+    """Project ratings by users"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='ratings')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_ratings')
+    rating = models.PositiveIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(5)],
+        help_text="Rating from 1 to 5"
+    )
+    review = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['project', 'user']
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.rating}/5 by {self.user.username} on {self.project.title}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so save() can apply a delta
+        instance._stored = (instance.__dict__.get('project_id'), instance.__dict__.get('rating'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            adding = self._state.adding
+            stored_project_id, stored_rating = (None, None) if adding else getattr(self, '_stored', (None, None))
+            if not adding and stored_project_id is None:
+                stored_project_id, stored_rating = Rating.objects.filter(
+                    pk=self.pk
+                ).values_list('project_id', 'rating').first() or (None, None)
+            super().save(*args, **kwargs)
+            if stored_project_id is None:
+                apply_rating_delta(self.project_id, self.rating, 1)
+            elif stored_project_id != self.project_id:
+                apply_rating_delta(stored_project_id, -stored_rating, -1)
+                apply_rating_delta(self.project_id, self.rating, 1)
+            else:
+                apply_rating_delta(self.project_id, self.rating - stored_rating, 0)
+        self._stored = (self.project_id, self.rating)
+
+class Donation(models.Model):
+    """Project donations by users"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='donations')
+    # Raised money stays in the ledger when the donor deletes their account
+    user = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='project_donations'
+    )
+    amount = models.DecimalField(
+        max_digits=10, 
+        decimal_places=2,
+        validators=[MinValueValidator(10)],  # Minimum 10 EGP
+        help_text="Donation amount in EGP"
+    )
+    message = models.TextField(blank=True)
+    is_anonymous = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', '-created_at'], name='donation_project_created_idx'),
+            models.Index(fields=['user', '-created_at'], name='donation_user_created_idx'),
+        ]
+
+    def __str__(self):
+        donor = self.user.username if self.user_id else 'a deleted account'
+        return f"{self.amount} EGP by {donor} to {self.project.title}"
+
+    def save(self, *args, **kwargs):
+        # Donations are append-only ledger entries: only a new entry moves the
+        # project total, via one atomic UPDATE in the same transaction.
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            apply_donation(self.project_id, self.amount)
+            record_donation_bucket(self.project_id, self.amount, self.created_at)
+            record_donation_stats(self)
+
+class DonationBucket(models.Model):
+    """Hourly donation counters per project (see trending.py)"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='donation_buckets')
+    hour = models.PositiveIntegerField(help_text="Hours since the Unix epoch")
+    donation_count = models.PositiveIntegerField(default=0)
+    amount_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ['project', 'hour']
+        indexes = [models.Index(fields=['hour'])]
+
+    def __str__(self):
+        return f"{self.donation_count} donations to {self.project_id} in hour {self.hour}"
+
+class DonorStats(models.Model):
+    """A user's donation and project totals (see donor_stats.py)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='donor_stats')
+    total_donated = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    donation_count = models.PositiveIntegerField(default=0)
+    projects_created = models.PositiveIntegerField(default=0)
+    projects_backed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'donor stats'
+
+    def __str__(self):
+        return f"{self.total_donated} EGP in {self.donation_count} donations by {self.user_id}"
+
+class Report(models.Model):
+    """Reports for inappropriate projects or comments"""
+    REPORT_TYPES = [
+        ('project', 'Project'),
+        ('comment', 'Comment'),
+    ]
+    
+    REPORT_REASONS = [
+        ('inappropriate', 'Inappropriate Content'),
+        ('spam', 'Spam'),
+        ('fake', 'Fake or Misleading'),
+        ('violence', 'Violence or Hate Speech'),
+        ('copyright', 'Copyright Violation'),
+        ('other', 'Other'),
+    ]
+
+    reporter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports')
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPES)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name='reports')
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, null=True, blank=True, related_name='reports')
+    reason = models.CharField(max_length=20, choices=REPORT_REASONS)
+    description = models.TextField(blank=True)
+    is_resolved = models.BooleanField(default=False)
+    resolved_by = models.ForeignKey(
+        User, 
+        on_delete=models.SET_NULL, 
+        null=True, 
+        blank=True, 
+        related_name='resolved_reports'
+    )
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Moderation queue: open reports grouped by reported item
+            models.Index(fields=['report_type', 'project', 'comment', 'created_at'], name='report_open_idx',
+                         condition=Q(is_resolved=False)),
+        ]
+
+    def __str__(self):
+        return f"Report by {self.reporter.username} on {self.get_report_type_display()}"
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        if self.report_type == 'project' and not self.project:
+            raise ValidationError('Project must be specified for project reports')
+        if self.report_type == 'comment' and not self.comment:
+            raise ValidationError('Comment must be specified for comment reports')
+
+    def save(self, *args, **kwargs):
+        self.clean()
+        super().save(*args, **kwargs)
+
+class Task(models.Model):
+    """Deferred side effect run by the ``run_tasks`` worker (see background.py)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.IntegerField(default=0, help_text="Higher runs first")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True, help_text="Run time of the last attempt")
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_after'], name='task_ready_idx'),
+            models.Index(fields=['name', 'status'], name='task_name_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,138 @@
+"""
+Set-based moderation.
+
+Moderators act on hundreds of projects, comments or reports at a time (admin
+actions and the moderation queue), so every action is one ``UPDATE`` over the
+selected rows instead of a ``save()`` per row:
+
+* approving projects stamps ``approved_by``/``approved_at``, hiding them
+  clears the approval;
+* resolving reports stamps ``resolved_by``/``resolved_at``;
+* approving or hiding comments recomputes the stored ``reply_count`` of the
+  threads they belong to and the ``comment_count`` of their projects.
+
+``update()`` sends no ``post_save``, so project actions send
+``projects_updated`` (see signals.py) for the search and similarity indexes
+and the homepage cache.
+
+``moderation_queue`` lists the reported projects and comments with the most
+open reports first, grouped on the ``report_open_idx`` partial index.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .comments import recompute_comment_counts, recompute_reply_counts
+from .signals import projects_updated
+
+
+def _updated_projects(queryset, **changes):
+    """UPDATE ``queryset`` and announce the projects it changed"""
+    from .models import Project
+
+    with transaction.atomic():
+        project_ids = list(queryset.values_list('pk', flat=True))
+        if not project_ids:
+            return 0
+        updated = queryset.update(**changes)
+        transaction.on_commit(
+            lambda: projects_updated.send(sender=Project, project_ids=project_ids)
+        )
+    return updated
+
+
+def approve_projects(queryset, moderator):
+    return _updated_projects(
+        queryset.filter(is_approved=False),
+        is_approved=True, approved_by=moderator, approved_at=timezone.now(),
+    )
+
+
+def hide_projects(queryset):
+    return _updated_projects(
+        queryset.filter(is_approved=True),
+        is_approved=False, approved_by=None, approved_at=None, is_featured=False,
+    )
+
+
+def feature_projects(queryset, featured=True):
+    return _updated_projects(queryset.exclude(is_featured=featured), is_featured=featured)
+
+
+def _set_comments_approved(queryset, approved):
+    with transaction.atomic():
+        queryset = queryset.exclude(is_approved=approved)
+        # Threads whose approved-reply count changes
+        parent_ids = set(
+            queryset.filter(parent__isnull=False).order_by().values_list('parent_id', flat=True).distinct()
+        )
+        project_ids = set(queryset.order_by().values_list('project_id', flat=True).distinct())
+        updated = queryset.update(is_approved=approved)
+        if parent_ids:
+            recompute_reply_counts(parent_ids)
+        if project_ids:
+            recompute_comment_counts(project_ids)
+    return updated
+
+
+def approve_comments(queryset):
+    return _set_comments_approved(queryset, True)
+
+
+def hide_comments(queryset):
+    return _set_comments_approved(queryset, False)
+
+
+def resolve_reports(queryset, moderator):
+    return queryset.filter(is_resolved=False).update(
+        is_resolved=True, resolved_by=moderator, resolved_at=timezone.now()
+    )
+
+
+def resolve_reports_about(moderator, project_ids=(), comment_ids=()):
+    """Resolve the open reports on the given projects and comments"""
+    from .models import Report
+
+    if not project_ids and not comment_ids:
+        return 0
+    return resolve_reports(
+        Report.objects.filter(
+            Q(report_type='project', project_id__in=project_ids)
+            | Q(report_type='comment', comment_id__in=comment_ids)
+        ),
+        moderator,
+    )
+
+
+def moderation_queue():
+    """
+    Open reports grouped by reported item, most reported first: rows of
+    ``report_type``, ``project``, ``comment``, ``report_count`` and
+    ``last_reported``.
+    """
+    from .models import Report
+
+    return Report.objects.filter(is_resolved=False).values(
+        'report_type', 'project', 'comment'
+    ).annotate(
+        report_count=Count('pk'), last_reported=Max('created_at')
+    ).order_by('-report_count', '-last_reported')
+
+
+def load_queue_items(rows):
+    """Attach the reported ``item`` (project or comment) to queue rows"""
+    from .models import Comment, Project
+
+    rows = list(rows)
+    projects = Project.objects.select_related('creator').in_bulk(
+        [row['project'] for row in rows if row['report_type'] == 'project']
+    )
+    comments = Comment.objects.select_related('user', 'project').in_bulk(
+        [row['comment'] for row in rows if row['report_type'] == 'comment']
+    )
+    for row in rows:
+        if row['report_type'] == 'project':
+            row['item'] = projects.get(row['project'])
+        else:
+            row['item'] = comments.get(row['comment'])
+    return rows
@@ -0,0 +1,253 @@
+"""
+Keyset (cursor) pagination for project listings.
+
+Page-number pagination runs a ``COUNT(*)`` over the filtered queryset and an
+``OFFSET`` scan that grows with the page number. ``CursorPaginator`` instead
+remembers the sort key of the last row it returned in an opaque token and asks
+for the rows strictly after it, so every page costs the same and no count is
+run. Listing views switch to it when the request carries a ``cursor``
+parameter (an empty ``?cursor=`` starts from the first page).
+
+Admin changelists keep page numbers but use ``EstimatedCountPaginator``: an
+unfiltered changelist of a large table takes its row count from the database
+instead of running ``COUNT(*)`` over the whole table. On SQLite the estimate
+is the largest id, so only append-only tables (rows removed by rare cascades
+at most) use it; others, like the purged task table, are counted.
+"""
+import base64
+import binascii
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import QueryDict
+from django.utils.functional import cached_property
+
+# Listing sort option -> keyset ordering (always ends on a unique column)
+SORT_ORDERINGS = {
+    '-created_at': ('-created_at', '-pk'),
+    'deadline': ('end_date', 'pk'),
+    'target': ('-total_target', '-pk'),
+    'rating': ('-avg_rating', '-pk'),
+    'relevance': ('search_rank', 'pk'),
+}
+DEFAULT_ORDERING = SORT_ORDERINGS['-created_at']
+# Below this many rows an exact COUNT(*) is cheap enough
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    """One page of a keyset-paginated listing"""
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, query=None, param='cursor'):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.query = query if query is not None else QueryDict()
+        self.param = param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _query_with(self, cursor):
+        query = self.query.copy()
+        query.pop('page', None)
+        query[self.param] = cursor
+        return query.urlencode()
+
+    @property
+    def next_query(self):
+        """Query string of the next page, keeping the current filters"""
+        return self._query_with(self.next_cursor) if self.has_next() else ''
+
+    @property
+    def previous_query(self):
+        return self._query_with(self.previous_cursor) if self.has_previous() else ''
+
+
+class CursorPaginator:
+    """Paginate ``queryset`` by the unique ``ordering`` without OFFSET/COUNT"""
+
+    def __init__(self, queryset, per_page, ordering=DEFAULT_ORDERING):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    # Tokens
+
+    def _serialize(self, value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def _deserialize(self, name, value):
+        model = self.queryset.model
+        try:
+            field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations (average rating, search rank) are floats
+            return float(value)
+        return field.to_python(value)
+
+    def encode_cursor(self, obj, direction):
+        values = [self._serialize(getattr(obj, name)) for name in self.fields]
+        payload = json.dumps({'d': direction, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, values = payload['d'], payload['v']
+            if direction not in (NEXT, PREVIOUS) or len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            return direction, [
+                self._deserialize(name, value) for name, value in zip(self.fields, values)
+            ]
+        except (ValueError, KeyError, TypeError, binascii.Error, ValidationError) as exc:
+            raise InvalidCursor(cursor) from exc
+
+    # Queries
+
+    def _beyond(self, values, backwards):
+        """Rows strictly after ``values`` in the (possibly reversed) ordering"""
+        condition = Q()
+        equal = {}
+        for field, name, value in zip(self.ordering, self.fields, values):
+            descending = field.startswith('-') != backwards
+            condition |= Q(**equal, **{f'{name}__{"lt" if descending else "gt"}': value})
+            equal[name] = value
+        return condition
+
+    def _reversed_ordering(self):
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def get_page(self, cursor=None, query=None, param='cursor'):
+        """Return the page addressed by ``cursor``; invalid cursors give the first page"""
+        direction, values = NEXT, None
+        if cursor:
+            try:
+                direction, values = self.decode_cursor(cursor)
+            except InvalidCursor:
+                direction, values = NEXT, None
+
+        backwards = direction == PREVIOUS
+        queryset = self.queryset.order_by(
+            *(self._reversed_ordering() if backwards else self.ordering)
+        )
+        if values is not None:
+            queryset = queryset.filter(self._beyond(values, backwards))
+
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if more or backwards:
+                next_cursor = self.encode_cursor(rows[-1], NEXT)
+            if (more and backwards) or (values is not None and not backwards):
+                previous_cursor = self.encode_cursor(rows[0], PREVIOUS)
+        return CursorPage(rows, next_cursor, previous_cursor, query, param)
+
+    async def aget_page(self, cursor=None, query=None, param='cursor'):
+        return await sync_to_async(self.get_page)(cursor, query, param)
+
+
+def ordering_for(queryset, sort_by):
+    """Keyset ordering for a listing sort option on ``queryset``"""
+    ordering = SORT_ORDERINGS.get(sort_by, DEFAULT_ORDERING)
+    for field in ordering:
+        name = field.lstrip('-')
+        if name == 'pk' or name in queryset.query.annotations:
+            continue
+        try:
+            queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # e.g. "relevance" without a search query
+            return DEFAULT_ORDERING
+    return ordering
+
+
+def paginate_projects(request, projects, sort_by='-created_at', per_page=12):
+    """
+    Page-number pagination by default; keyset pagination when the request
+    carries a ``cursor`` parameter.
+    """
+    if 'cursor' in request.GET:
+        paginator = CursorPaginator(projects, per_page, ordering_for(projects, sort_by))
+        return paginator.get_page(request.GET.get('cursor'), request.GET)
+
+    paginator = Paginator(projects, per_page)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def estimated_count(model, using='default', append_only=False):
+    """
+    Approximate row count of ``model``'s table, or ``None`` when the
+    database has no cheap estimate. PostgreSQL keeps one in its statistics;
+    on SQLite the largest integer primary key of an ``append_only`` table is
+    one B-tree descent away and overcounts only by the deleted rows.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'sqlite' and append_only and model._meta.pk.get_internal_type() in (
+            'AutoField', 'BigAutoField', 'SmallAutoField'
+        ):
+            pk = connection.ops.quote_name(model._meta.pk.column)
+            cursor.execute(f'SELECT MAX({pk}) FROM {table}')
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Page-number paginator estimating the count of unfiltered large tables"""
+
+    def __init__(self, *args, append_only=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.append_only = append_only
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and not queryset.query.where and not queryset.query.distinct:
+            estimate = estimated_count(queryset.model, queryset.db, self.append_only)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
@@ -0,0 +1,118 @@
+"""
+Query plan checks for the main pages.
+
+``capture_page_queries`` serves the benchmark scenarios (``benchmarks.py``),
+which go through the real views, and keeps every distinct SELECT they run.
+``explain`` asks SQLite how it runs one (``EXPLAIN QUERY PLAN``) and
+``plan_problems`` flags what gets slower as the tables grow: full table scans
+and temporary B-trees built to sort or group rows. Scans of small tables
+(categories, tags) are fine and are left out by ``min_rows``.
+
+``python manage.py index_advisor`` prints the report.
+"""
+import re
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+from django.test import Client
+
+from .instrumentation import fingerprint, record_queries
+
+# Tables smaller than this are cheap to scan
+DEFAULT_MIN_ROWS = 1000
+
+_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+_ALIAS = re.compile(r'"(\w+)" (\w+)\b')
+_LIMIT = re.compile(r'\bLIMIT\b')
+
+
+@dataclass
+class CapturedQuery:
+    sql: str
+    params: tuple
+    scenarios: list = field(default_factory=list)
+    plan: list = field(default_factory=list)
+    problems: list = field(default_factory=list)
+
+
+class _SelectRecorder:
+    def __init__(self, queries, scenario):
+        self.queries = queries
+        self.scenario = scenario
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            query = self.queries.setdefault(fingerprint(sql), CapturedQuery(sql, tuple(params or ())))
+            if self.scenario not in query.scenarios:
+                query.scenarios.append(self.scenario)
+        return execute(sql, params, many, context)
+
+
+def capture_page_queries(scenarios):
+    """``{fingerprint: CapturedQuery}`` of the SELECTs run serving ``scenarios``"""
+    queries = {}
+    for scenario in scenarios:
+        client = Client()
+        if scenario.user is not None:
+            client.force_login(scenario.user)
+        # Leave the data as it was (the donation scenario writes)
+        with transaction.atomic():
+            with record_queries(_SelectRecorder(queries, scenario.name), using=connection.alias):
+                getattr(client, scenario.method)(scenario.path, scenario.data)
+            transaction.set_rollback(True)
+    return queries
+
+
+def explain(sql, params):
+    """The ``EXPLAIN QUERY PLAN`` lines of a query, indented by depth"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        rows = cursor.fetchall()
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def table_sizes():
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        sizes = {}
+        for table in tables:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+            sizes[table] = cursor.fetchone()[0]
+    return sizes
+
+
+def plan_problems(sql, plan, sizes, min_rows=DEFAULT_MIN_ROWS):
+    """
+    Full scans of tables with ``min_rows`` or more rows, and temp B-trees
+    sorting rows of a scan or of a page (``LIMIT``). Sorting the rows of a
+    prefetch, which are already narrowed by an index, is left alone.
+    """
+    aliases = {alias: table for table, alias in _ALIAS.findall(sql)}
+    scans, sorts = [], []
+    for line in plan:
+        detail = line.strip()
+        scan = _SCAN.match(detail)
+        if scan:
+            table = aliases.get(scan.group(1), scan.group(1))
+            rows = sizes.get(table)
+            if rows is not None and rows >= min_rows:
+                scans.append(f'full scan of {table} ({rows} rows)')
+        elif detail.startswith('USE TEMP B-TREE'):
+            sorts.append(detail.lower().replace('use ', ''))
+    if scans or _LIMIT.search(sql):
+        return scans + sorts
+    return scans
+
+
+def analyse(queries, min_rows=DEFAULT_MIN_ROWS):
+    """Explain every captured query and record its problems"""
+    sizes = table_sizes()
+    for query in queries.values():
+        query.plan = explain(query.sql, query.params)
+        query.problems = plan_problems(query.sql, query.plan, sizes, min_rows)
+    return queries
@@ -0,0 +1,63 @@
+"""
+Denormalized rating aggregates.
+
+``Project.rating_sum`` and ``Project.rating_count`` are maintained with
+atomic ``F()`` UPDATEs so reading a project's average rating never needs an
+aggregate query: ``Rating.save`` applies the change of a rating, and the
+``post_delete`` receiver in signals.py removes deleted ratings, which also
+covers cascades (a rater's account being deleted) and queryset deletes.
+``recompute_rating_aggregates`` (and the ``backfill_rating_aggregates``
+command) rebuild the columns from the ``Rating`` table.
+"""
+from django.db import transaction
+from django.db.models import (
+    Case, Count, ExpressionWrapper, F, FloatField, IntegerField, OuterRef,
+    Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+
+
+def average_rating_expression():
+    """Average rating computed from the stored aggregate columns (no join)"""
+    return Case(
+        When(rating_count=0, then=Value(0.0)),
+        default=ExpressionWrapper(
+            F('rating_sum') * 1.0 / F('rating_count'), output_field=FloatField()
+        ),
+        output_field=FloatField(),
+    )
+
+
+def apply_rating_delta(project_id, sum_delta, count_delta):
+    """Shift a project's stored rating aggregates with one atomic UPDATE"""
+    from .models import Project
+
+    if not sum_delta and not count_delta:
+        return 0
+    return Project.objects.filter(pk=project_id).update(
+        rating_sum=F('rating_sum') + sum_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+
+
+def _rating_subquery(aggregate):
+    from .models import Rating
+
+    values = Rating.objects.filter(
+        project=OuterRef('pk')
+    ).order_by().values('project').annotate(value=aggregate).values('value')
+    return Coalesce(Subquery(values), Value(0), output_field=IntegerField())
+
+
+def recompute_rating_aggregates(project_ids=None):
+    """Rebuild ``rating_sum``/``rating_count`` from the ratings table"""
+    from .models import Project
+
+    projects = Project.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+    with transaction.atomic():
+        return projects.update(
+            rating_sum=_rating_subquery(Sum('rating')),
+            rating_count=_rating_subquery(Count('pk')),
+        )
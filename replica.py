@@ -0,0 +1,187 @@
+"""
+Read replica for public pages.
+
+Anonymous browsing makes up most of the traffic and only reads. With
+``DATABASE_REPLICA`` on, the ``replica`` database is a copy of the primary
+SQLite file made with SQLite's online backup API and refreshed every few
+seconds by ``python manage.py refresh_replica --interval N``.
+
+``ReplicaMiddleware`` lets the pages in ``REPLICA_URL_NAMES`` read from it:
+``ReplicaRouter`` then sends reads of this app's models to the replica, while
+writes, reads inside a transaction and every other request use the primary.
+A page falls back to the primary when:
+
+* the replica has not been refreshed within ``REPLICA_MAX_LAG`` seconds, or
+* the visitor wrote something (any POST) after the last refresh, so they see
+  their own donation, comment or rating right away (read-your-writes).
+
+The refresh time is the modification time of a stamp file written next to
+the replica (``<NAME>.refreshed``), so every worker process sees it whatever
+the cache backend.
+
+The middleware is async capable: under ASGI the choice is made in the
+request's context without a thread hop, and the ``sync_to_async`` threads of
+async views inherit it.
+"""
+import contextvars
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+REPLICA_URL_NAMES = getattr(settings, 'REPLICA_URL_NAMES', {
+    'homepage:homepage',
+    'homepage:search_results',
+    'projects:project_list',
+    'projects:project_detail',
+})
+# Seconds since the last refresh after which the replica is not used
+REPLICA_MAX_LAG = getattr(settings, 'REPLICA_MAX_LAG', 60)
+REPLICA_APPS = {'crowdfunding_projects'}
+# Unix time of the visitor's last write
+LAST_WRITE_COOKIE = 'last_write'
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+def replica_enabled():
+    return REPLICA in settings.DATABASES
+
+
+def stamp_path(alias=REPLICA):
+    return f"{settings.DATABASES[alias]['NAME']}.refreshed"
+
+
+def refreshed_at():
+    """Unix time the last refresh started, or None before the first one"""
+    try:
+        return os.stat(stamp_path()).st_mtime
+    except OSError:
+        return None
+
+
+def replica_fresh(last_write=None):
+    """Whether the replica is recent enough, and has the visitor's last write"""
+    refreshed = refreshed_at()
+    if refreshed is None or time.time() - refreshed > REPLICA_MAX_LAG:
+        return False
+    return last_write is None or refreshed > last_write
+
+
+@contextmanager
+def primary():
+    """Read from the primary in this block (e.g. to fill a shared cache)"""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def refresh_replica(source=PRIMARY, target=REPLICA):
+    """Copy the primary into the replica file with the SQLite backup API"""
+    started = time.time()
+    connection = connections[source]
+    connection.ensure_connection()
+    path = str(connections[target].settings_dict['NAME'])
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    destination = sqlite3.connect(path, timeout=30)
+    try:
+        # One step: readers of the replica wait (busy_timeout) instead of
+        # seeing a half-copied file
+        connection.connection.backup(destination, pages=-1)
+    finally:
+        destination.close()
+    # Stamped with the start time: writes after it may be missing
+    stamp = stamp_path(target)
+    with open(stamp, 'a'):
+        pass
+    os.utime(stamp, (started, started))
+    return time.time() - started
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _use_replica.get()
+            and model._meta.app_label in REPLICA_APPS
+            and not connections[PRIMARY].in_atomic_block
+        ):
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both sides
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary, migrations included
+        return db != REPLICA
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Called by the async handler without a thread hop
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.remember_write(request, response)
+
+    async def __acall__(self, request):
+        token = _use_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.remember_write(request, response)
+
+    def remember_write(self, request, response):
+        if replica_enabled() and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(
+                LAST_WRITE_COOKIE, str(time.time()), max_age=REPLICA_MAX_LAG,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def choose_database(self, request):
+        if (
+            replica_enabled()
+            and request.method in ('GET', 'HEAD')
+            and request.resolver_match.view_name in REPLICA_URL_NAMES
+        ):
+            try:
+                last_write = float(request.COOKIES[LAST_WRITE_COOKIE])
+            except (KeyError, ValueError):
+                last_write = None
+            _use_replica.set(replica_fresh(last_write))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.choose_database(request)
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # replica_fresh() is a single stat() of the stamp file
+        self.choose_database(request)
+        return None
@@ -0,0 +1,214 @@
+"""
+Full-text project search.
+
+Projects are indexed in an SQLite FTS5 virtual table (``FTS_TABLE``) with one
+row per project (``rowid`` = project id) over the title, details, tag names,
+category name and creator username. The signal handlers in ``signals.py``
+keep it in sync on writes: the changed projects are reindexed as soon as the
+write commits, so a new or edited project is searchable on the next request.
+Writes touching many projects at once (renaming a category or a tag) and
+failed updates are left to the ``update_search_index`` background task. The
+whole index can be rebuilt with the ``rebuild_search_index`` management
+command.
+
+``filter_projects`` is the single entry point used by the project list and
+search results views. Queries support prefix matching on every bare word,
+``"quoted phrases"`` and BM25 relevance ranking. On database backends without
+FTS5 the same API falls back to ``icontains`` lookups.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'crowdfunding_projects_project_fts'
+
+# Column order matters: it is the order of the BM25 weights below
+FTS_COLUMNS = ['title', 'details', 'tags', 'category', 'creator']
+BM25_WEIGHTS = [10.0, 1.0, 5.0, 3.0, 3.0]
+
+# Search type (ProjectSearchForm.search_type) -> indexed column
+SEARCH_TYPE_COLUMNS = {
+    'title': 'title',
+    'details': 'details',
+    'tag': 'tags',
+    'category': 'category',
+    'creator': 'creator',
+}
+
+# Fallback lookups for backends without FTS5
+SEARCH_TYPE_LOOKUPS = {
+    'title': ['title__icontains'],
+    'details': ['details__icontains'],
+    'tag': ['tags__name__icontains'],
+    'category': ['category__name__icontains'],
+    'creator': ['creator__username__icontains'],
+}
+
+_PHRASE_RE = re.compile(r'"([^"]*)"|(\w+)', re.UNICODE)
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def _quote(text):
+    return '"%s"' % text.replace('"', '""')
+
+
+def build_match_expression(query, search_type='all'):
+    """
+    Translate user input into an FTS5 MATCH expression. Bare words become
+    prefix queries, double-quoted text becomes an exact phrase; all parts
+    must match. Returns ``None`` if the input has nothing searchable.
+    """
+    parts = []
+    for phrase, word in _PHRASE_RE.findall(query or ''):
+        if phrase:
+            words = _WORD_RE.findall(phrase)
+            if words:
+                parts.append(_quote(' '.join(words)))
+        else:
+            parts.append(_quote(word) + '*')
+    if not parts:
+        return None
+    expression = ' '.join(parts)
+    column = SEARCH_TYPE_COLUMNS.get(search_type)
+    if column:
+        expression = '{%s} : (%s)' % (column, expression)
+    return expression
+
+
+def search_rank(expression):
+    """BM25 score of the outer project for ``expression`` (lower is better)"""
+    from .models import Project
+
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    return RawSQL(
+        f'SELECT bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = {Project._meta.db_table}.id',
+        [expression],
+    )
+
+
+def search_projects(projects, query, search_type='all', rank=False):
+    """
+    Restrict ``projects`` to those matching ``query``. With ``rank=True`` the
+    result is annotated with ``search_rank`` and ordered by relevance.
+    """
+    if not fts_available():
+        lookups = SEARCH_TYPE_LOOKUPS.get(
+            search_type, [lookup for group in SEARCH_TYPE_LOOKUPS.values() for lookup in group]
+        )
+        condition = Q()
+        for lookup in lookups:
+            condition |= Q(**{lookup: query})
+        return projects.filter(condition).distinct()
+
+    expression = build_match_expression(query, search_type)
+    if expression is None:
+        return projects.none()
+    projects = projects.filter(
+        pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression])
+    )
+    if rank:
+        projects = projects.annotate(search_rank=search_rank(expression)).order_by('search_rank')
+    return projects
+
+
+def filter_projects(projects, cleaned_data, sort_by=None):
+    """Apply a validated ``ProjectSearchForm`` to a project queryset"""
+    search_query = cleaned_data.get('search_query')
+    search_type = cleaned_data.get('search_type') or 'all'
+    category = cleaned_data.get('category')
+    min_target = cleaned_data.get('min_target')
+    max_target = cleaned_data.get('max_target')
+    status = cleaned_data.get('status')
+
+    if search_query:
+        projects = search_projects(
+            projects, search_query, search_type, rank=(sort_by == 'relevance')
+        )
+
+    if category:
+        projects = projects.filter(category=category)
+
+    if min_target:
+        projects = projects.filter(total_target__gte=min_target)
+
+    if max_target:
+        projects = projects.filter(total_target__lte=max_target)
+
+    if status:
+        projects = projects.filter(status=status)
+
+    return projects
+
+
+def _documents(project_ids):
+    from .models import Project
+
+    through = Project.tags.through
+    tags = {}
+    for project_id, name in through.objects.filter(
+        project_id__in=project_ids
+    ).order_by('tag__name').values_list('project_id', 'tag__name'):
+        tags.setdefault(project_id, []).append(name)
+
+    for pk, title, details, category, creator in Project.objects.filter(
+        pk__in=project_ids
+    ).order_by().values_list('pk', 'title', 'details', 'category__name', 'creator__username'):
+        yield (pk, title, details, ' '.join(tags.get(pk, [])), category or '', creator or '')
+
+
+def index_projects(project_ids):
+    """(Re)index the given projects; ids that no longer exist are removed"""
+    if not fts_available():
+        return 0
+    project_ids = list(project_ids)
+    if not project_ids:
+        return 0
+    placeholders = ', '.join(['%s'] * len(FTS_COLUMNS))
+    columns = ', '.join(FTS_COLUMNS)
+    with transaction.atomic(), connection.cursor() as cursor:
+        remove_projects(project_ids, cursor=cursor)
+        documents = list(_documents(project_ids))
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (%s, {placeholders})',
+            documents,
+        )
+    return len(documents)
+
+
+def remove_projects(project_ids, cursor=None):
+    if not fts_available():
+        return
+    project_ids = list(project_ids)
+    if cursor is None:
+        with connection.cursor() as cursor:
+            return remove_projects(project_ids, cursor=cursor)
+    for start in range(0, len(project_ids), 500):
+        batch = project_ids[start:start + 500]
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({", ".join(["%s"] * len(batch))})',
+            batch,
+        )
+
+
+def rebuild_search_index(batch_size=1000):
+    """Drop and repopulate the whole index"""
+    from .models import Project
+
+    if not fts_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    indexed = 0
+    project_ids = list(Project.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(project_ids), batch_size):
+        indexed += index_projects(project_ids[start:start + batch_size])
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return indexed
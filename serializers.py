@@ -0,0 +1,135 @@
+"""
+JSON serializers for the project API.
+
+A serializer is a mapping of output field name to a function reading it from
+a model instance. Clients pick the fields they need with ``?fields=a,b``;
+``prepare`` then adds only the joins and prefetches those fields read, so a
+listing that asks for titles does not load tags or images.
+"""
+
+
+class InvalidFields(Exception):
+    pass
+
+
+def _decimal(value):
+    return float(value) if value is not None else None
+
+
+def _datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+class Serializer:
+    # name -> callable(instance)
+    fields = {}
+    default_fields = None
+    # name -> select_related / prefetch_related lookups the field needs
+    select_related = {}
+    prefetch_related = {}
+
+    def __init__(self, fields=None):
+        self.selected = self.parse_fields(fields)
+
+    @classmethod
+    def parse_fields(cls, fields):
+        """Validate a ``fields`` query value (comma separated) or list"""
+        if not fields:
+            return list(cls.default_fields or cls.fields)
+        if isinstance(fields, str):
+            fields = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = [name for name in fields if name not in cls.fields]
+        if unknown:
+            raise InvalidFields(
+                f"Unknown field(s): {', '.join(unknown)}. "
+                f"Available: {', '.join(cls.fields)}"
+            )
+        return list(dict.fromkeys(fields))
+
+    def prepare(self, queryset):
+        """Add the joins and prefetches needed by the selected fields"""
+        select = [self.select_related[name] for name in self.selected if name in self.select_related]
+        prefetch = [self.prefetch_related[name] for name in self.selected if name in self.prefetch_related]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def to_dict(self, instance):
+        return {name: self.fields[name](instance) for name in self.selected}
+
+    def many(self, instances):
+        return [self.to_dict(instance) for instance in instances]
+
+
+def _first_image(project):
+    images = list(project.images.all())
+    return images[0].variant_url('card') if images else None
+
+
+class ProjectSerializer(Serializer):
+    fields = {
+        'id': lambda p: p.pk,
+        'slug': lambda p: p.slug,
+        'title': lambda p: p.title,
+        'details': lambda p: p.details,
+        'category': lambda p: {'id': p.category_id, 'name': p.category.name},
+        'tags': lambda p: [tag.name for tag in p.tags.all()],
+        'creator': lambda p: {'username': p.creator.username, 'name': p.creator.get_full_name()},
+        'image': _first_image,
+        'images': lambda p: [image.variant_url('hero') for image in p.images.all()],
+        'total_target': lambda p: _decimal(p.total_target),
+        'current_amount': lambda p: _decimal(p.current_amount),
+        'progress_percentage': lambda p: round(float(p.progress_percentage), 2),
+        'average_rating': lambda p: round(p.average_rating, 2),
+        'total_ratings': lambda p: p.total_ratings,
+        'status': lambda p: p.status,
+        'is_featured': lambda p: p.is_featured,
+        'start_date': lambda p: _datetime(p.start_date),
+        'end_date': lambda p: _datetime(p.end_date),
+        'days_remaining': lambda p: p.days_remaining,
+        'created_at': lambda p: _datetime(p.created_at),
+        'url': lambda p: p.get_absolute_url(),
+    }
+    default_fields = [
+        'id', 'slug', 'title', 'category', 'creator', 'image', 'total_target',
+        'current_amount', 'progress_percentage', 'average_rating', 'status', 'end_date',
+    ]
+    select_related = {'category': 'category', 'creator': 'creator'}
+    prefetch_related = {'tags': 'tags', 'image': 'images', 'images': 'images'}
+
+
+class ProjectDetailSerializer(ProjectSerializer):
+    default_fields = [
+        'id', 'slug', 'title', 'details', 'category', 'tags', 'creator', 'images',
+        'total_target', 'current_amount', 'progress_percentage', 'average_rating',
+        'total_ratings', 'status', 'is_featured', 'start_date', 'end_date',
+        'days_remaining', 'created_at',
+    ]
+
+
+class ProgressSerializer(Serializer):
+    fields = {
+        'id': lambda p: p.pk,
+        'current_amount': lambda p: _decimal(p.current_amount),
+        'total_target': lambda p: _decimal(p.total_target),
+        'progress_percentage': lambda p: round(float(p.progress_percentage), 2),
+        'status': lambda p: p.status,
+        'days_remaining': lambda p: p.days_remaining,
+    }
+    # Columns read by the fields above (progress is polled, keep the row small)
+    columns = [
+        'id', 'slug', 'current_amount', 'total_target', 'status', 'end_date',
+        'is_approved', 'creator_id',
+    ]
+
+
+class CommentSerializer(Serializer):
+    fields = {
+        'id': lambda c: c.pk,
+        'author': lambda c: c.user.get_full_name(),
+        'content': lambda c: c.content,
+        'created_at': lambda c: _datetime(c.created_at),
+        'reply_count': lambda c: c.reply_count,
+    }
@@ -0,0 +1,226 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .comments import apply_comment_delta, apply_reply_delta
+from .donor_stats import reconcile_donor_stats
+from .images import (
+    delete_variants, needs_variants, schedule_variants, variants_attr, variants_changed,
+)
+from .models import (
+    Category, Comment, Donation, Project, ProjectImage, Rating, SimilarProject, Tag,
+)
+from .ratings import apply_rating_delta
+from .search import index_projects, remove_projects
+from .tasks import (
+    drop_similar_projects, refresh_similar_projects, remove_from_search_index,
+    update_search_index,
+)
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Writes touching more projects than this (renaming a category or a tag,
+# bulk moderation) reindex them in a background task instead of the request
+SEARCH_INDEX_INLINE_LIMIT = getattr(settings, 'SEARCH_INDEX_INLINE_LIMIT', 100)
+
+# Sent with ``project_ids`` after a set-based UPDATE of projects, which sends
+# no post_save (moderation.py, lifecycle.py)
+projects_updated = Signal()
+# Sent with ``project_ids``, ``source`` and ``target`` statuses when the
+# lifecycle scheduler moves projects (lifecycle.py)
+project_status_changed = Signal()
+
+
+def _queue_similarity_refresh(project_ids):
+    project_ids = list(project_ids)
+    if project_ids:
+        refresh_similar_projects.enqueue(project_ids)
+
+
+def _index_committed(project_ids):
+    try:
+        index_projects(project_ids)
+    except DatabaseError:
+        logger.exception('Indexing projects %s failed, queued for retry', project_ids)
+        update_search_index.enqueue(project_ids)
+
+
+def _update_search_index(project_ids):
+    """Reindex the projects once the write commits, so they are searchable right away"""
+    project_ids = list(project_ids)
+    if not project_ids:
+        return
+    if len(project_ids) > SEARCH_INDEX_INLINE_LIMIT:
+        update_search_index.enqueue(project_ids)
+    else:
+        transaction.on_commit(lambda: _index_committed(project_ids))
+
+
+def _remove_committed(project_ids):
+    try:
+        remove_projects(project_ids)
+    except DatabaseError:
+        logger.exception('Removing projects %s from the index failed, queued for retry', project_ids)
+        remove_from_search_index.enqueue(project_ids)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, raw=False, **kwargs):
+    """Keep the similarity index in step with category/status changes"""
+    if raw:
+        return
+    stored_key = getattr(instance, '_similarity_key', None)
+    if created or stored_key != instance.similarity_key:
+        instance._similarity_key = instance.similarity_key
+        _queue_similarity_refresh([instance.pk])
+
+
+@receiver(post_save, sender=Project)
+def project_saved_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _update_search_index([instance.pk])
+
+
+@receiver(projects_updated, sender=Project)
+def projects_bulk_updated(sender, project_ids, **kwargs):
+    # Approval and status decide what the indexes list
+    _queue_similarity_refresh(project_ids)
+    _update_search_index(project_ids)
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+def project_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Refresh the indexes when tags are added to or removed from projects"""
+    if reverse and action == 'pre_clear':
+        # Tag.projects.clear(): remember the projects before the rows go
+        instance._cleared_project_ids = list(instance.projects.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        project_ids = [instance.pk]
+    elif action == 'post_clear':
+        project_ids = getattr(instance, '_cleared_project_ids', [])
+    else:
+        project_ids = list(pk_set or ())
+    _queue_similarity_refresh(project_ids)
+    _update_search_index(project_ids)
+
+
+@receiver(pre_delete, sender=Project)
+def project_deleting(sender, instance, **kwargs):
+    instance._listed_by = list(
+        SimilarProject.objects.filter(similar_project=instance).values_list('project_id', flat=True)
+    )
+    # The cascade deletes the donations without Donation.delete()
+    instance._stats_user_ids = {instance.creator_id, *Donation.objects.filter(
+        project=instance
+    ).order_by().values_list('user_id', flat=True).distinct()}
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    listed_by = [pk for pk in getattr(instance, '_listed_by', []) if pk != instance.pk]
+    if listed_by:
+        drop_similar_projects.enqueue(listed_by)
+    transaction.on_commit(lambda: _remove_committed([instance.pk]))
+    # Only existing rows: the users themselves may be going in this cascade
+    reconcile_donor_stats(getattr(instance, '_stats_user_ids', [instance.creator_id]), create=False)
+
+
+@receiver(post_delete, sender=Rating)
+def rating_deleted(sender, instance, **kwargs):
+    """Sent for cascades (a rater's account) and queryset deletes too"""
+    project_id, rating = getattr(instance, '_stored', (instance.project_id, instance.rating))
+    apply_rating_delta(project_id, -rating, -1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """Sent for cascades (a replier's account) and queryset deletes too"""
+    parent_id, is_approved = getattr(
+        instance, '_stored_reply_state', (instance.parent_id, instance.is_approved)
+    )
+    if parent_id is not None and is_approved:
+        apply_reply_delta(parent_id, -1)
+    if is_approved:
+        # A no-op when the project itself is being deleted
+        apply_comment_delta(instance.project_id, -1)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, raw=False, **kwargs):
+    """Category names are part of the search documents"""
+    if not raw and not created:
+        _update_search_index(instance.projects.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        _update_search_index(instance.projects.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_deleting(sender, instance, **kwargs):
+    instance._tagged_project_ids = list(instance.projects.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    project_ids = getattr(instance, '_tagged_project_ids', [])
+    _queue_similarity_refresh(project_ids)
+    _update_search_index(project_ids)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # The cascade detaches the user's donations (SET_NULL): hide who gave them
+    Donation.objects.filter(user=instance).update(is_anonymous=True)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Creator usernames are part of the search documents"""
+    if raw or created:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    _update_search_index(instance.created_projects.values_list('pk', flat=True))
+
+
+def _update_variants(instance, field_name):
+    if needs_variants(instance, field_name):
+        schedule_variants(instance, field_name)
+    elif not getattr(instance, field_name) and getattr(instance, variants_attr(field_name)):
+        # Picture removed: drop its variants too
+        delete_variants(instance, field_name)
+        type(instance).objects.filter(pk=instance.pk).update(**{variants_attr(field_name): {}})
+        variants_changed.send(sender=type(instance), pk=instance.pk)
+
+
+@receiver(post_save, sender=ProjectImage)
+def project_image_saved(sender, instance, raw=False, **kwargs):
+    """Render resized variants of new or replaced uploads"""
+    if not raw:
+        _update_variants(instance, 'image')
+
+
+@receiver(post_delete, sender=ProjectImage)
+def project_image_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: delete_variants(instance, 'image'))
+
+
+@receiver(post_save, sender=User)
+def user_picture_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and 'profile_picture' not in update_fields:
+        return
+    _update_variants(instance, 'profile_picture')
@@ -0,0 +1,173 @@
+"""
+Precomputed project similarity index.
+
+Two projects are similar when they share a category (worth 2 points) and/or
+tags (1 point per shared tag). Instead of scoring every candidate on each
+detail page view, the top ``SIMILAR_PROJECTS_TOP_K`` neighbours of every
+project are stored in ``SimilarProject`` and read back with one indexed query.
+
+Scores are sparse counts over an in-memory inverted index (tag -> project
+ids, category -> project ids) built from two ``values_list`` queries, so no
+per-candidate queries are issued. Ties are broken by the older project so
+lists stay stable as new projects arrive.
+
+The index is refreshed incrementally by a background task queued when a
+project's tags, category, status or approval change (see ``signals.py``),
+and can be rebuilt in full with the ``rebuild_similarity_index`` management
+command.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+
+SIMILAR_PROJECTS_TOP_K = getattr(settings, 'SIMILAR_PROJECTS_TOP_K', 8)
+
+CATEGORY_WEIGHT = 2
+TAG_WEIGHT = 1
+
+
+def is_candidate(status, is_approved):
+    """Only approved, active projects are recommended to others"""
+    return status == 'active' and is_approved
+
+
+class _Index:
+    """Inverted tag/category index over a set of projects"""
+
+    def __init__(self, projects, project_tags):
+        self.category_of = {}
+        self.candidates = set()
+        self.tags_of = defaultdict(set)
+        self.by_category = defaultdict(set)
+        self.by_tag = defaultdict(set)
+        for pk, category_id, status, is_approved in projects:
+            self.category_of[pk] = category_id
+            self.by_category[category_id].add(pk)
+            if is_candidate(status, is_approved):
+                self.candidates.add(pk)
+        for project_id, tag_id in project_tags:
+            self.tags_of[project_id].add(tag_id)
+            self.by_tag[tag_id].add(project_id)
+
+    def overlap(self, pk):
+        """Sparse similarity scores of every project that overlaps ``pk``"""
+        scores = Counter()
+        for other in self.by_category.get(self.category_of.get(pk), ()):
+            scores[other] += CATEGORY_WEIGHT
+        for tag_id in self.tags_of.get(pk, ()):
+            for other in self.by_tag[tag_id]:
+                scores[other] += TAG_WEIGHT
+        scores.pop(pk, None)
+        return scores
+
+    def top_k(self, pk, k):
+        scores = self.overlap(pk)
+        ranked = sorted(
+            ((other, score) for other, score in scores.items() if other in self.candidates),
+            key=lambda item: (-item[1], item[0])
+        )
+        return ranked[:k]
+
+
+def _neighbourhood(source_ids):
+    """Queryset of projects sharing a category or tag with ``source_ids``"""
+    from .models import Project
+
+    through = Project.tags.through
+    tag_ids = through.objects.filter(project_id__in=source_ids).values('tag_id')
+    return Project.objects.filter(
+        Q(pk__in=source_ids)
+        | Q(category_id__in=Project.objects.filter(pk__in=source_ids).values('category_id'))
+        | Q(pk__in=through.objects.filter(tag_id__in=tag_ids).values('project_id'))
+    )
+
+
+def _load_index(projects):
+    from .models import Project
+
+    through = Project.tags.through
+    return _Index(
+        projects.order_by().values_list('pk', 'category_id', 'status', 'is_approved'),
+        through.objects.filter(
+            project_id__in=projects.values('pk')
+        ).order_by().values_list('project_id', 'tag_id'),
+    )
+
+
+def build_similarity_index(project_ids=None, top_k=SIMILAR_PROJECTS_TOP_K):
+    """
+    (Re)compute the stored neighbours of ``project_ids`` (all projects when
+    ``None``). Returns the number of neighbour rows written.
+    """
+    from .models import Project, SimilarProject
+
+    if project_ids is None:
+        index = _load_index(Project.objects.all())
+        source_ids = list(index.category_of)
+    else:
+        source_ids = list(Project.objects.filter(pk__in=project_ids).values_list('pk', flat=True))
+        index = _load_index(_neighbourhood(source_ids))
+
+    rows = [
+        SimilarProject(project_id=pk, similar_project_id=other, score=score, rank=rank)
+        for pk in source_ids
+        for rank, (other, score) in enumerate(index.top_k(pk, top_k), start=1)
+    ]
+    with transaction.atomic():
+        stale = SimilarProject.objects.all()
+        if project_ids is not None:
+            stale = stale.filter(project_id__in=project_ids)
+        stale.delete()
+        SimilarProject.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def affected_projects(project, top_k=SIMILAR_PROJECTS_TOP_K):
+    """
+    Projects whose neighbour lists may change after ``project`` changed:
+    the project itself, every project currently listing it, and every
+    overlapping project whose list it would now enter.
+    """
+    from .models import SimilarProject
+
+    affected = {project.pk}
+    affected.update(
+        SimilarProject.objects.filter(similar_project_id=project.pk).values_list('project_id', flat=True)
+    )
+    if not is_candidate(project.status, project.is_approved):
+        return affected
+
+    neighbourhood = _neighbourhood([project.pk])
+    scores = _load_index(neighbourhood).overlap(project.pk)
+    stats = {
+        row['project_id']: row
+        for row in SimilarProject.objects.filter(
+            project_id__in=neighbourhood.values('pk')
+        ).values('project_id').annotate(
+            size=Count('pk'), lowest=Min('score'), newest=Max('similar_project_id')
+        ).order_by()
+    }
+    for other, score in scores.items():
+        row = stats.get(other)
+        if (
+            row is None
+            or row['size'] < top_k
+            or score > row['lowest']
+            or (score == row['lowest'] and project.pk < row['newest'])
+        ):
+            affected.add(other)
+    return affected
+
+
+def refresh_project_similarity(project, top_k=SIMILAR_PROJECTS_TOP_K):
+    """Incrementally refresh the index after ``project`` changed"""
+    return build_similarity_index(affected_projects(project, top_k), top_k)
+
+
+def drop_project_similarity(project_ids):
+    """Refresh lists that referenced deleted projects"""
+    if project_ids:
+        return build_similarity_index(project_ids)
+    return 0
@@ -0,0 +1,27 @@
+"""Background tasks of the projects app (run by ``run_tasks``)"""
+from .background import task
+from .search import index_projects, remove_projects
+from .similarity import drop_project_similarity, refresh_project_similarity
+
+
+@task(priority=10)
+def update_search_index(project_ids):
+    index_projects(project_ids)
+
+
+@task(priority=10)
+def remove_from_search_index(project_ids):
+    remove_projects(project_ids)
+
+
+@task
+def refresh_similar_projects(project_ids):
+    from .models import Project
+
+    for project in Project.objects.filter(pk__in=project_ids):
+        refresh_project_similarity(project)
+
+
+@task
+def drop_similar_projects(project_ids):
+    drop_project_similarity(project_ids)
@@ -0,0 +1,17 @@
+from django import template
+
+from ..images import variant_url
+
+register = template.Library()
+
+
+@register.filter
+def variant(fieldfile, size='card'):
+    """``{{ image.image|variant:'thumb' }}``: resized WebP, or the original"""
+    return variant_url(fieldfile, size)
+
+
+@register.simple_tag
+def image_variant(fieldfile, size='card', image_format='webp'):
+    """``{% image_variant image.image 'hero' 'jpeg' %}``"""
+    return variant_url(fieldfile, size, image_format)
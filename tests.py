@@ -1,3 +1,1255 @@
-from django.test import TestCase
-
-# Create your tests here.
+import io
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.base import BaseHandler
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.models import F, Sum
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings, tag
+from django.test.utils import (
+    CaptureQueriesContext, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from accounts.tasks import delete_user
+
+from .background import (
+    DONE, FAILED, PENDING, RUNNING, claim_tasks, execute_task, recover_stale_tasks,
+    retry_delay, task,
+)
+from .benchmarks import SCALES, compare_reports, load_report, new_report, run_scenarios
+from .database import current_pragmas, pragma_statements
+from .donor_stats import find_drifted_donor_stats
+from .ledger import find_drifted_projects, reconcile_project_totals
+from .images import (
+    IMAGE_VARIANTS, _stored, get_executor, image_source, render_variants, store_variants,
+    variant_url,
+)
+from .lifecycle import TRANSITIONS, due_projects, run_transitions
+from .models import (
+    Category, Comment, Donation, DonorStats, Project, ProjectImage, Rating, Report, SimilarProject, Tag,
+    Task,
+)
+from .moderation import (
+    approve_comments, approve_projects, hide_comments, hide_projects, load_queue_items,
+    moderation_queue, resolve_reports,
+)
+from .pagination import ESTIMATED_COUNT_THRESHOLD, CursorPaginator
+from .query_plans import explain, plan_problems, table_sizes
+from .replica import REPLICA, refresh_replica, refreshed_at
+from .search import search_projects
+from .similarity import build_similarity_index, drop_project_similarity, refresh_project_similarity
+from .serializers import ProgressSerializer, ProjectDetailSerializer, ProjectSerializer
+from .signals import project_status_changed, projects_updated
+
+
+def create_user(name, **kwargs):
+    fields = dict(
+        email=f'{name}@example.com', password='x',
+        first_name='First', last_name='Last', phone='01012345678',
+    )
+    fields.update(kwargs)
+    return get_user_model().objects.create_user(username=name, **fields)
+
+
+def create_project(creator, title='Project', category=None, **kwargs):
+    now = timezone.now()
+    fields = dict(
+        details='Details', total_target=Decimal('5000'), start_date=now,
+        end_date=now + timedelta(days=30), status='active', is_approved=True,
+    )
+    fields.update(kwargs)
+    category = category or Category.objects.get_or_create(name='Category')[0]
+    return Project.objects.create(title=title, category=category, creator=creator, **fields)
+
+
+@tag('benchmark')
+class ViewBenchmarkTests(TestCase):
+    """
+    Runs the view benchmarks (see benchmarks.py) on the tiny dataset. Set
+    BENCHMARK_BASELINE to a saved report to fail on query count regressions.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('generate_dataset', prefix='bench', stdout=io.StringIO(), **SCALES['tiny'])
+
+    def test_scenarios(self):
+        scenarios = run_scenarios(repeat=1)
+        failed = {name: result['status'] for name, result in scenarios.items() if not result['ok']}
+        self.assertEqual(failed, {})
+        for result in scenarios.values():
+            self.assertGreater(result['wall_ms']['median'], 0)
+            self.assertGreaterEqual(result['queries'], 0)
+
+        baseline_path = os.environ.get('BENCHMARK_BASELINE')
+        if baseline_path:
+            report = new_report(repeat=1)
+            report['scales']['tiny'] = {'scenarios': scenarios}
+            regressions = [
+                change for change in compare_reports(report, load_report(baseline_path))
+                if change[2] == 'queries' and change[-1]
+            ]
+            self.assertEqual(regressions, [])
+
+    def test_write_scenarios_are_rolled_back(self):
+        totals = (Donation.objects.count(), list(Project.objects.values_list('pk', 'current_amount')))
+        scenarios = run_scenarios(repeat=2, only=['add_donation'])
+        self.assertTrue(scenarios['add_donation']['ok'])
+        self.assertEqual(
+            (Donation.objects.count(), list(Project.objects.values_list('pk', 'current_amount'))), totals
+        )
+
+
+class QueryPlanTests(TestCase):
+    SIZES = {'crowdfunding_projects_project': 5000, 'crowdfunding_projects_category': 20}
+
+    def test_plan_problems(self):
+        sql = (
+            'SELECT * FROM "crowdfunding_projects_project" U0 INNER JOIN '
+            '"crowdfunding_projects_category" U1 ON (U0."category_id" = U1."id") ORDER BY U0."title"'
+        )
+        plan = ['SCAN U0', 'SEARCH U1 USING INTEGER PRIMARY KEY (rowid=?)', 'USE TEMP B-TREE FOR ORDER BY']
+        self.assertEqual(plan_problems(sql, plan, self.SIZES), [
+            'full scan of crowdfunding_projects_project (5000 rows)', 'temp b-tree for order by',
+        ])
+        # Small tables are cheap to scan
+        self.assertEqual(plan_problems(sql, plan, self.SIZES, min_rows=10000), [])
+        self.assertEqual(plan_problems(sql, ['SCAN U1'], self.SIZES), [])
+
+    def test_sorts_flagged_only_for_pages_and_scans(self):
+        sql = 'SELECT * FROM "crowdfunding_projects_project" WHERE "id" IN (1, 2) ORDER BY "title"'
+        plan = ['SEARCH crowdfunding_projects_project USING INTEGER PRIMARY KEY (rowid=?)',
+                'USE TEMP B-TREE FOR ORDER BY']
+        # A prefetch sorting rows it found through an index
+        self.assertEqual(plan_problems(sql, plan, self.SIZES), [])
+        self.assertEqual(plan_problems(f'{sql} LIMIT 12', plan, self.SIZES), ['temp b-tree for order by'])
+
+    def test_explain_real_query(self):
+        queryset = Project.objects.order_by('details')[:12]
+        sql, params = queryset.query.sql_with_params()
+        plan = explain(sql, params)
+        self.assertTrue(any(line.startswith('SCAN') for line in plan), plan)
+        self.assertEqual(plan_problems(sql, plan, table_sizes(), min_rows=0), [
+            'full scan of crowdfunding_projects_project (0 rows)', 'temp b-tree for order by',
+        ])
+
+
+@tag('benchmark')
+class IndexAdvisorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('generate_dataset', prefix='bench', stdout=io.StringIO(), **SCALES['tiny'])
+
+    def setUp(self):
+        # The command sets up the test environment itself, as it does outside tests
+        teardown_test_environment()
+        self.addCleanup(setup_test_environment)
+
+    def test_report(self):
+        out = io.StringIO()
+        call_command('index_advisor', only=['project_detail'], all=True, stdout=out)
+        report = out.getvalue()
+        self.assertIn('project_detail, project_detail[logged_in]', report)
+        self.assertIn('crowdfunding_projects_project', report)
+        self.assertRegex(report, r'\d+ distinct queries, \d+ with full scans or temp B-trees\.')
+
+    def test_fail_on_problems(self):
+        # Every table is big enough to flag with --min-rows 0
+        with self.assertRaisesRegex(CommandError, 'with full scans or temp B-trees'):
+            call_command('index_advisor', only=['category_explore'], min_rows=0, fail=True,
+                         stdout=io.StringIO())
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Every admin changelist page runs the same number of queries however many rows it shows"""
+
+    models = [Category, Tag, Project, ProjectImage, Comment, Rating, Donation, Report, Task, get_user_model()]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin',
+            first_name='Admin', last_name='User', phone='01012345678',
+        )
+
+    def create_rows(self, start, count):
+        for n in range(start, start + count):
+            user = create_user(f'user{n}')
+            category = Category.objects.create(name=f'Category {n}')
+            tag = Tag.objects.create(name=f'tag{n}')
+            project = create_project(user, title=f'Project {n}', category=category)
+            project.tags.add(tag)
+            ProjectImage.objects.create(project=project, image=f'project_images/{n}.jpg')
+            comment = Comment.objects.create(project=project, user=user, content='Comment')
+            reply = Comment.objects.create(project=project, user=user, parent=comment, content='Reply')
+            Rating.objects.create(project=project, user=user, rating=4)
+            Donation(project=project, user=user, amount=Decimal('100')).save()
+            Report.objects.create(reporter=user, report_type='project', project=project, reason='spam')
+            Report.objects.create(
+                reporter=user, report_type='comment', comment=reply, reason='spam',
+                is_resolved=True, resolved_by=self.admin_user,
+            )
+            Task.objects.create(name='example')
+
+    def changelist_queries(self):
+        counts = {}
+        for model in self.models:
+            url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            counts[model._meta.model_name] = len(queries)
+        return counts
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.client.force_login(self.admin_user)
+        self.create_rows(0, 1)
+        # Warm the session and user caches
+        self.client.get(reverse('admin:index'))
+        before = self.changelist_queries()
+        self.create_rows(1, 5)
+        self.assertEqual(self.changelist_queries(), before)
+
+
+class EstimatedCountTests(TestCase):
+    def paginator(self, model):
+        return admin.site._registry[model].get_paginator(None, model.objects.all(), 100)
+
+    def test_append_only_table_is_estimated(self):
+        project = create_project(create_user('creator'))
+        Donation(pk=ESTIMATED_COUNT_THRESHOLD, project=project, user=project.creator, amount=Decimal('5')).save()
+        paginator = self.paginator(Donation)
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, ESTIMATED_COUNT_THRESHOLD)
+
+    def test_purged_table_is_counted(self):
+        # What is left after purge_tasks() deleted the older ones
+        Task.objects.create(pk=ESTIMATED_COUNT_THRESHOLD, name='example')
+        Task.objects.create(name='example')
+        self.assertEqual(self.paginator(Task).count, 2)
+
+
+class DonationLedgerTests(TestCase):
+    def setUp(self):
+        self.donor = create_user('donor')
+        self.project = create_project(create_user('creator'))
+        self.other = create_project(self.donor, title='Other project')
+        for amount in ('100', '250.50'):
+            Donation(project=self.project, user=self.donor, amount=Decimal(amount)).save()
+
+    def test_donations_update_the_running_total(self):
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('350.50'))
+        self.assertFalse(find_drifted_projects().exists())
+
+    def test_reconcile_fixes_drifted_totals(self):
+        Project.objects.filter(pk=self.project.pk).update(current_amount=Decimal('999'))
+        self.assertEqual(list(find_drifted_projects().values_list('pk', flat=True)), [self.project.pk])
+
+        drifted = reconcile_project_totals()
+        self.assertEqual(drifted, [(self.project.pk, Decimal('999'), Decimal('350.50'))])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('350.50'))
+        self.assertFalse(find_drifted_projects().exists())
+        self.assertEqual(reconcile_project_totals(), [])
+
+    def test_deleting_a_donor_keeps_the_money_raised(self):
+        get_user_model().objects.filter(pk=self.donor.pk).update(is_active=False)
+        delete_user(self.donor.pk)
+
+        self.assertEqual(reconcile_project_totals(), [])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.current_amount, Decimal('350.50'))
+        self.assertEqual(
+            list(Donation.objects.values_list('user', 'is_anonymous')), [(None, True), (None, True)]
+        )
+
+
+class DonorStatsTests(TestCase):
+    def setUp(self):
+        self.donor = create_user('donor')
+        self.creator = create_user('creator')
+        self.project = create_project(self.creator)
+        self.other = create_project(self.creator, title='Other project')
+
+    def donate(self, project, amount):
+        Donation(project=project, user=self.donor, amount=Decimal(amount)).save()
+
+    def stats(self, user):
+        return DonorStats.objects.get(user=user)
+
+    def test_only_the_first_donation_backs_a_project(self):
+        self.donate(self.project, '100')
+        self.assertEqual(self.stats(self.donor).projects_backed, 1)
+        self.donate(self.project, '50')
+        self.donate(self.other, '25')
+
+        stats = self.stats(self.donor)
+        self.assertEqual(
+            (stats.total_donated, stats.donation_count, stats.projects_backed),
+            (Decimal('175'), 3, 2),
+        )
+        self.assertEqual(self.stats(self.creator).projects_created, 2)
+        self.assertFalse(find_drifted_donor_stats().exists())
+
+    def test_backed_check_runs_under_the_row_lock(self):
+        self.donate(self.project, '100')
+        with CaptureQueriesContext(connection) as queries:
+            self.donate(self.project, '50')
+        sql = [query['sql'] for query in queries]
+        lock = next(i for i, query in enumerate(sql) if query.startswith('SELECT') and 'donorstats' in query)
+        check = next(i for i, query in enumerate(sql) if query.startswith('SELECT 1') and '_donation"' in query)
+        self.assertLess(lock, check)
+        self.assertEqual(self.stats(self.donor).projects_backed, 1)
+
+    def test_deleting_a_project_reconciles_its_donors(self):
+        self.donate(self.project, '100')
+        self.donate(self.other, '25')
+        self.project.delete()
+
+        stats = self.stats(self.donor)
+        self.assertEqual(
+            (stats.total_donated, stats.donation_count, stats.projects_backed),
+            (Decimal('25'), 1, 1),
+        )
+        self.assertEqual(self.stats(self.creator).projects_created, 1)
+        self.assertFalse(find_drifted_donor_stats().exists())
+
+    def test_profile_matches_the_donation_history(self):
+        for project, amount in ((self.project, '100'), (self.project, '50'), (self.other, '25.25')):
+            self.donate(project, amount)
+        self.client.force_login(self.donor)
+        context = self.client.get(reverse('accounts:profile')).context
+
+        donations = Donation.objects.filter(user=self.donor)
+        self.assertEqual(context['total_donated'], donations.aggregate(total=Sum('amount'))['total'])
+        self.assertEqual(context['total_donations_made'], donations.count())
+        self.assertEqual(context['total_projects_backed'], donations.values('project').distinct().count())
+        self.assertEqual(context['total_projects_created'], Project.objects.filter(creator=self.donor).count())
+
+
+class SearchIndexTests(TestCase):
+    """The FTS index follows project writes without a task worker"""
+
+    def search(self, query, search_type='all'):
+        return list(search_projects(Project.objects.all(), query, search_type).values_list('pk', flat=True))
+
+    def test_index_follows_writes(self):
+        creator = create_user('creator')
+        with self.captureOnCommitCallbacks(execute=True):
+            project = create_project(creator, title='Solar panels for schools')
+            project.tags.add(Tag.objects.create(name='renewable'))
+        self.assertEqual(self.search('solar'), [project.pk])
+        self.assertEqual(self.search('renew', 'tag'), [project.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project.title = 'Wind turbines for schools'
+            project.save()
+        self.assertEqual(self.search('solar'), [])
+        self.assertEqual(self.search('wind', 'title'), [project.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            project.delete()
+        self.assertEqual(self.search('wind'), [])
+        self.assertFalse(Task.objects.filter(name__contains='search_index').exists())
+
+    def test_many_projects_are_indexed_in_the_background(self):
+        creator = create_user('creator')
+        category = Category.objects.create(name='Energy')
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(3):
+                create_project(creator, title=f'Project {n}', category=category)
+        with mock.patch('crowdfunding_projects.signals.SEARCH_INDEX_INLINE_LIMIT', 2), \
+                self.captureOnCommitCallbacks(execute=True):
+            category.name = 'Power'
+            category.save()
+        self.assertEqual(self.search('power', 'category'), [])
+        task_row = Task.objects.get(name='crowdfunding_projects.tasks.update_search_index')
+        self.assertCountEqual(task_row.args[0], Project.objects.values_list('pk', flat=True))
+
+
+class SearchRankingTests(TestCase):
+    """FTS5 matching and BM25 ranking, and the icontains fallback"""
+
+    def setUp(self):
+        creator = create_user('creator')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_title = create_project(creator, title='Clean water wells', details='Villages in Upper Egypt')
+            self.in_details = create_project(creator, title='Village clinic', details='Clean water for patients')
+            self.other = create_project(creator, title='School books', details='Reading for children')
+            self.other.tags.add(Tag.objects.create(name='education'))
+
+    def search(self, query, search_type='all', rank=False):
+        return list(search_projects(Project.objects.all(), query, search_type, rank=rank))
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search('water', rank=True), [self.in_title, self.in_details])
+        self.assertEqual(self.search('"clean water"', rank=True), [self.in_title, self.in_details])
+
+    def test_prefixes_phrases_and_columns(self):
+        self.assertCountEqual(self.search('villag'), [self.in_title, self.in_details])
+        self.assertEqual(self.search('"water wells"'), [self.in_title])
+        self.assertEqual(self.search('"wells water"'), [])
+        self.assertEqual(self.search('water', 'title'), [self.in_title])
+        self.assertEqual(self.search('educ', 'tag'), [self.other])
+        self.assertEqual(self.search('"" *'), [])
+
+    def test_fallback_without_fts(self):
+        with mock.patch('crowdfunding_projects.search.fts_available', return_value=False):
+            self.assertCountEqual(self.search('water'), [self.in_title, self.in_details])
+            self.assertEqual(self.search('water', 'title'), [self.in_title])
+            self.assertEqual(self.search('education', 'tag'), [self.other])
+
+    def test_relevance_sort_on_the_list_page(self):
+        response = self.client.get(
+            reverse('projects:project_list'), {'search_query': 'water', 'search_type': 'all', 'sort': 'relevance'}
+        )
+        self.assertEqual(list(response.context['page_obj']), [self.in_title, self.in_details])
+
+
+class SimilarProjectsTests(TestCase):
+    """The precomputed neighbours match a full rebuild as projects change"""
+
+    def setUp(self):
+        self.creator = create_user('creator')
+        self.education = Category.objects.create(name='Education')
+        self.health = Category.objects.create(name='Health')
+        self.school, self.books = Tag.objects.create(name='school'), Tag.objects.create(name='books')
+        self.base = self.create('Base', self.education, [self.school, self.books])
+        self.same_category = self.create('Same category and tag', self.education, [self.school])
+        self.both_tags = self.create('Both tags', self.health, [self.school, self.books])
+        self.category_only = self.create('Category only', self.education, [])
+        self.hidden = self.create('Hidden', self.education, [self.school, self.books], is_approved=False)
+        self.unrelated = self.create('Unrelated', self.health, [])
+
+    def create(self, title, category, tags, **kwargs):
+        project = create_project(self.creator, title=title, category=category, **kwargs)
+        project.tags.set(tags)
+        return project
+
+    def neighbours(self):
+        return sorted(SimilarProject.objects.values_list('project', 'similar_project', 'score', 'rank'))
+
+    def test_scores_and_ranks(self):
+        build_similarity_index()
+        self.assertEqual(
+            list(SimilarProject.objects.filter(project=self.base).values_list('similar_project', 'score')),
+            [(self.same_category.pk, 3), (self.both_tags.pk, 2), (self.category_only.pk, 2)],
+        )
+        # Unapproved projects are never recommended
+        self.assertFalse(SimilarProject.objects.filter(similar_project=self.hidden).exists())
+        with self.assertNumQueries(1):
+            self.assertEqual(self.base.get_similar_projects(2), [self.same_category, self.both_tags])
+
+    def test_incremental_refresh_matches_a_rebuild(self):
+        build_similarity_index()
+        newcomer = self.create('Newcomer', self.health, [self.books])
+        self.unrelated.category = self.education
+        self.unrelated.save()
+        for project in (newcomer, self.unrelated):
+            refresh_project_similarity(project)
+        incremental = self.neighbours()
+        build_similarity_index()
+        self.assertEqual(incremental, self.neighbours())
+
+    def test_deleting_a_project_drops_it_from_lists(self):
+        build_similarity_index()
+        listed_by = list(
+            SimilarProject.objects.filter(similar_project=self.both_tags).values_list('project', flat=True)
+        )
+        self.both_tags.delete()
+        drop_project_similarity(listed_by)
+        incremental = self.neighbours()
+        build_similarity_index()
+        self.assertEqual(incremental, self.neighbours())
+
+    def test_tag_change_queues_a_refresh(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category_only.tags.add(self.books)
+        task = Task.objects.filter(name='crowdfunding_projects.tasks.refresh_similar_projects').latest('pk')
+        self.assertEqual(task.args, [[self.category_only.pk]])
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        creator = create_user('creator')
+        cls.projects = [create_project(creator, title=f'Project {n}') for n in range(7)]
+        # Every row ties on the sort column: the pk decides
+        Project.objects.update(created_at=timezone.now())
+        cls.expected = list(Project.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def pages(self, cursor=None, direction='next_cursor'):
+        paginator = CursorPaginator(Project.objects.all(), 3)
+        pages = []
+        while True:
+            page = paginator.get_page(cursor)
+            pages.append([project.pk for project in page])
+            cursor = getattr(page, direction)
+            if cursor is None:
+                return pages, page
+
+    def test_next_walks_every_row_once_across_ties(self):
+        pages, last = self.pages()
+        self.assertEqual(pages, [self.expected[0:3], self.expected[3:6], self.expected[6:]])
+        self.assertFalse(last.has_next())
+
+    def test_previous_walks_back_to_the_first_page(self):
+        _, last = self.pages()
+        pages, first = self.pages(last.previous_cursor, 'previous_cursor')
+        self.assertEqual(pages, [self.expected[3:6], self.expected[0:3]])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+    def test_invalid_cursor_gives_the_first_page(self):
+        page = CursorPaginator(Project.objects.all(), 3).get_page('not-a-cursor')
+        self.assertEqual([project.pk for project in page], self.expected[0:3])
+
+    def test_project_list_cursor_mode(self):
+        url = reverse('projects:project_list')
+        seen = []
+        query = 'cursor='
+        while query:
+            page = self.client.get(f'{url}?{query}').context['page_obj']
+            self.assertTrue(page.is_cursor)
+            seen += [project.pk for project in page]
+            query = page.next_query
+        self.assertEqual(seen, self.expected)
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = create_user('creator')
+        cls.rater = create_user('rater')
+        cls.project = create_project(cls.creator, title='Clean water')
+        cls.project.tags.add(Tag.objects.create(name='water'))
+        cls.pending = create_project(cls.creator, title='Pending', is_approved=False)
+        Rating.objects.create(project=cls.project, user=cls.rater, rating=4)
+        Donation(project=cls.project, user=cls.rater, amount=Decimal('500')).save()
+        comment = Comment.objects.create(project=cls.project, user=cls.rater, content='Great idea')
+        Comment.objects.create(project=cls.project, user=cls.creator, parent=comment, content='Thanks')
+
+    def url(self, name, project=None):
+        return reverse(f'projects:api_{name}', args=[project.slug] if project else [])
+
+    async def test_project_list(self):
+        response = await self.async_client.get(self.url('project_list'))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), {'results', 'next_cursor', 'previous_cursor'})
+        self.assertEqual([project['id'] for project in data['results']], [self.project.pk])
+        self.assertEqual(set(data['results'][0]), set(ProjectSerializer.default_fields))
+        self.assertEqual(data['results'][0]['current_amount'], 500.0)
+
+    async def test_project_list_fields_and_errors(self):
+        response = await self.async_client.get(self.url('project_list'), {'fields': 'id,title'})
+        self.assertEqual(response.json()['results'], [{'id': self.project.pk, 'title': 'Clean water'}])
+        response = await self.async_client.get(self.url('project_list'), {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+        response = await self.async_client.get(self.url('project_list'), {'min_target': 'lots'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('min_target', response.json()['fields'])
+
+    async def test_project_detail(self):
+        response = await self.async_client.get(self.url('project_detail', self.project))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), set(ProjectDetailSerializer.default_fields))
+        self.assertEqual(data['tags'], ['water'])
+        self.assertEqual(data['average_rating'], 4)
+
+    async def test_pending_project_is_visible_to_its_creator_only(self):
+        url = self.url('project_detail', self.pending)
+        self.assertEqual((await self.async_client.get(url)).status_code, 404)
+        await self.async_client.aforce_login(self.creator)
+        self.assertEqual((await self.async_client.get(url)).status_code, 200)
+
+    async def test_comments(self):
+        response = await self.async_client.get(self.url('project_comments', self.project))
+        self.assertEqual(response.status_code, 200)
+        [comment] = response.json()['results']
+        self.assertEqual(comment['content'], 'Great idea')
+        self.assertEqual(comment['reply_count'], 1)
+        self.assertEqual([reply['content'] for reply in comment['replies']], ['Thanks'])
+
+    async def test_ratings(self):
+        await self.async_client.aforce_login(self.rater)
+        response = await self.async_client.get(self.url('project_ratings', self.project))
+        self.assertEqual(response.json(), {
+            'average_rating': 4.0, 'total_ratings': 1,
+            'distribution': {'1': 0, '2': 0, '3': 0, '4': 1, '5': 0}, 'user_rating': 4,
+        })
+
+    async def test_progress(self):
+        response = await self.async_client.get(self.url('project_progress', self.project))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), set(ProgressSerializer.fields))
+        self.assertEqual(data['progress_percentage'], 10.0)
+
+    async def test_only_get_is_allowed(self):
+        response = await self.async_client.post(self.url('project_progress', self.project))
+        self.assertEqual(response.status_code, 405)
+        response = await self.async_client.get(reverse('projects:api_project_progress', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+
+
+@task(name='tests.create_category')
+def create_category_task(name):
+    Category.objects.create(name=name)
+
+
+@task(name='tests.failing', max_attempts=2)
+def failing_task():
+    raise ValueError('boom')
+
+
+# execute_task() closes the worker's connection, which would end the test transaction
+@mock.patch('crowdfunding_projects.background.close_old_connections', lambda: None)
+class TaskQueueTests(TestCase):
+    def test_claim_takes_each_ready_task_once_by_priority(self):
+        low = create_category_task.enqueue('low')
+        high = create_category_task.enqueue('high', priority=5)
+        later = create_category_task.enqueue('later', delay=60)
+
+        self.assertEqual(claim_tasks(10, worker='one'), [high.pk, low.pk])
+        self.assertEqual(claim_tasks(10, worker='two'), [])
+        high.refresh_from_db()
+        self.assertEqual((high.status, high.locked_by, high.attempts), (RUNNING, 'one', 1))
+        later.refresh_from_db()
+        self.assertEqual(later.status, PENDING)
+
+    def test_success(self):
+        task_row = create_category_task.enqueue('Queued')
+        [task_id] = claim_tasks(1)
+        self.assertEqual(execute_task(task_id), DONE)
+        self.assertTrue(Category.objects.filter(name='Queued').exists())
+        task_row.refresh_from_db()
+        self.assertEqual((task_row.status, task_row.locked_by), (DONE, ''))
+        self.assertIsNotNone(task_row.duration_ms)
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        task_row = failing_task.enqueue()
+        claim_tasks(1)
+        before = timezone.now()
+        self.assertEqual(execute_task(task_row.pk), PENDING)
+        task_row.refresh_from_db()
+        self.assertIn('ValueError: boom', task_row.last_error)
+        self.assertGreaterEqual(task_row.run_after, before + timedelta(seconds=retry_delay(1)))
+        self.assertEqual(claim_tasks(1), [])
+
+        Task.objects.filter(pk=task_row.pk).update(run_after=timezone.now())
+        self.assertEqual(claim_tasks(1), [task_row.pk])
+        self.assertEqual(execute_task(task_row.pk), FAILED)
+        task_row.refresh_from_db()
+        self.assertEqual((task_row.status, task_row.attempts), (FAILED, 2))
+        self.assertEqual(claim_tasks(1), [])
+
+    def test_unknown_task_fails_without_retry(self):
+        task_row = Task.objects.create(name='tests.missing')
+        claim_tasks(1)
+        self.assertEqual(execute_task(task_row.pk), FAILED)
+
+    def test_stale_running_tasks_are_recovered(self):
+        task_row = create_category_task.enqueue('Stale')
+        claim_tasks(1)
+        Task.objects.filter(pk=task_row.pk).update(started_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(recover_stale_tasks(), 1)
+        self.assertEqual(claim_tasks(1), [task_row.pk])
+
+
+class ModerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.moderator = get_user_model().objects.create_superuser(
+            username='moderator', email='moderator@example.com', password='x',
+            first_name='Mod', last_name='Erator', phone='01012345678',
+        )
+        cls.author = create_user('author')
+        cls.reporters = [create_user(f'reporter{n}') for n in range(3)]
+
+    def setUp(self):
+        self.approved = create_project(self.author, title='Approved', is_featured=True)
+        self.pending = [create_project(self.author, title=f'Pending {n}', is_approved=False) for n in range(2)]
+        self.comment = Comment.objects.create(project=self.approved, user=self.author, content='Comment')
+        self.replies = [
+            Comment.objects.create(project=self.approved, user=reporter, parent=self.comment, content='Reply')
+            for reporter in self.reporters[:2]
+        ]
+
+    def report(self, reporters, **target):
+        report_type = 'project' if 'project' in target else 'comment'
+        for reporter in reporters:
+            Report.objects.create(reporter=reporter, report_type=report_type, reason='spam', **target)
+
+    def test_approve_and_hide_projects(self):
+        announced = []
+
+        def receiver(sender, project_ids, **kwargs):
+            announced.append(sorted(project_ids))
+        projects_updated.connect(receiver)
+        self.addCleanup(projects_updated.disconnect, receiver)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(approve_projects(Project.objects.all(), self.moderator), 2)
+        self.assertEqual(announced, [sorted(project.pk for project in self.pending)])
+        project = Project.objects.get(pk=self.pending[0].pk)
+        self.assertEqual((project.is_approved, project.approved_by), (True, self.moderator))
+        self.assertIsNotNone(project.approved_at)
+
+        self.assertEqual(hide_projects(Project.objects.filter(pk=self.approved.pk)), 1)
+        self.approved.refresh_from_db()
+        self.assertEqual(
+            (self.approved.is_approved, self.approved.approved_at, self.approved.is_featured),
+            (False, None, False),
+        )
+        self.assertEqual(hide_projects(Project.objects.filter(pk=self.approved.pk)), 0)
+
+    def test_hiding_replies_updates_reply_count(self):
+        self.assertEqual(hide_comments(Comment.objects.filter(pk=self.replies[0].pk)), 1)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.reply_count, 1)
+        self.assertEqual(approve_comments(Comment.objects.all()), 1)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.reply_count, 2)
+
+    def test_queue_lists_most_reported_first(self):
+        self.report(self.reporters[:1], comment=self.replies[0])
+        self.report(self.reporters, project=self.pending[0])
+        self.report(self.reporters[:1], project=self.approved)
+        resolve_reports(Report.objects.filter(project=self.approved), self.moderator)
+
+        rows = load_queue_items(moderation_queue())
+        self.assertEqual(
+            [(row['report_type'], row['item'], row['report_count']) for row in rows],
+            [('project', self.pending[0], 3), ('comment', self.replies[0], 1)],
+        )
+        resolved = Report.objects.get(project=self.approved)
+        self.assertEqual((resolved.is_resolved, resolved.resolved_by), (True, self.moderator))
+
+    def test_queue_page_hides_and_resolves(self):
+        self.report(self.reporters, project=self.approved)
+        self.report(self.reporters[:1], comment=self.replies[0])
+        self.client.force_login(self.moderator)
+        url = reverse('admin:crowdfunding_projects_report_moderation_queue')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['report_count'] for row in response.context['rows']], [3, 1])
+
+        response = self.client.post(url, {
+            'action': 'hide', 'item': [f'project:{self.approved.pk}', f'comment:{self.replies[0].pk}'],
+        })
+        self.assertRedirects(response, url)
+        self.approved.refresh_from_db()
+        self.comment.refresh_from_db()
+        self.assertFalse(self.approved.is_approved)
+        self.assertEqual(self.comment.reply_count, 1)
+        self.assertFalse(Report.objects.filter(is_resolved=False).exists())
+        self.assertEqual(list(self.client.get(url).context['rows']), [])
+
+    def test_admin_action(self):
+        self.client.force_login(self.moderator)
+        response = self.client.post(reverse('admin:crowdfunding_projects_project_changelist'), {
+            'action': 'approve_selected',
+            '_selected_action': [project.pk for project in self.pending],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Project.objects.filter(is_approved=True, approved_by=self.moderator).count(), 2)
+
+
+class LifecycleTests(TestCase):
+    def setUp(self):
+        creator = create_user('creator')
+        now = timezone.now()
+        past, future = now - timedelta(hours=1), now + timedelta(days=3)
+        self.now = now
+        self.projects = {
+            'ended': create_project(creator, title='Ended', end_date=past),
+            'reached': create_project(creator, title='Reached', end_date=future),
+            'funded_ended': create_project(creator, title='Funded ended', status='funded', end_date=past),
+            'reached_ended': create_project(creator, title='Reached and ended', end_date=past),
+            'running': create_project(creator, title='Running', end_date=future),
+            'deadline_now': create_project(creator, title='Deadline now', end_date=now),
+        }
+        Project.objects.filter(
+            pk__in=[self.projects['reached'].pk, self.projects['reached_ended'].pk]
+        ).update(current_amount=F('total_target'))
+
+    def statuses(self):
+        return {
+            name: Project.objects.get(pk=project.pk).status
+            for name, project in self.projects.items()
+        }
+
+    def test_transitions(self):
+        changes = []
+
+        def receiver(sender, project_ids, source, target, **kwargs):
+            changes.append((source, target, len(project_ids)))
+        project_status_changed.connect(receiver)
+        self.addCleanup(project_status_changed.disconnect, receiver)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moved = run_transitions(now=self.now, batch_size=2)
+        self.assertEqual(moved, {'ended': 3, 'funded': 1, 'ended_funded': 1})
+        self.assertEqual(self.statuses(), {
+            'ended': 'completed',
+            'reached': 'funded',
+            'funded_ended': 'completed',
+            'reached_ended': 'completed',
+            'running': 'active',
+            'deadline_now': 'completed',
+        })
+        self.assertEqual(
+            changes,
+            [('active', 'completed', 2), ('active', 'completed', 1),
+             ('active', 'funded', 1), ('funded', 'completed', 1)],
+        )
+
+    def test_rerun_is_idempotent(self):
+        run_transitions(now=self.now)
+        statuses = self.statuses()
+        self.assertEqual(run_transitions(now=self.now), {'ended': 0, 'funded': 0, 'ended_funded': 0})
+        self.assertEqual(self.statuses(), statuses)
+
+    def test_funded_project_completes_at_its_deadline(self):
+        run_transitions(now=self.now)
+        reached = self.projects['reached']
+        self.assertEqual(run_transitions(now=reached.end_date)['ended_funded'], 1)
+        self.assertEqual(Project.objects.get(pk=reached.pk).status, 'completed')
+
+    def test_dry_run_moves_nothing(self):
+        out = io.StringIO()
+        call_command('run_lifecycle', dry_run=True, stdout=out)
+        self.assertIn('ended: 3 project(s) active -> completed', out.getvalue())
+        self.assertEqual(Project.objects.filter(status='active').count(), 5)
+
+    def test_due_projects_use_an_index(self):
+        for transition in TRANSITIONS:
+            plan = due_projects(transition, self.now).order_by('end_date', 'pk').explain()
+            index = 'project_funded_due_idx' if transition.name == 'funded' else 'project_status_end_idx'
+            self.assertIn(f'USING INDEX {index}', plan.replace('COVERING ', ''))
+
+
+class ProjectAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin',
+            first_name='Admin', last_name='User', phone='01012345678',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def test_rating_column_sorts_by_average(self):
+        creator = create_user('creator')
+        many_low = create_project(creator, title='Many low ratings')
+        few_high = create_project(creator, title='Few high ratings')
+        for n in range(4):
+            Rating.objects.create(project=many_low, user=create_user(f'low{n}'), rating=2)
+        Rating.objects.create(project=few_high, user=create_user('high'), rating=5)
+
+        url = reverse('admin:crowdfunding_projects_project_changelist')
+        column = self.client.get(url).context['cl'].list_display.index('average_rating')
+        response = self.client.get(url, {'o': f'-{column}'})
+        self.assertEqual(list(response.context['cl'].result_list), [few_high, many_low])
+
+    def test_status_editable_in_the_changelist(self):
+        project = create_project(create_user('creator'))
+        response = self.client.post(reverse('admin:crowdfunding_projects_project_changelist'), {
+            'form-TOTAL_FORMS': '1', 'form-INITIAL_FORMS': '1',
+            'form-0-id': project.pk, 'form-0-status': 'cancelled', '_save': 'Save',
+        })
+        self.assertEqual(response.status_code, 302)
+        project.refresh_from_db()
+        self.assertEqual(project.status, 'cancelled')
+
+    def test_unapproving_clears_the_approval(self):
+        project = create_project(create_user('creator'), is_approved=False)
+        project_admin = admin.site._registry[Project]
+        request = RequestFactory().post('/')
+        request.user = self.admin_user
+
+        project.is_approved = True
+        project_admin.save_model(request, project, None, True)
+        project.refresh_from_db()
+        self.assertEqual((project.approved_by, project.approved_at is None), (self.admin_user, False))
+
+        project.is_approved = False
+        project_admin.save_model(request, project, None, True)
+        project.refresh_from_db()
+        self.assertEqual((project.approved_by, project.approved_at), (None, None))
+
+
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin',
+            first_name='Admin', last_name='User', phone='01012345678',
+        )
+        cls.john = create_user('JohnDoe', email='doe.john@example.com')
+        cls.jane = create_user('jane', email='jane.smith@example.com')
+
+    def search(self, term):
+        self.client.force_login(self.admin_user)
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'crowdfunding_projects', 'model_name': 'project',
+            'field_name': 'creator', 'term': term,
+        })
+        self.assertEqual(response.status_code, 200)
+        return [int(result['id']) for result in response.json()['results']]
+
+    def test_prefix(self):
+        self.assertEqual(self.search('jane'), [self.jane.pk])
+        self.assertEqual(self.search('John'), [self.john.pk])
+        self.assertEqual(self.search(str(self.jane.pk)), [self.jane.pk])
+
+    def test_falls_back_to_substring_search(self):
+        self.assertEqual(self.search('JOHN'), [self.john.pk])
+        self.assertEqual(self.search('smith'), [self.jane.pk])
+        self.assertEqual(self.search('nobody'), [])
+
+
+class RatingAggregateTests(TestCase):
+    """``rating_sum``/``rating_count`` follow every way a rating is deleted"""
+
+    def setUp(self):
+        self.project = create_project(create_user('creator'))
+        self.raters = [create_user(f'rater{n}') for n in range(3)]
+        for rater, stars in zip(self.raters, (5, 4, 1)):
+            Rating.objects.create(project=self.project, user=rater, rating=stars)
+
+    def assertAggregates(self, rating_sum, rating_count):
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.rating_sum, self.project.rating_count), (rating_sum, rating_count))
+
+    def test_save_and_delete(self):
+        self.assertAggregates(10, 3)
+        rating = Rating.objects.get(user=self.raters[2])
+        rating.rating = 3
+        rating.save()
+        self.assertAggregates(12, 3)
+        rating.delete()
+        self.assertAggregates(9, 2)
+
+    def test_deleting_a_raters_account(self):
+        rater = self.raters[2]
+        get_user_model().objects.filter(pk=rater.pk).update(is_active=False)
+        delete_user(rater.pk)
+        self.assertAggregates(9, 2)
+        self.assertEqual(self.project.average_rating, 4.5)
+
+    def test_queryset_delete(self):
+        Rating.objects.filter(rating__gte=4).delete()
+        self.assertAggregates(1, 1)
+        self.assertEqual(self.project.average_rating, 1)
+
+
+class ReplyCountTests(TestCase):
+    """``reply_count`` follows every way a reply is deleted"""
+
+    def setUp(self):
+        author = create_user('author')
+        self.project = create_project(author)
+        self.comment = Comment.objects.create(project=self.project, user=author, content='Comment')
+        self.repliers = [create_user(f'replier{n}') for n in range(3)]
+        for replier in self.repliers:
+            Comment.objects.create(project=self.project, user=replier, parent=self.comment, content='Reply')
+
+    def assertReplyCount(self, count):
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.reply_count, count)
+
+    def test_delete(self):
+        self.assertReplyCount(3)
+        Comment.objects.filter(user=self.repliers[0]).get().delete()
+        self.assertReplyCount(2)
+
+    def test_deleting_a_repliers_account(self):
+        replier = self.repliers[0]
+        get_user_model().objects.filter(pk=replier.pk).update(is_active=False)
+        delete_user(replier.pk)
+        self.assertReplyCount(2)
+
+    def test_queryset_delete(self):
+        Comment.objects.filter(user__in=self.repliers[:2]).delete()
+        self.assertReplyCount(1)
+
+    def test_hidden_reply_is_not_counted_twice(self):
+        reply = Comment.objects.get(user=self.repliers[0])
+        reply.is_approved = False
+        reply.save()
+        self.assertReplyCount(2)
+        Comment.objects.filter(pk=reply.pk).delete()
+        self.assertReplyCount(2)
+
+
+class ProjectCounterTests(TestCase):
+    """The project page's backer and comment counts are stored, not counted"""
+
+    def setUp(self):
+        self.author = create_user('author')
+        self.project = create_project(self.author)
+        self.comment = Comment.objects.create(project=self.project, user=self.author, content='Comment')
+        self.reply = Comment.objects.create(
+            project=self.project, user=self.author, parent=self.comment, content='Reply'
+        )
+
+    def assertCounts(self, donations, comments):
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.donation_count, self.project.comment_count), (donations, comments))
+
+    def test_comments_follow_moderation_and_deletes(self):
+        self.assertCounts(0, 2)
+        hide_comments(Comment.objects.filter(pk=self.reply.pk))
+        self.assertCounts(0, 1)
+        approve_comments(Comment.objects.filter(pk=self.reply.pk))
+        self.assertCounts(0, 2)
+        self.reply.is_approved = False
+        self.reply.save()
+        self.assertCounts(0, 1)
+        # Its hidden reply goes in the cascade without being counted again
+        self.comment.delete()
+        self.assertCounts(0, 0)
+
+    def test_donations_and_reconcile(self):
+        for amount in ('100', '50'):
+            Donation(project=self.project, user=self.author, amount=Decimal(amount)).save()
+        self.assertCounts(2, 2)
+        Project.objects.filter(pk=self.project.pk).update(donation_count=9)
+        self.assertEqual([pk for pk, _, _ in reconcile_project_totals()], [self.project.pk])
+        self.assertCounts(2, 2)
+
+    def test_page_runs_no_count(self):
+        Donation(project=self.project, user=self.author, amount=Decimal('100')).save()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.project.get_absolute_url())
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql']])
+        project = response.context['project']
+        self.assertEqual((project.donation_count, project.comment_count), (1, 2))
+
+
+def upload(name='photo.png', size=(800, 600)):
+    buffer = io.BytesIO()
+    Image.new('RGBA', size, (200, 30, 30, 128)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+def image_size(storage, name):
+    with storage.open(name) as handle, Image.open(handle) as image:
+        return image.size
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+        self.enterContext(mock.patch('crowdfunding_projects.images.IMAGE_VARIANTS_ASYNC', False))
+        self.project = create_project(create_user('creator'))
+
+    def add_image(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ProjectImage.objects.create(project=self.project, image=upload(**kwargs))
+
+    def test_variants_rendered_after_commit(self):
+        image = self.add_image()
+        image.refresh_from_db()
+        variants = image.image_variants
+        storage = image.image.storage
+        self.assertEqual(variants['source'], image.image.name)
+        for size in IMAGE_VARIANTS:
+            self.assertEqual(set(variants[size]), {'webp', 'jpeg'})
+            self.assertTrue(variants[size]['webp'].endswith(f".{variants['hash']}.{size}.webp"))
+        self.assertEqual(image_size(storage, variants['thumb']['jpeg']), (160, 160))
+        self.assertEqual(image_size(storage, variants['card']['webp']), (480, 300))
+        # Fitted, never enlarged
+        self.assertEqual(image_size(storage, variants['hero']['webp']), (800, 600))
+
+    def test_pool_renders_in_worker_processes(self):
+        image = self.add_image()
+        ProjectImage.objects.filter(pk=image.pk).update(image_variants={})
+        future = get_executor().submit(render_variants, image_source(image.image))
+        _stored(ProjectImage, image.pk, 'image', image.image.name)(future)
+        image.refresh_from_db()
+        self.assertEqual(image.image_variants['source'], image.image.name)
+        self.assertTrue(image.image.storage.exists(image.image_variants['thumb']['webp']))
+
+    def test_template_tags_fall_back_to_original(self):
+        image = self.add_image()
+        image.refresh_from_db()
+        template = Template(
+            "{% load image_variants %}{{ image.image|variant:'thumb' }} "
+            "{% image_variant image.image 'hero' 'jpeg' %}"
+        )
+        thumb, hero = template.render(Context({'image': image})).split()
+        self.assertEqual(thumb, image.image.storage.url(image.image_variants['thumb']['webp']))
+        self.assertEqual(hero, image.image.storage.url(image.image_variants['hero']['jpeg']))
+
+        # Replaced since the variants were made
+        image.image.name = 'project_images/other.png'
+        self.assertEqual(template.render(Context({'image': image})).split(), [image.image.url] * 2)
+        self.assertEqual(variant_url(ProjectImage().image, 'thumb'), '')
+
+    def test_stale_and_deleted_variants_removed(self):
+        image = self.add_image()
+        image.refresh_from_db()
+        storage = image.image.storage
+        first = image.image_variants
+
+        # A render that finishes after the picture was replaced is discarded
+        content_hash, rendered = render_variants(image_source(image.image))
+        self.assertIsNone(store_variants(
+            ProjectImage, image.pk, 'image', 'project_images/replaced.png', content_hash, rendered,
+        ))
+        self.assertFalse(storage.exists('project_images/replaced.%s.thumb.webp' % content_hash))
+
+        image.image = upload(name='second.png', size=(300, 900))
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+        image.refresh_from_db()
+        self.assertNotEqual(image.image_variants['hash'], first['hash'])
+        self.assertFalse(storage.exists(first['thumb']['webp']))
+        second = image.image_variants['thumb']['webp']
+        self.assertTrue(storage.exists(second))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        self.assertFalse(storage.exists(second))
+
+
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = create_project(create_user('creator'))
+
+    def assertQueriesTimed(self, response):
+        self.assertEqual(response.status_code, 200)
+        match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers['Server-Timing'])
+        self.assertGreater(int(match[1]), 0)
+
+    def test_sync_view(self):
+        self.assertQueriesTimed(self.client.get(reverse('projects:project_list')))
+
+    async def test_async_view(self):
+        # Queries of async views run in sync_to_async threads
+        self.assertQueriesTimed(
+            await self.async_client.get(reverse('projects:api_project_detail', args=[self.project.slug]))
+        )
+
+
+class SqlitePragmaTests(TestCase):
+    def open_connection(self, pragmas):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict, 'NAME': os.path.join(directory.name, 'db.sqlite3'),
+            'PRAGMAS': pragmas,
+        }, alias='pragmas')
+        self.addCleanup(wrapper.close)
+        wrapper.force_debug_cursor = True
+        wrapper.ensure_connection()
+        return wrapper
+
+    def test_production_pragmas_applied_to_new_connections(self):
+        pragmas = settings.SQLITE_PRODUCTION_PROFILE['PRAGMAS']
+        wrapper = self.open_connection(pragmas)
+        # Run on the sqlite3 connection, not logged as queries
+        self.assertEqual(len(wrapper.queries_log), 0)
+        self.assertEqual(current_pragmas(wrapper, pragmas), {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'busy_timeout': pragmas['busy_timeout'],
+            'mmap_size': pragmas['mmap_size'],
+            'cache_size': pragmas['cache_size'],
+            'temp_store': 2,
+        })
+
+    def test_query_only_connection_rejects_writes(self):
+        wrapper = self.open_connection({'query_only': 'ON'})
+        with wrapper.cursor() as cursor, self.assertRaises(DatabaseError):
+            cursor.execute('CREATE TABLE t (id integer)')
+
+    def test_invalid_pragmas_rejected(self):
+        self.assertEqual(pragma_statements({'cache_size': -2000, 'journal_mode': 'WAL'}), [
+            'PRAGMA cache_size = -2000', 'PRAGMA journal_mode = WAL',
+        ])
+        self.assertEqual(pragma_statements(None), [])
+        for pragmas in ({'journal_mode': 'WAL; DROP TABLE x'}, {'cache_size; --': 1}, {'busy_timeout': ''}):
+            with self.assertRaises(ValueError):
+                pragma_statements(pragmas)
+
+
+class AsyncMiddlewareTests(TestCase):
+    # Adaptations are only logged in DEBUG
+    @override_settings(DEBUG=True)
+    def test_async_handler_adapts_no_middleware(self):
+        # Adapting a sync-only middleware would push every async view onto a thread
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            BaseHandler().load_middleware(is_async=True)
+
+
+@override_settings(DATABASE_ROUTERS=['crowdfunding_projects.replica.ReplicaRouter'])
+class ReplicaTests(TransactionTestCase):
+    # The router ignores the replica inside a transaction, so no TestCase
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for patch in (
+            mock.patch.dict(settings.DATABASES, {REPLICA: {
+                **settings.DATABASES['default'],
+                'NAME': os.path.join(directory.name, 'replica.sqlite3'),
+            }}),
+            # Configured after the test databases were set up
+            mock.patch.object(type(self), 'databases', {'default', REPLICA}),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.close_replica)
+
+    def close_replica(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+
+    def test_refresh_then_read_from_replica(self):
+        creator = create_user('creator')
+        create_project(creator, title='Copied')
+        self.assertIsNone(refreshed_at())
+        refresh_replica()
+        # Other workers do not share this process's cache
+        cache.clear()
+        self.assertAlmostEqual(refreshed_at(), time.time(), delta=5)
+
+        create_project(creator, title='Not copied yet')
+        response = self.client.get(reverse('projects:project_list'))
+        self.assertContains(response, 'Copied')
+        self.assertNotContains(response, 'Not copied yet')
+
+    def test_stale_replica_falls_back_to_primary(self):
+        create_project(create_user('creator'), title='Fresh')
+        refresh_replica()
+        stale = time.time() - 3600
+        os.utime(settings.DATABASES[REPLICA]['NAME'] + '.refreshed', (stale, stale))
+        create_project(Project.objects.get().creator, title='Newer')
+        self.assertContains(self.client.get(reverse('projects:project_list')), 'Newer')
@@ -0,0 +1,116 @@
+"""
+Rolling donation counters for trending projects.
+
+Every donation increments a per-project hourly ``DonationBucket`` (count and
+amount) in the same transaction as the ledger entry. Buckets are keyed by an
+integer hour number (hours since the Unix epoch) so window filters and decay
+are plain integer arithmetic. When a project opens a new hour bucket its
+buckets older than ``TRENDING_RETENTION_HOURS`` are dropped, keeping the table
+small; ``prune_donation_buckets`` does the same for all projects.
+
+``trending_projects`` ranks projects from the buckets alone, either by the
+donation count in the window or by a sum of donated amounts decayed by age.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import ExpressionWrapper, F, FloatField, Sum, Value
+from django.db.models.functions import Power
+from django.utils import timezone
+
+TRENDING_RETENTION_HOURS = getattr(settings, 'TRENDING_RETENTION_HOURS', 24 * 7)
+TRENDING_HALF_LIFE_HOURS = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 24)
+
+SCORE_COUNT = 'count'
+SCORE_DECAYED_SUM = 'decayed_sum'
+
+
+def hour_number(moment=None):
+    """Hours since the Unix epoch for ``moment`` (defaults to now)"""
+    moment = moment or timezone.now()
+    return int(moment.timestamp() // 3600)
+
+
+def hour_start(number):
+    """Start of the hour bucket ``number`` as an aware datetime"""
+    return datetime.fromtimestamp(number * 3600, tz=dt_timezone.utc)
+
+
+def record_donation_bucket(project_id, amount, moment=None):
+    """Add one donation of ``amount`` to the project's current hour bucket"""
+    from .models import DonationBucket
+
+    hour = hour_number(moment)
+    updated = DonationBucket.objects.filter(project_id=project_id, hour=hour).update(
+        donation_count=F('donation_count') + 1,
+        amount_sum=F('amount_sum') + amount,
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            DonationBucket.objects.create(
+                project_id=project_id, hour=hour, donation_count=1, amount_sum=amount
+            )
+    except IntegrityError:
+        # Another donation opened the bucket first
+        DonationBucket.objects.filter(project_id=project_id, hour=hour).update(
+            donation_count=F('donation_count') + 1,
+            amount_sum=F('amount_sum') + amount,
+        )
+    else:
+        DonationBucket.objects.filter(
+            project_id=project_id, hour__lte=hour - TRENDING_RETENTION_HOURS
+        ).delete()
+
+
+def prune_donation_buckets(retention_hours=TRENDING_RETENTION_HOURS):
+    """Delete buckets that fell out of the retention window"""
+    from .models import DonationBucket
+
+    deleted, _ = DonationBucket.objects.filter(
+        hour__lte=hour_number() - retention_hours
+    ).delete()
+    return deleted
+
+
+def trending_score(score=SCORE_COUNT, half_life_hours=TRENDING_HALF_LIFE_HOURS, now_hour=None):
+    """Score expression over a project's ``donation_buckets`` join"""
+    if score == SCORE_COUNT:
+        return Sum('donation_buckets__donation_count')
+    if score == SCORE_DECAYED_SUM:
+        now_hour = hour_number() if now_hour is None else now_hour
+        age = ExpressionWrapper(
+            (Value(now_hour) - F('donation_buckets__hour')) * 1.0 / half_life_hours,
+            output_field=FloatField(),
+        )
+        return Sum(
+            ExpressionWrapper(
+                F('donation_buckets__amount_sum') * Power(Value(0.5), age),
+                output_field=FloatField(),
+            )
+        )
+    raise ValueError(f'Unknown trending score: {score}')
+
+
+def trending_projects(window_hours=TRENDING_RETENTION_HOURS, score=SCORE_COUNT,
+                      half_life_hours=TRENDING_HALF_LIFE_HOURS, category=None, projects=None):
+    """
+    Approved, active projects that received donations in the last
+    ``window_hours``, best first. Each project is annotated with
+    ``recent_donations`` and ``trending_score``.
+    """
+    from .models import Project
+
+    now_hour = hour_number()
+    if projects is None:
+        projects = Project.objects.filter(is_approved=True, status='active')
+    if category is not None:
+        projects = projects.filter(category=category)
+    return projects.filter(
+        donation_buckets__hour__gt=now_hour - window_hours
+    ).annotate(
+        recent_donations=Sum('donation_buckets__donation_count'),
+        trending_score=trending_score(score, half_life_hours, now_hour),
+    ).filter(recent_donations__gt=0).order_by('-trending_score', '-current_amount')